@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -38,6 +39,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "django_filters",
     "rest_framework",
     "drf_yasg",
@@ -136,6 +138,32 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 # Media files
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Хосты, с которых generate_photo_variants загружает фото объектов по
+# внешним ссылкам (например, CDN медиафайлов). По умолчанию внешние ссылки
+# не загружаются: PHOTO_SOURCE_HOSTS=cdn.example.com,media.example.com
+PHOTO_SOURCE_HOSTS = [
+    host.strip().lower()
+    for host in os.environ.get("PHOTO_SOURCE_HOSTS", "").split(",")
+    if host.strip()
+]
+
+# Cache
+# Алиас "listings" используется для кэша ответов по объектам и каталогам.
+# В продакшене задается общий кэш, например:
+# LISTINGS_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# LISTINGS_CACHE_LOCATION=redis://redis:6379/1
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "listings": {
+        "BACKEND": os.environ.get(
+            "LISTINGS_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("LISTINGS_CACHE_LOCATION", "listings"),
+        "TIMEOUT": 300,
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.storage import GRACE_PERIOD, content_storage
+
+
+class Command(BaseCommand):
+    """
+    Удаляет файлы хранилища, адресуемого по содержимому (core.storage),
+    на которые не осталось ссылок, и файлы без записи в БД.
+
+    Удаляются только файлы, освобожденные или измененные раньше, чем
+    --grace-hours назад, чтобы не затронуть записи, которые еще выполняются.
+
+    Пример:
+        python manage.py gc_media --dry-run
+    """
+
+    help = "Сборка мусора в хранилище медиафайлов по содержимому."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=GRACE_PERIOD.total_seconds() / 3600,
+            help="Минимальный возраст удаляемых файлов в часах",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только подсчитать файлы, не удаляя их",
+        )
+
+    def handle(self, *args, **options):
+        if options["grace_hours"] < 0:
+            raise CommandError("Срок не может быть отрицательным.")
+
+        deleted, freed = content_storage.collect_garbage(
+            timedelta(hours=options["grace_hours"]), dry_run=options["dry_run"]
+        )
+        action = "Будет удалено" if options["dry_run"] else "Удалено"
+        self.stdout.write(
+            f"{action} файлов: {deleted}, освобождено: {freed / 1024 / 1024:.1f} МБ."
+        )
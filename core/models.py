@@ -1,3 +1,36 @@
-# from django.db import models
+from django.db import models
+from django.db.models import Q
 
-# Create your models here.
+
+class StoredFile(models.Model):
+    """
+    Файл в хранилище, адресуемом по содержимому (см. core.storage).
+
+    Поля:
+        - key: SHA-256 содержимого (hex).
+        - size: Размер файла в байтах.
+        - refcount: Количество ссылок на файл.
+        - created_at: Дата первой записи файла.
+        - released_at: Дата, когда на файл не осталось ссылок.
+
+    Файлы без ссылок удаляет команда gc_media.
+    """
+
+    key = models.CharField(max_length=64, primary_key=True)
+    size = models.BigIntegerField()
+    refcount = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    released_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # Кандидаты на удаление для gc_media
+            models.Index(
+                fields=["released_at"],
+                condition=Q(refcount__lte=0),
+                name="stored_file_released_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.refcount})"
@@ -0,0 +1,218 @@
+"""
+Хранилище медиафайлов, адресуемое по содержимому.
+
+Имя файла — SHA-256 его содержимого с исходным расширением, разложенное по
+каталогам по первым символам хэша: cas/ab/cd/abcd...ef.jpg. Одинаковые
+файлы хранятся один раз: повторная запись известного содержимого не
+пишет на диск, а только увеличивает счетчик ссылок (StoredFile.refcount).
+
+Каждый вызов save() — новая ссылка на файл; владелец ссылки освобождает
+ее через release(), когда перестает использовать файл. Файлы без ссылок
+удаляет команда gc_media после GRACE_PERIOD.
+"""
+
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+from itertools import chain
+from pathlib import PurePath
+
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+from .models import StoredFile
+
+PREFIX = "cas"
+# Файлы без ссылок и файлы без записи в БД удаляются не раньше этого срока
+GRACE_PERIOD = timedelta(hours=24)
+HASH_CHUNK_SIZE = 64 * 1024
+GC_BATCH_SIZE = 1000
+
+ACQUIRE_SQL = """
+INSERT INTO core_storedfile (key, size, refcount, created_at, released_at)
+VALUES (%s, %s, 1, now(), NULL)
+ON CONFLICT (key) DO UPDATE
+SET refcount = core_storedfile.refcount + 1, released_at = NULL
+"""
+
+RELEASE_SQL = """
+UPDATE core_storedfile
+SET refcount = refcount - 1,
+    released_at = CASE WHEN refcount <= 1 THEN now() ELSE released_at END
+WHERE key = %s AND refcount > 0
+"""
+
+
+def content_key(name):
+    """
+    SHA-256 из имени файла хранилища или None для других имен.
+    """
+    path = PurePath(name)
+    if path.parts[:1] != (PREFIX,) or len(path.parts) != 4:
+        return None
+    key = path.name.split(".", 1)[0]
+    if len(key) != 64 or path.parts[1:3] != (key[:2], key[2:4]):
+        return None
+    return key
+
+
+def key_name(key, extension=""):
+    return f"{PREFIX}/{key[:2]}/{key[2:4]}/{key}{extension}"
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Файловое хранилище с именами по SHA-256 содержимого и счетчиком ссылок.
+
+    Файлы с другими именами (загруженные до перехода) читаются как из
+    обычного FileSystemStorage.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Имя определяется содержимым и вычисляется в _save()
+        return name
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in content.chunks(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+        key = digest.hexdigest()
+        name = key_name(key, PurePath(name).suffix.lower())
+
+        # Запись в БД до проверки файла: удаление файла в gc_media
+        # выполняется под блокировкой этой строки
+        with connection.cursor() as cursor:
+            cursor.execute(ACQUIRE_SQL, [key, size])
+        try:
+            # Известное содержимое не перезаписывается. Свежая дата изменения
+            # защищает файл от удаления как «сироты», пока транзакция с
+            # записью в БД не зафиксирована
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            self.write_atomic(name, content)
+        return name
+
+    def write_atomic(self, name, content):
+        """
+        Записывает файл через временный файл в том же каталоге, чтобы
+        параллельная запись того же содержимого не оставила неполный файл.
+        """
+        path = self.path(name)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        if self.directory_permissions_mode is not None:
+            os.chmod(directory, self.directory_permissions_mode)
+        descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                for chunk in content.chunks():
+                    file.write(chunk)
+            os.chmod(temporary, self.file_permissions_mode or 0o644)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def release(self, name):
+        """
+        Освобождает ссылку на файл `name`; файлы вне хранилища игнорируются.
+        """
+        key = content_key(name or "")
+        if key is None:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(RELEASE_SQL, [key])
+
+    def collect_garbage(self, grace_period=GRACE_PERIOD, dry_run=False):
+        """
+        Удаляет файлы без ссылок и файлы без записи в БД (например, после
+        отката транзакции), не измененные дольше `grace_period`.
+
+        Returns:
+            tuple: (количество удаленных файлов, освобождено байт).
+        """
+        cutoff = timezone.now() - grace_period
+        released = StoredFile.objects.filter(refcount__lte=0, released_at__lt=cutoff)
+        deleted = freed = 0
+
+        if dry_run:
+            keys = released.values_list("key", flat=True)
+            names = [name for key in keys.iterator() for name in self.key_files(key)]
+        else:
+            names = []
+        while not dry_run:
+            with transaction.atomic():
+                # Блокировка строк не дает save() сослаться на удаляемый файл
+                keys = list(
+                    released.select_for_update(skip_locked=True).values_list(
+                        "key", flat=True
+                    )[:GC_BATCH_SIZE]
+                )
+                for key in keys:
+                    for name in self.key_files(key):
+                        freed += self.size(name)
+                        deleted += 1
+                        self.delete(name)
+                StoredFile.objects.filter(key__in=keys).delete()
+            if len(keys) < GC_BATCH_SIZE:
+                break
+
+        for name in chain(names, self.iter_orphans(cutoff)):
+            freed += self.size(name)
+            deleted += 1
+            if not dry_run:
+                self.delete(name)
+        return deleted, freed
+
+    def key_files(self, key):
+        directory = os.path.dirname(key_name(key))
+        if not self.exists(directory):
+            return []
+        _, files = self.listdir(directory)
+        return [f"{directory}/{file}" for file in files if file.startswith(key)]
+
+    def iter_orphans(self, cutoff):
+        """
+        Файлы хранилища без записи в БД (и временные файлы), измененные
+        раньше `cutoff`.
+        """
+        if not self.exists(PREFIX):
+            return
+        candidates = {}
+        for root, _, files in os.walk(self.path(PREFIX)):
+            for file in files:
+                path = os.path.join(root, file)
+                if os.path.getmtime(path) >= cutoff.timestamp():
+                    continue
+                name = os.path.relpath(path, self.location).replace(os.sep, "/")
+                key = content_key(name)
+                if key is None:
+                    yield name
+                    continue
+                candidates[name] = key
+                if len(candidates) >= GC_BATCH_SIZE:
+                    yield from self.missing(candidates)
+                    candidates = {}
+        yield from self.missing(candidates)
+
+    @staticmethod
+    def missing(candidates):
+        known = set(
+            StoredFile.objects.filter(key__in=set(candidates.values())).values_list(
+                "key", flat=True
+            )
+        )
+        return [name for name, key in candidates.items() if key not in known]
+
+
+content_storage = ContentAddressedStorage()
+
+
+def get_content_storage():
+    return content_storage
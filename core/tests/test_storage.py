@@ -0,0 +1,64 @@
+import os
+import time
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+
+from core.models import StoredFile
+from core.storage import content_key, content_storage
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def make_old(name):
+    past = time.time() - 2 * 24 * 3600
+    os.utime(content_storage.path(name), (past, past))
+
+
+@pytest.mark.django_db
+class TestContentAddressedStorage:
+    def test_same_content_stored_once(self, media):
+        """
+        Одинаковое содержимое хранится в одном файле по SHA-256 с
+        раскладкой по каталогам; каждая запись — ссылка на файл.
+        """
+        first = content_storage.save("photo.JPG", ContentFile(b"same"))
+        second = content_storage.save("other/name.jpg", ContentFile(b"same"))
+        key = content_key(first)
+
+        assert first == second == f"cas/{key[:2]}/{key[2:4]}/{key}.jpg"
+        assert content_storage.open(first).read() == b"same"
+        assert len(list(media.rglob("*.jpg"))) == 1
+        stored = StoredFile.objects.get(key=key)
+        assert (stored.size, stored.refcount) == (4, 2)
+
+    def test_garbage_collection(self, media):
+        """
+        Сборка мусора удаляет файлы без ссылок после срока ожидания и файлы
+        без записи в БД; файлы вне хранилища не затрагиваются.
+        """
+        kept = content_storage.save("a.png", ContentFile(b"kept"))
+        released = content_storage.save("b.png", ContentFile(b"released"))
+        content_storage.release(released)
+        content_storage.release(released)
+        content_storage.release("avatars/legacy.png")
+        orphan = content_storage.save("c.png", ContentFile(b"orphan"))
+        StoredFile.objects.filter(key=content_key(orphan)).delete()
+
+        assert StoredFile.objects.get(key=content_key(released)).refcount == 0
+        assert content_storage.collect_garbage() == (0, 0)
+
+        make_old(orphan)
+        out = StringIO()
+        call_command("gc_media", "--grace-hours", "0", stdout=out)
+        assert "Удалено файлов: 2" in out.getvalue()
+        assert content_storage.exists(kept)
+        assert not content_storage.exists(released)
+        assert not content_storage.exists(orphan)
+        assert not StoredFile.objects.filter(key=content_key(released)).exists()
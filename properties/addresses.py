@@ -0,0 +1,34 @@
+"""
+Уникальность адресов объектов недвижимости.
+
+address_key — md5 нормализованного адреса "страна|город|район|адрес"
+(пробелы схлопываются, регистр не учитывается). Колонка заполняется
+триггером БД (см. миграцию 0013), а частичное уникальное ограничение
+действует для объектов без complex_name. Дубли отклоняет сама БД, без
+предварительного SELECT; IntegrityError преобразуется в ошибку валидации.
+"""
+
+import hashlib
+
+ADDRESS_KEY_CONSTRAINT = "reo_unique_address_key"
+DUPLICATE_ADDRESS_ERROR = "Объект с таким адресом уже существует."
+
+
+def normalize_address_part(value):
+    return " ".join((value or "").split()).lower()
+
+
+def make_address_key(country, city, district, address):
+    """
+    Ключ адреса, совпадающий с функцией properties_address_key в БД.
+    """
+    parts = (country, city, district, address)
+    normalized = "|".join(normalize_address_part(part) for part in parts)
+    return hashlib.md5(normalized.encode("utf-8")).hexdigest()
+
+
+def is_duplicate_address_error(exc):
+    """
+    True, если IntegrityError вызван ограничением уникальности адреса.
+    """
+    return ADDRESS_KEY_CONSTRAINT in str(exc)
@@ -4,6 +4,9 @@ from .models import (
     Catalog,
     CatalogListing,
     Developer,
+    DuplicateCandidate,
+    DuplicateScan,
+    ExchangeRate,
     ListingPrice,
     ListingStatusHistory,
 )
@@ -41,7 +44,62 @@ class ListingPriceAdmin(admin.ModelAdmin):
     search_fields = ("listing__name", "currency")
 
 
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ("currency", "rate", "updated_at")
+    search_fields = ("currency",)
+
+
 @admin.register(ListingStatusHistory)
 class ListingStatusHistoryAdmin(admin.ModelAdmin):
-    list_display = ("listing", "status", "changed_at")
+    list_display = ("listing", "previous_status", "status", "changed_at", "listed_at")
+    list_filter = ("status",)
     search_fields = ("listing__name", "status")
+
+
+@admin.register(DuplicateCandidate)
+class DuplicateCandidateAdmin(admin.ModelAdmin):
+    """
+    Отчет о вероятных дублях (см. команду find_duplicates): пары
+    сгруппированы по cluster, внутри группы — по убыванию оценки.
+    """
+
+    list_display = (
+        "cluster",
+        "listing",
+        "listing_broker",
+        "duplicate",
+        "duplicate_broker",
+        "city",
+        "score",
+        "dismissed",
+        "detected_at",
+    )
+    list_filter = ("dismissed",)
+    list_editable = ("dismissed",)
+    search_fields = ("listing__name", "listing__address", "listing__city")
+    list_select_related = ("listing__broker", "duplicate__broker")
+    raw_id_fields = ("listing", "duplicate")
+    ordering = ("cluster", "-score")
+    actions = ["dismiss"]
+
+    @admin.display(description="Broker", ordering="listing__broker__email")
+    def listing_broker(self, obj):
+        return obj.listing.broker
+
+    @admin.display(description="Duplicate broker")
+    def duplicate_broker(self, obj):
+        return obj.duplicate.broker
+
+    @admin.display(description="City", ordering="listing__city")
+    def city(self, obj):
+        return obj.listing.city
+
+    @admin.action(description="Отметить как не дубли")
+    def dismiss(self, request, queryset):
+        queryset.update(dismissed=True)
+
+
+@admin.register(DuplicateScan)
+class DuplicateScanAdmin(admin.ModelAdmin):
+    list_display = ("started_at", "finished_at", "full", "checked", "found")
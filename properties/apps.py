@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PropertiesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "properties"
+
+    def ready(self):
+        # Подключаем обработчики сигналов (инвалидация кэша)
+        from . import signals  # noqa: F401
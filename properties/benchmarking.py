@@ -0,0 +1,80 @@
+"""
+Вспомогательные функции для нагрузочных management-команд (benchmark_*).
+
+Синтетические объекты вставляются одним INSERT ... SELECT generate_series,
+чтобы миллион строк создавался за секунды, а не через ORM построчно.
+Команды выполняют замеры внутри транзакции и по умолчанию откатывают её.
+"""
+
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from .models import RealEstateObject
+
+# SQL-выражения для обязательных колонок синтетических объектов.
+# `g` — номер строки из generate_series.
+DEFAULT_COLUMNS = {
+    "name": "'Benchmark object ' || g",
+    "price": "round((50000 + random() * 950000)::numeric, 2)",
+    "currency": "'USD'",
+    "status": "(ARRAY['sale', 'rent', 'sold'])[1 + mod(g, 3)]",
+    "availability": "mod(g, 5) <> 0",
+    "country": "'Country ' || mod(g, 20)",
+    "city": "'City ' || mod(g, 500)",
+    "address": "g || ' Benchmark Street'",
+    "area": "30 + random() * 200",
+    "rooms": "1 + mod(g, 6)",
+    "condition": "'new'",
+    "features": "'{}'::jsonb",
+    "photos": "'[]'::jsonb",
+    "videos": "'[]'::jsonb",
+    "photo_variants": "'{}'::jsonb",
+    "latitude": "round((35 + random() * 25)::numeric, 6)",
+    "longitude": "round((-10 + random() * 50)::numeric, 6)",
+    "created_at": "now() - (g || ' seconds')::interval",
+    "updated_at": "now()",
+}
+
+
+def create_benchmark_broker():
+    User = get_user_model()
+    return User.objects.create_user(email="benchmark-broker@example.com", password=None)
+
+
+def create_synthetic_objects(count, broker, columns=None):
+    """
+    Вставляет `count` синтетических объектов недвижимости одним запросом.
+
+    Args:
+        count (int): Количество объектов.
+        broker (User): Брокер, к которому привязываются объекты.
+        columns (dict, optional): SQL-выражения, переопределяющие DEFAULT_COLUMNS.
+    """
+    values = dict(DEFAULT_COLUMNS, **(columns or {}))
+    values["broker_id"] = "%s"
+    table = RealEstateObject._meta.db_table
+    names = ", ".join(values)
+    expressions = ", ".join(values.values())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({names}) "
+            f"SELECT {expressions} FROM generate_series(1, %s) AS g",
+            [broker.pk, count],
+        )
+        cursor.execute(f"ANALYZE {table}")
+
+
+def measure(func, repeat):
+    """
+    Выполняет func `repeat` раз и возвращает (медиана мс, максимум мс, результат).
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings), result
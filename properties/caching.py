@@ -0,0 +1,186 @@
+"""
+Кэширование ответов по объектам недвижимости и каталогам.
+
+Используется отдельный алиас кэша `listings` (см. CACHES в настройках):
+в тестах и локально это память процесса, в продакшене — общий кэш
+(например, Redis), который задается переменными окружения.
+
+Инвалидация построена на версиях "областей" (scope): ключ ответа включает
+текущую версию области, а сигналы post_save/post_delete увеличивают
+версию (см. properties.signals). Старые записи просто перестают
+читаться и вытесняются по TTL.
+
+Области:
+    - objects: списки объектов (список, кластеры, фасеты);
+    - object:<pk>: карточка объекта;
+    - catalogs: список каталогов;
+    - catalog:<pk>: карточка каталога.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+LISTINGS_CACHE_ALIAS = "listings"
+CACHE_PREFIX = "properties:listings"
+RESPONSE_TIMEOUT = 300
+STATS_KEYS = ("hits", "misses")
+
+
+def get_listings_cache():
+    return caches[LISTINGS_CACHE_ALIAS]
+
+
+def filter_cache_key(params, names=None):
+    """
+    Нормализованный ключ параметров запроса.
+
+    Параметры сортируются, пустые значения отбрасываются. Если передан
+    `names`, учитываются только параметры из этого набора (например,
+    фильтры FilterSet), чтобы page/ordering не размножали записи в кэше.
+    """
+    items = sorted(
+        (key, value)
+        for key in params
+        if names is None or key in names
+        for value in params.getlist(key)
+        if value != ""
+    )
+    raw = "&".join(f"{key}={value}" for key, value in items)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _version_key(scope):
+    return f"{CACHE_PREFIX}:version:{scope}"
+
+
+def get_scope_version(scope):
+    """
+    Текущая версия области. Начальное значение берется от времени, чтобы
+    после вытеснения ключа версии не вернуть к жизни старые записи.
+    """
+    cache = get_listings_cache()
+    version = cache.get(_version_key(scope))
+    if version is None:
+        cache.add(_version_key(scope), time.time_ns(), None)
+        version = cache.get(_version_key(scope))
+    return version
+
+
+def invalidate(*scopes):
+    """
+    Увеличивает версии областей, делая их записи в кэше недоступными.
+    """
+    cache = get_listings_cache()
+    for scope in scopes:
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            cache.set(_version_key(scope), time.time_ns(), None)
+
+
+def invalidate_now_and_on_commit(*scopes):
+    """
+    Инвалидирует области сразу и повторно после фиксации транзакции,
+    чтобы ответ, закэшированный до коммита, не пережил изменение.
+    """
+    invalidate(*scopes)
+    transaction.on_commit(lambda: invalidate(*scopes))
+
+
+def versioned_key(scope, *parts):
+    return ":".join(
+        [CACHE_PREFIX, scope, str(get_scope_version(scope))] + [str(p) for p in parts]
+    )
+
+
+def record(outcome):
+    """
+    Увеличивает счетчик попаданий (hits) или промахов (misses).
+    """
+    cache = get_listings_cache()
+    key = f"{CACHE_PREFIX}:stats:{outcome}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_stats():
+    cache = get_listings_cache()
+    return {name: cache.get(f"{CACHE_PREFIX}:stats:{name}", 0) for name in STATS_KEYS}
+
+
+def reset_stats():
+    get_listings_cache().delete_many(
+        [f"{CACHE_PREFIX}:stats:{name}" for name in STATS_KEYS]
+    )
+
+
+class AnonymousResponseCacheMixin:
+    """
+    Кэширует успешные GET-ответы для анонимных пользователей.
+
+    Ключ — область (get_cache_scope), ее версия, имя представления, хост
+    (ссылки пагинации абсолютные), нормализованная строка запроса и версии
+    областей, от которых ответ зависит дополнительно (get_cache_dependencies).
+    Ответ помечается заголовком X-Cache: HIT/MISS. Валидаторы ETag и
+    Last-Modified сохраняются вместе с ответом, поэтому условный запрос
+    к закэшированному ответу получает 304 без обращения к БД.
+    """
+
+    cache_timeout = RESPONSE_TIMEOUT
+    cached_headers = ("ETag", "Last-Modified")
+
+    def get_cache_scope(self):
+        raise NotImplementedError
+
+    def get_cache_dependencies(self):
+        """
+        Дополнительные области, от версий которых зависит ответ.
+        """
+        return ()
+
+    def cached_get(self, request, handler, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+
+        cache = get_listings_cache()
+        key = versioned_key(
+            self.get_cache_scope(),
+            type(self).__name__,
+            request.get_host(),
+            filter_cache_key(request.query_params),
+            *(get_scope_version(scope) for scope in self.get_cache_dependencies()),
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            record("hits")
+            data, status, headers = cached
+            response = Response(data, status=status, headers=headers)
+            response = get_conditional_response(
+                request,
+                etag=headers.get("ETag"),
+                last_modified=parse_http_date_safe(headers.get("Last-Modified", "")),
+                response=response,
+            )
+            response["X-Cache"] = "HIT"
+            return response
+
+        record("misses")
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            headers = {
+                name: response[name] for name in self.cached_headers if name in response
+            }
+            cache.set(
+                key, (response.data, response.status_code, headers), self.cache_timeout
+            )
+        response["X-Cache"] = "MISS"
+        return response
@@ -0,0 +1,297 @@
+"""
+Состав каталогов объектов недвижимости (CatalogListing).
+
+Состав каталога синхронизируется со списком объектов по разнице с текущими
+связями: новые связи добавляются одним bulk_create, лишние удаляются через
+QuerySet.delete() (с сигналами post_delete). Сохраненные связи не
+пересоздаются, поэтому их sort_order и notes не теряются. bulk_create не
+отправляет сигналы моделей, поэтому кэш каталога инвалидируется явно.
+Синхронизация блокирует строку каталога, а пара (каталог, объект)
+уникальна (ограничение catalog_listing_unique).
+
+Списки и карточки каталогов читаются фиксированным числом запросов
+(catalog_queryset): брокер — через JOIN, состав — одним запросом на
+страницу, а превью объектов (`?embed=listings`) — одним оконным запросом,
+который берет первые EMBEDDED_LISTINGS связей каждого каталога.
+
+Ключи sort_order идут с шагом SORT_GAP. Перемещение объекта
+(move_catalog_listing) ставит ему ключ посередине между соседями и меняет
+одну строку. Если места между соседями не осталось, каталог перенумеровывается
+(renumber_catalog); команда renumber_catalog_listings заранее
+перенумеровывает каталоги с исчерпанными промежутками.
+"""
+
+from django.db import connection, transaction
+from django.db.models import Prefetch, Q
+from django.db.models.fields.json import KeyTransform
+from django.utils import timezone
+from rest_framework.exceptions import NotFound, ValidationError
+
+from .caching import invalidate_now_and_on_commit
+from .fieldsets import parse_field_list
+from .models import Catalog, CatalogListing
+
+# Порядок объектов в каталоге
+LISTING_ORDER = ("sort_order", "id")
+# Шаг ключей sort_order: между соседями помещается около 10 перемещений
+SORT_GAP = 1024
+# Каталоги с промежутком меньше MIN_SORT_GAP или ключом больше
+# MAX_SORT_ORDER перенумеровываются фоновой командой
+MIN_SORT_GAP = 2
+MAX_SORT_ORDER = 2**30
+# Количество превью объектов на каталог при ?embed=listings
+EMBEDDED_LISTINGS = 4
+EMBED_OPTIONS = ("listings",)
+# Поля объекта, нужные превью (см. CatalogListingCardSerializer)
+CARD_FIELDS = ("name", "price", "currency", "status", "city")
+
+RENUMBER_SQL = """
+UPDATE properties_cataloglisting AS l
+SET sort_order = r.position * %(gap)s, updated_at = %(now)s
+FROM (
+    SELECT id, row_number() OVER (ORDER BY sort_order, id) AS position
+    FROM properties_cataloglisting
+    WHERE catalog_id = %(catalog)s
+) AS r
+WHERE l.id = r.id AND l.sort_order <> r.position * %(gap)s
+"""
+
+CROWDED_CATALOGS_SQL = """
+SELECT DISTINCT catalog_id FROM (
+    SELECT
+        catalog_id,
+        sort_order,
+        sort_order - lag(sort_order) OVER (
+            PARTITION BY catalog_id ORDER BY sort_order, id
+        ) AS gap
+    FROM properties_cataloglisting
+) AS keys
+WHERE gap < %(min_gap)s OR sort_order > %(max_order)s
+ORDER BY catalog_id
+"""
+
+
+def parse_embed(params):
+    """
+    Набор вложений из параметра `embed=` (список через запятую).
+    """
+    embed = set(parse_field_list(params.get("embed")))
+    unknown = sorted(embed - set(EMBED_OPTIONS))
+    if unknown:
+        raise ValidationError({"embed": f"Неизвестные вложения: {', '.join(unknown)}."})
+    return embed
+
+
+def catalog_queryset(embed=()):
+    """
+    Каталоги с брокером и составом, загружаемыми без запросов на каждый
+    каталог.
+
+    Args:
+        embed (set): Вложения; "listings" добавляет атрибут
+            embedded_listings — первые EMBEDDED_LISTINGS связей с объектами.
+    """
+    links = CatalogListing.objects.order_by(*LISTING_ORDER).only(
+        "id", "catalog_id", "listing_id"
+    )
+    queryset = Catalog.objects.select_related("broker").prefetch_related(
+        Prefetch("listings", queryset=links)
+    )
+    if "listings" in embed:
+        # Срез в Prefetch выполняется одним запросом с ROW_NUMBER() по каталогу
+        cards = (
+            CatalogListing.objects.select_related("listing")
+            .only(
+                "id",
+                "catalog_id",
+                "sort_order",
+                "listing_id",
+                *(f"listing__{name}" for name in CARD_FIELDS),
+            )
+            .annotate(cover_photo=KeyTransform("0", "listing__photos"))
+            .order_by(*LISTING_ORDER)
+        )
+        queryset = queryset.prefetch_related(
+            Prefetch(
+                "listings",
+                queryset=cards[:EMBEDDED_LISTINGS],
+                to_attr="embedded_listings",
+            )
+        )
+    return queryset
+
+
+def catalog_listing_ids(catalog):
+    """
+    ID объектов каталога по порядку; использует предзагруженный состав.
+    """
+    if "listings" in getattr(catalog, "_prefetched_objects_cache", {}):
+        links = catalog.listings.all()
+    else:
+        links = catalog.listings.order_by(*LISTING_ORDER).only("listing_id")
+    return [link.listing_id for link in links]
+
+
+def sync_catalog_listings(catalog, listings):
+    """
+    Приводит состав каталога к списку объектов `listings`.
+
+    Новые объекты добавляются в конец каталога в порядке списка; повторы
+    в списке игнорируются.
+
+    Args:
+        catalog (Catalog): Сохраненный каталог.
+        listings (list): Объекты недвижимости или их ID.
+
+    Returns:
+        tuple: Количество добавленных и удаленных связей.
+    """
+    ids = dict.fromkeys(getattr(listing, "pk", listing) for listing in listings)
+    with transaction.atomic():
+        # Блокировка каталога: одновременные синхронизации одного каталога
+        # выполняются по очереди и видят состав, зафиксированный предыдущей
+        Catalog.objects.select_for_update().filter(pk=catalog.pk).values("id").first()
+        current = dict(catalog.listings.values_list("listing_id", "sort_order"))
+        removed = current.keys() - ids.keys()
+        added = [listing_id for listing_id in ids if listing_id not in current]
+
+        deleted = 0
+        if removed:
+            deleted, _ = catalog.listings.filter(listing_id__in=removed).delete()
+        if added:
+            last = max(current.values(), default=0)
+            if last + SORT_GAP * len(added) > MAX_SORT_ORDER:
+                last = renumber_catalog(catalog.pk)
+            CatalogListing.objects.bulk_create(
+                CatalogListing(
+                    catalog=catalog,
+                    listing_id=listing_id,
+                    sort_order=last + SORT_GAP * position,
+                )
+                for position, listing_id in enumerate(added, start=1)
+            )
+        if added or deleted:
+            invalidate_now_and_on_commit("catalogs", f"catalog:{catalog.pk}")
+    return len(added), deleted
+
+
+def renumber_catalog(catalog_id):
+    """
+    Перенумеровывает ключи каталога с шагом SORT_GAP, сохраняя порядок.
+
+    Returns:
+        int: Последний ключ каталога (0 для пустого каталога).
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Блокировка каталога исключает одновременное перемещение объектов
+        Catalog.objects.select_for_update().filter(pk=catalog_id).values("id").first()
+        cursor.execute(
+            RENUMBER_SQL,
+            {"gap": SORT_GAP, "now": timezone.now(), "catalog": catalog_id},
+        )
+    invalidate_now_and_on_commit("catalogs", f"catalog:{catalog_id}")
+    return CatalogListing.objects.filter(catalog_id=catalog_id).count() * SORT_GAP
+
+
+def crowded_catalogs(min_gap=MIN_SORT_GAP, max_order=MAX_SORT_ORDER):
+    """
+    ID каталогов, которым нужна перенумерация: соседние ключи ближе
+    `min_gap` или ключи больше `max_order`.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            CROWDED_CATALOGS_SQL, {"min_gap": min_gap, "max_order": max_order}
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def key_between(lower, upper):
+    """
+    Ключ строго между `lower` и `upper` (None — нет соседа) или None, если
+    места между ними нет.
+    """
+    if upper is None:
+        return (lower or 0) + SORT_GAP
+    lower = lower or 0
+    if upper - lower < 2:
+        return None
+    return (lower + upper) // 2
+
+
+def neighbour(catalog, anchor, moved, after):
+    """
+    Связь, соседняя с `anchor` после (after=True) или до него, без `moved`.
+    """
+    if after:
+        condition = Q(sort_order__gt=anchor.sort_order) | Q(
+            sort_order=anchor.sort_order, id__gt=anchor.id
+        )
+        order = LISTING_ORDER
+    else:
+        condition = Q(sort_order__lt=anchor.sort_order) | Q(
+            sort_order=anchor.sort_order, id__lt=anchor.id
+        )
+        order = [f"-{name}" for name in LISTING_ORDER]
+    return (
+        catalog.listings.filter(condition)
+        .exclude(pk=moved.pk)
+        .order_by(*order)
+        .only("id", "sort_order")
+        .first()
+    )
+
+
+def move_catalog_listing(catalog, listing_id, before=None, after=None):
+    """
+    Перемещает объект каталога перед объектом `before` или после `after`.
+
+    Обычно меняется только ключ перемещаемой связи. Перемещения в одном
+    каталоге выполняются последовательно (блокировка строки каталога).
+
+    Raises:
+        NotFound: Объекта `listing_id` нет в каталоге.
+        ValidationError: Объекта `before`/`after` нет в каталоге.
+
+    Returns:
+        CatalogListing: Перемещенная связь с новым ключом.
+    """
+    anchor_id = after if after is not None else before
+    with transaction.atomic():
+        Catalog.objects.select_for_update().filter(pk=catalog.pk).values("id").first()
+        links = {
+            link.listing_id: link
+            for link in catalog.listings.filter(
+                listing_id__in=[listing_id, anchor_id]
+            ).only("id", "listing_id", "sort_order")
+        }
+        moved = links.get(listing_id)
+        if moved is None:
+            raise NotFound("Объект не входит в каталог.")
+        anchor = links.get(anchor_id)
+        field = "after" if after is not None else "before"
+        if anchor is None:
+            raise ValidationError({field: "Объект не входит в каталог."})
+        if anchor.pk == moved.pk:
+            raise ValidationError(
+                {field: "Объект нельзя переместить относительно себя."}
+            )
+
+        for attempt in range(2):
+            other = neighbour(catalog, anchor, moved, after is not None)
+            if after is not None:
+                key = key_between(anchor.sort_order, other and other.sort_order)
+            else:
+                key = key_between(other and other.sort_order, anchor.sort_order)
+            if key is not None or attempt:
+                break
+            # Места между соседями нет: перенумеровываем каталог один раз
+            renumber_catalog(catalog.pk)
+            anchor.refresh_from_db(fields=["sort_order"])
+
+        moved.sort_order = key
+        moved.updated_at = timezone.now()
+        CatalogListing.objects.filter(pk=moved.pk).update(
+            sort_order=moved.sort_order, updated_at=moved.updated_at
+        )
+        invalidate_now_and_on_commit("catalogs", f"catalog:{catalog.pk}")
+    return moved
@@ -0,0 +1,126 @@
+"""
+Кластеризация объектов недвижимости для карты.
+
+Карта делится на тайлы равнопромежуточной сетки: на уровне zoom тайл
+имеет размер 360 / 2**zoom градусов, и каждый тайл делится на
+CELLS_PER_TILE x CELLS_PER_TILE ячеек. Объекты группируются по ячейкам
+одним GROUP BY запросом, результат кэшируется по тайлам, поэтому при
+перемещении карты пересчитываются только новые тайлы.
+"""
+
+import math
+from decimal import Decimal
+
+from django.db.models import Avg, Count, F, FloatField, Max, Min
+from django.db.models.functions import Cast, Floor
+
+from .caching import get_listings_cache, versioned_key
+from .geo import bbox_q
+
+CELLS_PER_TILE = 8
+MAX_ZOOM = 20
+MAX_TILES = 64
+CACHE_TIMEOUT = 60
+
+
+def tile_size(zoom):
+    return 360.0 / (2**zoom)
+
+
+def tiles_for_bbox(zoom, min_lat, min_lon, max_lat, max_lon):
+    """
+    Возвращает список тайлов (x, y), покрывающих прямоугольник.
+    """
+    size = tile_size(zoom)
+    columns = 2**zoom
+    rows = max(1, math.ceil(180.0 / size))
+    first_x = max(0, int((min_lon + 180) // size))
+    last_x = min(columns - 1, int((max_lon + 180) // size))
+    first_y = max(0, int((min_lat + 90) // size))
+    last_y = min(rows - 1, int((max_lat + 90) // size))
+    return [
+        (x, y) for x in range(first_x, last_x + 1) for y in range(first_y, last_y + 1)
+    ]
+
+
+def tile_cache_key(filter_key, zoom, x, y):
+    return versioned_key("objects", "clusters", filter_key, zoom, x, y)
+
+
+def compute_clusters(queryset, zoom, tiles):
+    """
+    Считает кластеры для набора тайлов одним сгруппированным запросом.
+
+    Returns:
+        dict: {(x, y): [кластер, ...]} для каждого тайла из `tiles`.
+    """
+    size = tile_size(zoom)
+    cell = size / CELLS_PER_TILE
+    xs = [x for x, _ in tiles]
+    ys = [y for _, y in tiles]
+    min_lon = -180 + min(xs) * size
+    max_lon = min(-180 + (max(xs) + 1) * size, 180)
+    min_lat = -90 + min(ys) * size
+    max_lat = min(-90 + (max(ys) + 1) * size, 90)
+
+    latitude = Cast(F("latitude"), FloatField())
+    longitude = Cast(F("longitude"), FloatField())
+    rows = (
+        queryset.filter(bbox_q(min_lat, min_lon, max_lat, max_lon))
+        .order_by()
+        .annotate(
+            cell_x=Floor((longitude + 180.0) / cell),
+            cell_y=Floor((latitude + 90.0) / cell),
+        )
+        .values("cell_x", "cell_y")
+        .annotate(
+            count=Count("id"),
+            centroid_lat=Avg(latitude),
+            centroid_lon=Avg(longitude),
+            price_min=Min("price_base"),
+            price_max=Max("price_base"),
+            object_id=Min("id"),
+        )
+    )
+
+    result = {tile: [] for tile in tiles}
+    for row in rows:
+        tile = (
+            int(row["cell_x"]) // CELLS_PER_TILE,
+            int(row["cell_y"]) // CELLS_PER_TILE,
+        )
+        if tile not in result:
+            continue
+        cluster = {
+            "count": row["count"],
+            "latitude": round(row["centroid_lat"], 6),
+            "longitude": round(row["centroid_lon"], 6),
+            "price_min": _decimal(row["price_min"]),
+            "price_max": _decimal(row["price_max"]),
+        }
+        if row["count"] == 1:
+            cluster["id"] = row["object_id"]
+        result[tile].append(cluster)
+    return result
+
+
+def get_clusters(queryset, filter_key, zoom, tiles):
+    """
+    Возвращает кластеры для тайлов, используя кэш; недостающие тайлы
+    считаются одним запросом и сохраняются в кэш.
+    """
+    cache = get_listings_cache()
+    keys = {tile: tile_cache_key(filter_key, zoom, *tile) for tile in tiles}
+    cached = cache.get_many(keys.values())
+    missing = [tile for tile in tiles if keys[tile] not in cached]
+
+    clusters = {tile: cached[keys[tile]] for tile in tiles if keys[tile] in cached}
+    if missing:
+        computed = compute_clusters(queryset, zoom, missing)
+        cache.set_many({keys[tile]: computed[tile] for tile in missing}, CACHE_TIMEOUT)
+        clusters.update(computed)
+    return clusters
+
+
+def _decimal(value):
+    return str(value) if isinstance(value, Decimal) else value
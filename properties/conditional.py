@@ -0,0 +1,73 @@
+"""
+Условные GET-запросы (ETag / Last-Modified) для объектов и каталогов.
+
+Валидаторы вычисляются одним агрегирующим запросом (max(updated_at) и
+количество записей) до сериализации. Если клиент прислал совпадающий
+If-None-Match или If-Modified-Since, возвращается 304 без выборки и
+сериализации данных.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .caching import filter_cache_key
+
+
+class ConditionalGetMixin:
+    """
+    Добавляет к GET-ответам слабый ETag и Last-Modified и отвечает 304,
+    если данные не изменились.
+    """
+
+    def get_conditional_queryset(self):
+        """
+        Набор записей, от которого зависит тело ответа.
+        """
+        raise NotImplementedError
+
+    def get_validator_aggregates(self):
+        return {
+            "last_modified": Max("updated_at"),
+            "count": Count("pk", distinct=True),
+        }
+
+    def get_validators(self, request):
+        """
+        Возвращает (etag, last_modified) или (None, None), если записей нет
+        (например, 404 или нет доступа), чтобы не раскрывать их состояние.
+        """
+        values = (
+            self.get_conditional_queryset()
+            .order_by()
+            .aggregate(**self.get_validator_aggregates())
+        )
+        if not values["count"]:
+            return None, None
+
+        last_modified = values["last_modified"]
+        raw = "|".join(
+            [type(self).__name__, filter_cache_key(request.query_params)]
+            + [str(values[name]) for name in sorted(values)]
+        )
+        etag = 'W/"%s"' % hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        # HTTP-даты имеют точность до секунды
+        return etag, int(last_modified.timestamp()) if last_modified else None
+
+    def conditional_get(self, request, handler, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
@@ -0,0 +1,116 @@
+"""
+Цены объектов в базовой валюте.
+
+RealEstateObject.price хранится в валюте, выбранной брокером. Для
+фильтрации и сортировки используется колонка price_base — цена в
+BASE_CURRENCY. Ее вычисляет триггер БД (см. миграцию 0012) при
+изменении price/currency, а при изменении курсов она пересчитывается
+одним UPDATE для объектов в этой валюте, у которых цена меняется
+(recompute_price_base). updated_at при этом не меняется: пересчет курса
+не считается изменением объекта (например, для поиска дублей).
+"""
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, F, OuterRef, Q, Subquery, When
+from django.db.models.functions import Round, Upper
+from django.utils import timezone
+
+from .caching import invalidate_now_and_on_commit
+from .models import ExchangeRate, RealEstateObject
+
+# Совпадает с базовой валютой в триггере миграции 0012
+BASE_CURRENCY = "USD"
+
+
+def normalize_currency(currency):
+    return (currency or "").strip().upper()
+
+
+def get_rate(currency):
+    """
+    Стоимость единицы валюты в базовой валюте или None, если курс неизвестен.
+    """
+    currency = normalize_currency(currency)
+    if currency == BASE_CURRENCY:
+        return Decimal(1)
+    return (
+        ExchangeRate.objects.filter(currency=currency)
+        .values_list("rate", flat=True)
+        .first()
+    )
+
+
+def to_base(amount, currency):
+    """
+    Переводит сумму из валюты `currency` в базовую (None, если курса нет).
+    """
+    rate = get_rate(currency)
+    if rate is None:
+        return None
+    return Decimal(str(amount)) * rate
+
+
+def recompute_price_base(currencies):
+    """
+    Пересчитывает price_base объектов в указанных валютах.
+
+    Присваивание price_base запускает триггер БД, который вычисляет
+    значение по текущему курсу (или NULL, если курс удален). Обновляются
+    только объекты, у которых значение меняется; кэш их карточек и списков
+    инвалидируется.
+
+    Returns:
+        int: Количество обновленных объектов.
+    """
+    currencies = [normalize_currency(currency) for currency in currencies]
+    rate = ExchangeRate.objects.filter(currency=OuterRef("currency_code"))
+    # То же значение, что вычисляет триггер
+    expected = Case(
+        When(currency_code=BASE_CURRENCY, then=F("price")),
+        default=Round(F("price") * Subquery(rate.values("rate")[:1]), 2),
+    )
+    changed = (
+        RealEstateObject.objects.alias(
+            currency_code=Upper("currency"), expected=expected
+        )
+        .filter(currency_code__in=currencies)
+        .filter(
+            ~Q(price_base=F("expected"))
+            | Q(price_base__isnull=True)
+            | Q(expected__isnull=True)
+        )
+        .exclude(price_base__isnull=True, expected__isnull=True)
+    )
+    pks = list(changed.values_list("pk", flat=True))
+    if not pks:
+        return 0
+    updated = RealEstateObject.objects.filter(pk__in=pks).update(price_base=None)
+    invalidate_now_and_on_commit("objects", *(f"object:{pk}" for pk in pks))
+    return updated
+
+
+def set_rates(rates):
+    """
+    Сохраняет курсы {валюта: курс} одним upsert и пересчитывает price_base.
+
+    Сигналы post_save при bulk_create не отправляются, поэтому пересчет
+    (и инвалидация кэша в recompute_price_base) выполняется здесь.
+
+    Returns:
+        int: Количество обновленных объектов.
+    """
+    now = timezone.now()
+    rates = {normalize_currency(currency): rate for currency, rate in rates.items()}
+    with transaction.atomic():
+        ExchangeRate.objects.bulk_create(
+            [
+                ExchangeRate(currency=currency, rate=rate, updated_at=now)
+                for currency, rate in rates.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["currency"],
+            update_fields=["rate", "updated_at"],
+        )
+        return recompute_price_base(rates)
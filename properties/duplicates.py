@@ -0,0 +1,280 @@
+"""
+Поиск вероятных дублей объектов недвижимости (одна квартира, размещенная
+разными брокерами с немного разными адресами и названиями).
+
+Кандидаты отбираются в SQL блоками: тот же город, то же число комнат,
+площадь в пределах допуска и соседние ячейки геосетки (3x3 ячейки geo_cell,
+около 3 км, см. properties.geo). Для объектов без координат блоком служит
+город и район. Пары кандидатов оцениваются в Python по триграммному
+сходству адреса и названия (как similarity() в pg_trgm) и совпадению цены.
+Адреса с разными номерами (дом, квартира) дублями не считаются: соседние
+квартиры одного дома почти совпадают по триграммам.
+
+Поиск инкрементальный: сравниваются только объекты, измененные после
+начала прошлого завершенного запуска, с любыми объектами своего блока.
+Найденные пары хранятся в DuplicateCandidate и объединяются в группы.
+"""
+
+import re
+from functools import lru_cache
+from itertools import islice
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.functions import Upper
+from django.utils import timezone
+
+from .geo import GRID_COLUMNS
+from .models import DuplicateCandidate, DuplicateScan, RealEstateObject
+
+# Порог оценки, начиная с которого пара считается дублем
+THRESHOLD = 0.6
+# Допустимое относительное расхождение площади (отбор) и цены (оценка)
+AREA_TOLERANCE = 0.1
+PRICE_TOLERANCE = 0.1
+# Веса составляющих оценки
+ADDRESS_WEIGHT = 0.5
+NAME_WEIGHT = 0.3
+PRICE_WEIGHT = 0.2
+
+CHUNK_SIZE = 2000
+# Профили объектов (триграммы, цена) переиспользуются соседними чанками
+PROFILE_CACHE_SIZE = 200_000
+
+WORD_RE = re.compile(r"[^\W_]+")
+NUMBER_RE = re.compile(r"\d+")
+
+# Соседние ячейки геосетки, включая саму ячейку
+NEIGHBOUR_OFFSETS = [
+    row * GRID_COLUMNS + column for row in (-1, 0, 1) for column in (-1, 0, 1)
+]
+
+# Общие условия блока: город, число комнат и площадь в пределах допуска
+BLOCK_CONDITIONS = """
+    upper(b.city) = upper(a.city)
+    AND b.rooms = a.rooms
+    AND abs(b.area - a.area) <= %(area)s * greatest(a.area, b.area)
+    AND b.id <> a.id
+"""
+
+# Объекты с координатами сравниваются с объектами соседних ячеек, объекты без
+# координат — с объектами того же района. Список всех соседних ячеек чанка
+# (cells) позволяет выбрать объекты блока по индексу geo_cell одним проходом.
+CANDIDATES_SQL = """
+SELECT a.id, b.id
+FROM {table} a
+CROSS JOIN LATERAL unnest(ARRAY[{cells}]) AS cell(value)
+JOIN {table} b ON b.geo_cell = cell.value AND {conditions}
+WHERE a.id = ANY(%(ids)s) AND a.geo_cell IS NOT NULL AND b.geo_cell = ANY(%(cells)s)
+UNION ALL
+SELECT a.id, b.id
+FROM {table} a
+JOIN {table} b ON {same_district} AND {conditions}
+WHERE a.id = ANY(%(ids)s) AND a.geo_cell IS NULL
+UNION ALL
+SELECT a.id, b.id
+FROM {table} a
+JOIN {table} b ON b.geo_cell IS NULL AND {same_district} AND {conditions}
+WHERE a.id = ANY(%(ids)s) AND a.geo_cell IS NOT NULL
+""".format(
+    table=RealEstateObject._meta.db_table,
+    cells=", ".join(f"a.geo_cell + ({offset})" for offset in NEIGHBOUR_OFFSETS),
+    same_district="upper(coalesce(b.district, '')) = upper(coalesce(a.district, ''))",
+    conditions=BLOCK_CONDITIONS,
+)
+
+
+@lru_cache(maxsize=100_000)
+def word_trigrams(word):
+    padded = f"  {word} "
+    return frozenset(map("".join, zip(padded, padded[1:], padded[2:])))
+
+
+def trigrams(text):
+    """
+    Множество триграмм строки по правилам pg_trgm: слова из букв и цифр
+    в нижнем регистре, дополненные двумя пробелами слева и одним справа.
+    """
+    words = WORD_RE.findall((text or "").lower())
+    return frozenset().union(*map(word_trigrams, words))
+
+
+def similarity(left, right):
+    """
+    Доля общих триграмм двух множеств (0..1).
+    """
+    if not left or not right:
+        return 0.0
+    common = len(left & right)
+    return common / (len(left) + len(right) - common)
+
+
+def within(left, right, tolerance):
+    if left is None or right is None or not max(left, right):
+        return False
+    return abs(left - right) <= tolerance * max(left, right)
+
+
+class DuplicateDetector:
+    """
+    Поиск и сохранение пар вероятных дублей.
+
+    Args:
+        threshold (float): Минимальная оценка пары.
+        area_tolerance (float): Допуск расхождения площади при отборе.
+        price_tolerance (float): Допуск расхождения цены в базовой валюте.
+        chunk_size (int): Количество проверяемых объектов на один запрос.
+    """
+
+    def __init__(
+        self,
+        threshold=THRESHOLD,
+        area_tolerance=AREA_TOLERANCE,
+        price_tolerance=PRICE_TOLERANCE,
+        chunk_size=CHUNK_SIZE,
+    ):
+        self.threshold = threshold
+        self.area_tolerance = area_tolerance
+        self.price_tolerance = price_tolerance
+        self.chunk_size = chunk_size
+
+    def run(self, full=False):
+        """
+        Выполняет запуск и возвращает DuplicateScan со статистикой.
+        """
+        last = (
+            DuplicateScan.objects.filter(finished_at__isnull=False)
+            .order_by("-started_at")
+            .first()
+        )
+        full = full or last is None
+        scan = DuplicateScan.objects.create(started_at=timezone.now(), full=full)
+        self._profiles, self._found = {}, set()
+
+        # Порядок блоков: соседние чанки сравниваются с теми же объектами
+        changed = RealEstateObject.objects.order_by(Upper("city"), "geo_cell", "id")
+        if not full:
+            changed = changed.filter(updated_at__gte=last.started_at)
+        rows = iter(list(changed.values_list("id", "geo_cell")))
+
+        while chunk := list(islice(rows, self.chunk_size)):
+            self.process_chunk(chunk)
+            scan.checked += len(chunk)
+            if len(self._profiles) > PROFILE_CACHE_SIZE:
+                self._profiles.clear()
+
+        update_clusters()
+        # Пара двух измененных объектов из разных чанков находится дважды
+        scan.found = len(self._found)
+        scan.finished_at = timezone.now()
+        scan.save()
+        return scan
+
+    def process_chunk(self, rows):
+        """
+        Обновляет пары объектов чанка; `rows` — пары (id, geo_cell).
+        """
+        ids = [pk for pk, _ in rows]
+        cells = {
+            cell + offset
+            for _, cell in rows
+            if cell is not None
+            for offset in NEIGHBOUR_OFFSETS
+        }
+        pairs = self.find_pairs(ids, cells)
+        self._found.update(pairs)
+        candidates = [
+            DuplicateCandidate(
+                listing_id=left, duplicate_id=right, score=score, cluster=left
+            )
+            for (left, right), score in pairs.items()
+        ]
+        with transaction.atomic():
+            # Пары, отклоненные при проверке, сохраняются между запусками
+            DuplicateCandidate.objects.filter(
+                Q(listing_id__in=ids) | Q(duplicate_id__in=ids), dismissed=False
+            ).delete()
+            DuplicateCandidate.objects.bulk_create(
+                candidates,
+                update_conflicts=True,
+                unique_fields=["listing", "duplicate"],
+                update_fields=["score", "detected_at"],
+            )
+
+    def find_pairs(self, ids, cells):
+        """
+        Пары (меньший id, больший id) с оценкой не ниже порога.
+        """
+        params = {"ids": list(ids), "cells": list(cells), "area": self.area_tolerance}
+        with connection.cursor() as cursor:
+            cursor.execute(CANDIDATES_SQL, params)
+            rows = {tuple(sorted(row)) for row in cursor.fetchall()}
+
+        self.load_profiles({pk for pair in rows for pk in pair})
+        pairs = {}
+        for left, right in rows:
+            score = self.score(self._profiles[left], self._profiles[right])
+            if score >= self.threshold:
+                pairs[(left, right)] = round(score, 4)
+        return pairs
+
+    def load_profiles(self, ids):
+        """
+        Загружает триграммы, номера из адреса и цены объектов, которых еще
+        нет в кэше.
+        """
+        missing = [pk for pk in ids if pk not in self._profiles]
+        rows = RealEstateObject.objects.filter(id__in=missing).values_list(
+            "id", "address", "name", "price_base"
+        )
+        for pk, address, name, price in rows:
+            self._profiles[pk] = (
+                trigrams(address),
+                frozenset(NUMBER_RE.findall(address or "")),
+                trigrams(name),
+                float(price) if price is not None else None,
+            )
+
+    def score(self, left, right):
+        left_address, left_numbers, left_name, left_price = left
+        right_address, right_numbers, right_name, right_price = right
+        if left_numbers and right_numbers and left_numbers != right_numbers:
+            return 0.0
+        score = ADDRESS_WEIGHT * similarity(left_address, right_address)
+        score += NAME_WEIGHT * similarity(left_name, right_name)
+        if within(left_price, right_price, self.price_tolerance):
+            score += PRICE_WEIGHT
+        return score
+
+
+def update_clusters():
+    """
+    Объединяет пары в группы связанных дублей (система непересекающихся
+    множеств); номер группы — наименьший id объекта в ней.
+    """
+    parent = {}
+
+    def find(pk):
+        root = pk
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while pk != root:
+            parent[pk], pk = root, parent.get(pk, pk)
+        return root
+
+    pairs = DuplicateCandidate.objects.filter(dismissed=False).values_list(
+        "id", "listing_id", "duplicate_id", "cluster"
+    )
+    pairs = list(pairs)
+    for _, left, right, _ in pairs:
+        left, right = find(left), find(right)
+        if left != right:
+            parent[max(left, right)] = min(left, right)
+
+    changed = [
+        DuplicateCandidate(id=pk, cluster=find(left))
+        for pk, left, _, cluster in pairs
+        if find(left) != cluster
+    ]
+    DuplicateCandidate.objects.bulk_update(changed, ["cluster"], batch_size=1000)
+    return len(changed)
@@ -0,0 +1,118 @@
+"""
+Потоковая выгрузка объектов недвижимости в CSV и JSONL.
+
+Строки читаются серверным курсором (QuerySet.iterator(chunk_size=...)) и
+сразу отдаются клиенту кусками, поэтому память процесса не зависит от
+размера выгрузки. Значения сериализуются по плану ValuesSerializer, то есть
+совпадают с ответом списка объектов, включая выборочные поля.
+CSV-выгрузка читается обратно импортом (properties.imports): JSON-поля
+записываются как JSON.
+"""
+
+import csv
+import json
+import zlib
+
+FORMATS = ("csv", "jsonl")
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8",
+}
+# Строк на одну выборку серверного курсора
+CHUNK_SIZE = 2000
+# Размер куска ответа, после которого он отправляется клиенту
+FLUSH_SIZE = 64 * 1024
+
+
+class _Line:
+    """
+    Псевдофайл для csv.writer: возвращает записанную строку вместо записи.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def iter_csv(items, fieldnames):
+    writer = csv.writer(_Line())
+    yield writer.writerow(fieldnames)
+    for item in items:
+        yield writer.writerow([_csv_value(item[name]) for name in fieldnames])
+
+
+def iter_jsonl(items):
+    for item in items:
+        yield json.dumps(item, ensure_ascii=False, default=str) + "\n"
+
+
+def iter_lines(items, file_format, fieldnames):
+    if file_format == "csv":
+        return iter_csv(items, fieldnames)
+    if file_format == "jsonl":
+        return iter_jsonl(items)
+    raise ValueError(f"Неподдерживаемый формат: {file_format}")
+
+
+def iter_chunks(lines, flush_size=FLUSH_SIZE):
+    """
+    Склеивает строки в куски байтов около `flush_size`, чтобы не отправлять
+    клиенту каждую строку отдельно.
+    """
+    buffer, size = [], 0
+    for line in lines:
+        data = line.encode("utf-8")
+        buffer.append(data)
+        size += len(data)
+        if size >= flush_size:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def gzip_chunks(chunks):
+    """
+    Сжимает поток кусков в формат gzip на лету.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_objects(queryset, fast, chunk_size=CHUNK_SIZE):
+    """
+    Сериализованные объекты из строк values() серверного курсора.
+
+    Args:
+        queryset (QuerySet): Отфильтрованный и отсортированный queryset.
+        fast (ValuesSerializer): План сериализации выбранных полей.
+        chunk_size (int): Строк на одну выборку курсора.
+    """
+    rows = fast.get_queryset(queryset).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield from fast.to_representation((row,))
+
+
+def iter_export(items, fieldnames, file_format, compress=False):
+    """
+    Куски байтов выгрузки для StreamingHttpResponse.
+
+    Args:
+        items (iterable): Сериализованные объекты (словари).
+        fieldnames (list): Порядок колонок CSV.
+        file_format (str): csv или jsonl.
+        compress (bool): Сжимать выгрузку в gzip.
+    """
+    chunks = iter_chunks(iter_lines(items, file_format, fieldnames))
+    if compress:
+        chunks = gzip_chunks(chunks)
+    return chunks
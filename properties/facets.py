@@ -0,0 +1,102 @@
+"""
+Фасетные счетчики для панели фильтров списка объектов.
+
+Все фасеты считаются одним запросом с GROUPING SETS поверх
+отфильтрованного набора объектов и кэшируются на короткое время.
+"""
+
+from django.db import connections
+from django.db.models import Case, IntegerField, Value, When
+
+from .caching import get_listings_cache, versioned_key
+
+FACET_FIELDS = ("country", "city", "status", "condition", "rooms")
+
+# Границы ценовых диапазонов: [0, 50000), [50000, 100000), ..., [1000000, ∞)
+PRICE_BUCKETS = (50000, 100000, 200000, 500000, 1000000)
+
+CACHE_TIMEOUT = 30
+
+
+def price_bucket_expression():
+    """
+    Номер ценового диапазона (0..len(PRICE_BUCKETS)) по цене в базовой валюте.
+    Объекты без курса валюты (price_base IS NULL) в диапазоны не попадают.
+    """
+    return Case(
+        When(price_base__isnull=True, then=Value(None)),
+        *[
+            When(price_base__lt=bound, then=Value(index))
+            for index, bound in enumerate(PRICE_BUCKETS)
+        ],
+        default=Value(len(PRICE_BUCKETS)),
+        output_field=IntegerField(),
+    )
+
+
+def price_bucket_label(index):
+    low = PRICE_BUCKETS[index - 1] if index > 0 else 0
+    high = PRICE_BUCKETS[index] if index < len(PRICE_BUCKETS) else None
+    return {
+        "value": f"{low}-{high}" if high is not None else f"{low}+",
+        "min": low,
+        "max": high,
+    }
+
+
+def compute_facets(queryset):
+    """
+    Считает общее количество и счетчики по каждому фасету одним запросом.
+    """
+    columns = FACET_FIELDS + ("price_bucket",)
+    inner = (
+        queryset.order_by()
+        .annotate(price_bucket=price_bucket_expression())
+        .values(*columns)
+    )
+    inner_sql, params = inner.query.get_compiler(using=inner.db).as_sql()
+
+    quoted = [connections[inner.db].ops.quote_name(column) for column in columns]
+    grouping = ", ".join(f"GROUPING({column})" for column in quoted)
+    sets = ", ".join(f"({column})" for column in quoted)
+    sql = (
+        f"SELECT {', '.join(quoted)}, {grouping}, COUNT(*) "
+        f"FROM ({inner_sql}) AS filtered "
+        f"GROUP BY GROUPING SETS ({sets}, ())"
+    )
+
+    total = 0
+    facets = {field: [] for field in FACET_FIELDS}
+    facets["price"] = []
+    with connections[inner.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        for row in cursor.fetchall():
+            size = len(columns)
+            values, flags, count = row[:size], row[size:-1], row[-1]
+            if all(flags):
+                total = count
+                continue
+            index = flags.index(0)
+            if columns[index] == "price_bucket":
+                if values[index] is None:
+                    continue
+                facets["price"].append(
+                    dict(price_bucket_label(values[index]), count=count)
+                )
+            else:
+                facets[columns[index]].append({"value": values[index], "count": count})
+
+    for field in FACET_FIELDS:
+        facets[field].sort(key=lambda item: (-item["count"], str(item["value"])))
+    facets["price"].sort(key=lambda item: item["min"])
+    return {"count": total, "facets": facets}
+
+
+def get_facets(queryset, filter_key):
+    cache = get_listings_cache()
+    key = versioned_key("objects", "facets", filter_key)
+    result = cache.get(key)
+    if result is None:
+        result = compute_facets(queryset)
+        cache.set(key, result, CACHE_TIMEOUT)
+    return result
@@ -0,0 +1,149 @@
+"""
+Быстрая сериализация списков объектов только для чтения.
+
+Вместо создания экземпляров модели и вызова to_representation каждого
+поля сериализатора строки читаются через QuerySet.values(), а значения
+преобразуются заранее подготовленными функциями (Decimal, datetime, JSON).
+План преобразования строится по полям обычного сериализатора, поэтому
+результат совпадает с ObjectSerializer, включая выборочные поля.
+"""
+
+import decimal
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+# Поля, у которых to_representation не меняет значения, прочитанные из БД
+IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.FloatField,
+    serializers.IntegerField,
+    serializers.ReadOnlyField,
+)
+
+
+def decimal_converter(field):
+    """
+    То же, что DecimalField.to_representation для строкового вывода.
+    """
+    coerce_to_string = getattr(
+        field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING
+    )
+    if not coerce_to_string or field.localize or field.normalize_output:
+        return field.to_representation
+    if field.decimal_places is None:
+        return "{:f}".format
+
+    exponent = decimal.Decimal(".1") ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        return "{:f}".format(
+            value.quantize(exponent, rounding=rounding, context=context)
+        )
+
+    return convert
+
+
+def datetime_converter(field):
+    """
+    То же, что DateTimeField.to_representation для формата ISO 8601.
+    """
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    timezone = getattr(field, "timezone", None) or field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        value = value.astimezone(timezone).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+def get_converter(field):
+    """
+    Возвращает функцию преобразования значения или None, если значение
+    выводится как есть.
+    """
+    field_type = type(field)
+    if field_type is serializers.DecimalField:
+        return decimal_converter(field)
+    if field_type is serializers.DateTimeField:
+        return datetime_converter(field)
+    if field_type is serializers.JSONField and not field.binary:
+        return None
+    if field_type is serializers.PrimaryKeyRelatedField and field.pk_field is None:
+        return None
+    if field_type in IDENTITY_FIELDS:
+        return None
+    return field.to_representation
+
+
+class ValuesSerializer:
+    """
+    Сериализация строк values() по плану, построенному из полей сериализатора.
+
+    Поддерживаются поля, читающие колонку модели, и поля из
+    `projection_annotations` сериализатора. Для остальных полей
+    (например, SerializerMethodField без аннотации) `supported` равно
+    False, и нужно использовать обычный сериализатор.
+    """
+
+    def __init__(self, serializer):
+        model = serializer.Meta.model
+        concrete = {field.name for field in model._meta.concrete_fields}
+        annotations = getattr(serializer, "projection_annotations", {})
+
+        self.supported = True
+        self.columns = []
+        self.annotations = {}
+        self.plan = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in annotations:
+                self.annotations[name] = annotations[name]
+                self.plan.append((name, name, None))
+            elif field.source in concrete:
+                self.columns.append(field.source)
+                self.plan.append((name, field.source, get_converter(field)))
+            else:
+                self.supported = False
+
+    def get_queryset(self, queryset, extra=()):
+        """
+        Переводит queryset в values() с нужными колонками и аннотациями.
+
+        `extra` — дополнительные колонки или аннотации запроса (например,
+        поля сортировки для курсора пагинации).
+        """
+        existing = queryset.query.annotations
+        names = list(dict.fromkeys(self.columns + list(extra)))
+        names += [name for name in self.annotations if name in existing]
+        annotations = {
+            name: expression
+            for name, expression in self.annotations.items()
+            if name not in existing
+        }
+        return queryset.values(*names, **annotations)
+
+    def to_representation(self, rows):
+        plan = self.plan
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, convert in plan:
+                value = row[column]
+                if value is not None and convert is not None:
+                    value = convert(value)
+                item[name] = value
+            data.append(item)
+        return data
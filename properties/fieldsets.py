@@ -0,0 +1,91 @@
+"""
+Выборочные поля (sparse fieldsets) для API объектов недвижимости.
+
+Параметры запроса `fields=` и `exclude=` (списки через запятую) сокращают
+и ответ сериализатора, и SQL-проекцию: в запрос попадают только колонки,
+нужные выбранным полям (QuerySet.only()).
+"""
+
+from rest_framework.exceptions import ValidationError
+
+from .filters import ordering_fields
+
+
+def parse_field_list(value):
+    if not value:
+        return []
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+class SparseFieldsMixin:
+    """
+    Миксин сериализатора: оставляет поля из `fields=` и убирает поля из
+    `exclude=` для GET-запросов.
+
+    `projection_annotations` — поля, которые вычисляются в SQL аннотацией
+    (например, первое фото), а не читаются из колонок модели.
+    """
+
+    fields_param = "fields"
+    exclude_param = "exclude"
+    projection_annotations = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None or request.method != "GET":
+            return
+        requested = parse_field_list(request.query_params.get(self.fields_param))
+        excluded = parse_field_list(request.query_params.get(self.exclude_param))
+        if not requested and not excluded:
+            return
+
+        unknown = sorted(set(requested + excluded) - set(self.fields))
+        if unknown:
+            raise ValidationError(
+                {self.fields_param: f"Неизвестные поля: {', '.join(unknown)}."}
+            )
+        keep = set(requested) if requested else set(self.fields)
+        keep -= set(excluded)
+        for name in list(self.fields):
+            if name not in keep:
+                self.fields.pop(name)
+        self.sparse = True
+
+    def get_projection(self):
+        """
+        Возвращает (колонки модели, аннотации), нужные выбранным полям.
+        """
+        model = self.Meta.model
+        concrete = {field.name for field in model._meta.concrete_fields}
+        columns, annotations = {model._meta.pk.name}, {}
+        for name, field in self.fields.items():
+            if name in self.projection_annotations:
+                annotations[name] = self.projection_annotations[name]
+                continue
+            source = field.source.split(".")[0]
+            if source in concrete:
+                columns.add(source)
+        return columns, annotations
+
+
+class SparseFieldsQuerysetMixin:
+    """
+    Миксин представления: для GET-запросов с `fields=`/`exclude=`
+    ограничивает SQL-проекцию колонками выбранных полей и полей сортировки.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method != "GET":
+            return queryset
+        serializer = self.get_serializer()
+        if not getattr(serializer, "sparse", False):
+            return queryset
+
+        columns, annotations = serializer.get_projection()
+        concrete = {field.name for field in queryset.model._meta.concrete_fields}
+        for term in ordering_fields(queryset):
+            if term.lstrip("-") in concrete:
+                columns.add(term.lstrip("-"))
+        return queryset.only(*columns).annotate(**annotations)
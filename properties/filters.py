@@ -1,17 +1,39 @@
+import json
+
 import django_filters
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField, OrderBy
+from django.db.models.functions import Cast
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
+from .currency import BASE_CURRENCY, get_rate, normalize_currency
+from .geo import bbox_q, distance_km, radius_bbox
 from .models import RealEstateObject
 
+# Конфигурации полнотекстового поиска: описания хранятся на русском и английском
+SEARCH_CONFIGS = ("russian", "english")
+
 
 class RealEstateObjectFilter(django_filters.FilterSet):
     """
     Фильтры для объектов недвижимости.
+
+    `currency` — валюта границ price_min/price_max; цены в ответе она не
+    пересчитывает.
     """
 
-    price_min = django_filters.NumberFilter(field_name="price", lookup_expr="gte")
-    price_max = django_filters.NumberFilter(field_name="price", lookup_expr="lte")
+    price_min = django_filters.NumberFilter(method="filter_price")
+    price_max = django_filters.NumberFilter(method="filter_price")
+    currency = django_filters.CharFilter(method="filter_currency")
     country = django_filters.CharFilter(field_name="country", lookup_expr="iexact")
     city = django_filters.CharFilter(field_name="city", lookup_expr="iexact")
     status = django_filters.CharFilter(field_name="status", lookup_expr="iexact")
+    availability = django_filters.BooleanFilter(field_name="availability")
+    q = django_filters.CharFilter(method="filter_search")
+    bbox = django_filters.CharFilter(method="filter_bbox")
+    near = django_filters.CharFilter(method="filter_near")
+    radius_km = django_filters.NumberFilter(method="filter_radius_km")
+    features = django_filters.CharFilter(method="filter_features")
     # ordering = django_filters.OrderingFilter(
     #     fields=[
     #         ("price", "price"),
@@ -21,4 +43,272 @@ class RealEstateObjectFilter(django_filters.FilterSet):
 
     class Meta:
         model = RealEstateObject
-        fields = ["country", "city", "status", "price_min", "price_max"]
+        fields = [
+            "country",
+            "city",
+            "status",
+            "availability",
+            "price_min",
+            "price_max",
+            "currency",
+            "q",
+            "bbox",
+            "near",
+            "radius_km",
+            "features",
+        ]
+
+    default_radius_km = 10
+    max_radius_km = 500
+
+    def filter_price(self, queryset, name, value):
+        """
+        Фильтр по цене в валюте `currency` (по умолчанию базовая).
+
+        `currency` задает только валюту границ: цены в ответе остаются
+        в валюте объекта.
+
+        Граница переводится в базовую валюту один раз на запрос; сравнение
+        идет по индексируемой колонке price_base, поэтому объекты в разных
+        валютах сравниваются корректно.
+        """
+        lookup = "gte" if name == "price_min" else "lte"
+        bound = value * self.get_currency_rate()
+        return queryset.filter(**{f"price_base__{lookup}": bound})
+
+    def filter_currency(self, queryset, name, value):
+        # Используется в filter_price; проверяем, что курс известен
+        self.get_currency_rate()
+        return queryset
+
+    def get_currency_rate(self):
+        if not hasattr(self, "_currency_rate"):
+            currency = self.form.cleaned_data.get("currency") or BASE_CURRENCY
+            rate = get_rate(currency)
+            if rate is None:
+                raise ValidationError(
+                    {
+                        "currency": f"Нет курса для валюты {normalize_currency(currency)}."
+                    }
+                )
+            self._currency_rate = rate
+        return self._currency_rate
+
+    def filter_search(self, queryset, name, value):
+        """
+        Полнотекстовый поиск по названию и описаниям (ru/en).
+
+        Использует поле search_vector (GIN-индекс) и добавляет аннотацию
+        search_rank для сортировки по релевантности.
+        """
+        value = value.strip()
+        if not value:
+            return queryset
+        query = None
+        for config in SEARCH_CONFIGS:
+            part = SearchQuery(value, config=config, search_type="websearch")
+            query = part if query is None else query | part
+        # ts_rank возвращает real; приводим к double precision, чтобы значение
+        # точно восстанавливалось из курсора KeysetPagination
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=Cast(SearchRank(F("search_vector"), query), FloatField())
+        )
+
+    def filter_bbox(self, queryset, name, value):
+        """
+        Объекты внутри прямоугольника `min_lon,min_lat,max_lon,max_lat`.
+        """
+        min_lon, min_lat, max_lon, max_lat = self._parse_floats(name, value, 4)
+        if not (-90 <= min_lat <= max_lat <= 90):
+            raise ValidationError({name: "Некорректные границы широты."})
+        if not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180):
+            raise ValidationError({name: "Некорректные границы долготы."})
+        return queryset.filter(bbox_q(min_lat, min_lon, max_lat, max_lon))
+
+    def filter_near(self, queryset, name, value):
+        """
+        Объекты в радиусе `radius_km` от точки `lat,lon`.
+
+        Добавляет аннотацию distance (км) для сортировки `ordering=distance`.
+        """
+        latitude, longitude = self._parse_floats(name, value, 2)
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError({name: "Некорректные координаты."})
+        radius = self.form.cleaned_data.get("radius_km")
+        radius = float(radius) if radius is not None else self.default_radius_km
+        if not (0 < radius <= self.max_radius_km):
+            raise ValidationError(
+                {"radius_km": f"Радиус должен быть от 0 до {self.max_radius_km} км."}
+            )
+        return (
+            queryset.filter(bbox_q(*radius_bbox(latitude, longitude, radius)))
+            .annotate(distance=distance_km(latitude, longitude))
+            .filter(distance__lte=radius)
+        )
+
+    def filter_radius_km(self, queryset, name, value):
+        # Используется в filter_near
+        return queryset
+
+    def filter_features(self, queryset, name, value):
+        """
+        Фильтр по дополнительным характеристикам (JSON-поле features).
+
+        Синтаксис — условия через запятую, все должны выполняться:
+            - `pool` — ключ присутствует (`features ? 'pool'`);
+            - `parking:2`, `sea_view:true`, `heating:gas` — равенство
+              (значение разбирается как JSON, иначе считается строкой);
+            - `amenities:["gym","spa"]` — массив содержит элементы.
+        Можно передать и JSON-объект целиком: `{"pool": true}`.
+
+        Равенство и вхождение собираются в одно условие `features @> {...}`
+        (индекс jsonb_path_ops), наличие ключей — в `features ?& [...]`.
+        """
+        value = value.strip()
+        if not value:
+            return queryset
+        if value.startswith("{"):
+            try:
+                contains = json.loads(value)
+            except ValueError:
+                contains = None
+            if not isinstance(contains, dict):
+                raise ValidationError({name: "Некорректный JSON-объект."})
+            return queryset.filter(features__contains=contains)
+
+        keys, contains = [], {}
+        for term in self._split_terms(value):
+            key, separator, raw = term.partition(":")
+            key = key.strip()
+            if not key:
+                raise ValidationError({name: f"Не указан ключ в условии '{term}'."})
+            if not separator:
+                keys.append(key)
+                continue
+            raw = raw.strip()
+            try:
+                contains[key] = json.loads(raw)
+            except ValueError:
+                contains[key] = raw
+
+        if contains:
+            queryset = queryset.filter(features__contains=contains)
+        if keys:
+            queryset = queryset.filter(features__has_keys=keys)
+        return queryset
+
+    @staticmethod
+    def _split_terms(value):
+        """
+        Делит строку по запятым вне кавычек и скобок JSON-значений.
+        """
+        terms, current, depth, quoted = [], [], 0, False
+        for index, char in enumerate(value):
+            if char == '"' and (index == 0 or value[index - 1] != "\\"):
+                quoted = not quoted
+            elif not quoted and char in "[{":
+                depth += 1
+            elif not quoted and char in "]}":
+                depth -= 1
+            elif not quoted and depth == 0 and char == ",":
+                terms.append("".join(current))
+                current = []
+                continue
+            current.append(char)
+        terms.append("".join(current))
+        return [term.strip() for term in terms if term.strip()]
+
+    @staticmethod
+    def _parse_floats(name, value, count):
+        try:
+            numbers = [float(part) for part in value.split(",")]
+        except ValueError:
+            numbers = []
+        if len(numbers) != count:
+            raise ValidationError({name: f"Ожидается {count} числа через запятую."})
+        return numbers
+
+
+def ordering_fields(queryset):
+    """
+    Сортировка запроса в виде имен полей `name` / `-name`.
+
+    Выражения F(name).asc()/desc() (например, с nulls_last) приводятся
+    к именам; прочие выражения пропускаются.
+    """
+    terms = []
+    for term in queryset.query.order_by:
+        if isinstance(term, str):
+            terms.append(term)
+        elif isinstance(term, OrderBy) and isinstance(term.expression, F):
+            terms.append(("-" if term.descending else "") + term.expression.name)
+    return terms
+
+
+class RealEstateObjectOrderingFilter(OrderingFilter):
+    """
+    Сортировка списка объектов.
+
+    Если задан поисковый запрос `q` и явная сортировка не указана,
+    результаты упорядочиваются по релевантности (search_rank).
+
+    `ordering=price` сортирует по цене в базовой валюте (price_base);
+    объекты в валюте без курса (price_base NULL) идут в конце при любом
+    направлении сортировки.
+    """
+
+    search_param = "q"
+    # Поля сортировки, которые добавляются фильтрами как аннотации
+    # (distance — фильтром near) и доступны только вместе с ними
+    annotated_fields = ("search_rank", "distance")
+    # Поля сортировки API и колонки, по которым сортируется запрос
+    field_aliases = {"price": "price_base"}
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        aliased = []
+        for term in ordering:
+            prefix = "-" if term.startswith("-") else ""
+            aliased.append(
+                prefix + self.field_aliases.get(term.lstrip("-"), term.lstrip("-"))
+            )
+        return aliased
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        # id в конце делает порядок однозначным (как в KeysetPagination),
+        # в том числе для объектов без цены в базовой валюте
+        names = {term.lstrip("-") for term in ordering}
+        if "id" not in names and "pk" not in names:
+            ordering = [*ordering, ("-" if ordering[0].startswith("-") else "") + "id"]
+        return queryset.order_by(*[self.nulls_last(term) for term in ordering])
+
+    def nulls_last(self, term):
+        name = term.lstrip("-")
+        if name not in self.field_aliases.values():
+            return term
+        if term.startswith("-"):
+            return F(name).desc(nulls_last=True)
+        return F(name).asc(nulls_last=True)
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        fields = super().remove_invalid_fields(queryset, fields, view, request)
+        return [
+            term
+            for term in fields
+            if term.lstrip("-") not in self.annotated_fields
+            or term.lstrip("-") in queryset.query.annotations
+        ]
+
+    def get_default_ordering(self, view):
+        request = getattr(view, "request", None)
+        if (
+            request is not None
+            and request.query_params.get(self.search_param, "").strip()
+        ):
+            return ["-search_rank"]
+        return super().get_default_ordering(view)
@@ -0,0 +1,127 @@
+"""
+Геопоиск по координатам объектов недвижимости.
+
+Координаты индексируются через ячейки регулярной сетки: geo_cell — номер
+ячейки при построчном обходе сетки (row-major, кривая "растровой
+развертки"). Поле заполняется триггером БД (см. миграцию 0010) и
+индексируется B-tree. Прямоугольник на карте покрывается набором
+непрерывных диапазонов geo_cell (по одному на строку сетки), после чего
+точные координаты перепроверяются по latitude/longitude.
+"""
+
+import math
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import (
+    ASin,
+    Cast,
+    Cos,
+    Least,
+    Power,
+    Radians,
+    Sin,
+    Sqrt,
+)
+
+# Ячеек сетки на один градус (0.01° ≈ 1.1 км по широте).
+# Значения должны совпадать с триггером в миграции 0010.
+GRID_SCALE = 100
+GRID_ROWS = 180 * GRID_SCALE
+GRID_COLUMNS = 360 * GRID_SCALE
+
+# Максимальное число диапазонов в одном запросе. Для больших прямоугольников
+# используется один диапазон от первой до последней строки.
+MAX_CELL_RANGES = 128
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+
+def cell_row(latitude):
+    return max(0, min(int(math.floor((latitude + 90) * GRID_SCALE)), GRID_ROWS - 1))
+
+
+def cell_column(longitude):
+    return max(
+        0, min(int(math.floor((longitude + 180) * GRID_SCALE)), GRID_COLUMNS - 1)
+    )
+
+
+def geo_cell(latitude, longitude):
+    """
+    Номер ячейки сетки для точки (тот же расчет, что и в триггере БД).
+    """
+    return cell_row(latitude) * GRID_COLUMNS + cell_column(longitude)
+
+
+def _cell_ranges(min_lat, min_lon, max_lat, max_lon):
+    first_row, last_row = cell_row(min_lat), cell_row(max_lat)
+    first_col, last_col = cell_column(min_lon), cell_column(max_lon)
+    if last_row - first_row + 1 > MAX_CELL_RANGES:
+        return [
+            (
+                first_row * GRID_COLUMNS + first_col,
+                last_row * GRID_COLUMNS + last_col,
+            )
+        ]
+    return [
+        (row * GRID_COLUMNS + first_col, row * GRID_COLUMNS + last_col)
+        for row in range(first_row, last_row + 1)
+    ]
+
+
+def bbox_q(min_lat, min_lon, max_lat, max_lon):
+    """
+    Условие попадания в прямоугольник.
+
+    Если min_lon > max_lon, прямоугольник пересекает 180-й меридиан
+    и разбивается на две части.
+    """
+    if min_lon > max_lon:
+        return bbox_q(min_lat, min_lon, max_lat, 180) | bbox_q(
+            min_lat, -180, max_lat, max_lon
+        )
+    cells = Q()
+    for start, end in _cell_ranges(min_lat, min_lon, max_lat, max_lon):
+        cells |= Q(geo_cell__range=(start, end))
+    return cells & Q(
+        latitude__range=(min_lat, max_lat), longitude__range=(min_lon, max_lon)
+    )
+
+
+def radius_bbox(latitude, longitude, radius_km):
+    """
+    Прямоугольник, описанный вокруг круга радиуса radius_km.
+    """
+    lat_delta = radius_km / KM_PER_DEGREE
+    min_lat = max(latitude - lat_delta, -90.0)
+    max_lat = min(latitude + lat_delta, 90.0)
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat <= 1e-9 or radius_km / (KM_PER_DEGREE * cos_lat) >= 180:
+        return min_lat, -180.0, max_lat, 180.0
+    lon_delta = radius_km / (KM_PER_DEGREE * cos_lat)
+    min_lon = longitude - lon_delta
+    max_lon = longitude + lon_delta
+    if min_lon < -180:
+        min_lon += 360
+    if max_lon > 180:
+        max_lon -= 360
+    return min_lat, min_lon, max_lat, max_lon
+
+
+def distance_km(latitude, longitude):
+    """
+    Выражение расстояния (км) от точки до координат объекта по формуле гаверсинуса.
+    """
+    lat1 = Radians(Cast(F("latitude"), FloatField()))
+    lon1 = Radians(Cast(F("longitude"), FloatField()))
+    lat2 = Value(math.radians(latitude), output_field=FloatField())
+    lon2 = Value(math.radians(longitude), output_field=FloatField())
+    half = Value(2.0, output_field=FloatField())
+    a = Power(Sin((lat2 - lat1) / half), 2) + Cos(lat1) * Cos(lat2) * Power(
+        Sin((lon2 - lon1) / half), 2
+    )
+    one = Value(1.0, output_field=FloatField())
+    return Value(2 * EARTH_RADIUS_KM, output_field=FloatField()) * ASin(
+        Least(Sqrt(a), one)
+    )
@@ -0,0 +1,381 @@
+"""
+Уменьшенные копии фотографий объектов недвижимости.
+
+Для каждой фотографии из RealEstateObject.photos создаются варианты
+фиксированных размеров (VARIANTS) в форматах WebP и JPEG. Изображение
+декодируется с уменьшением (JPEG draft), поворачивается по EXIF Orientation,
+а варианты получаются последовательным уменьшением от большего к меньшему.
+Метаданные EXIF в варианты не копируются.
+
+Декодирование и кодирование выполняются в пуле процессов; чтение исходных
+файлов и запись вариантов в хранилище — в основном процессе. Файлы
+вариантов хранятся по содержимому (core.storage), ссылки на них
+сохраняются в RealEstateObject.photo_variants.
+
+Ссылки на фото задают брокеры: пути вне MEDIA_ROOT отклоняет хранилище,
+а по внешним ссылкам фото загружаются только с хостов PHOTO_SOURCE_HOSTS.
+Ошибка чтения отмечается у фото и не прерывает обработку.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from io import BytesIO
+from urllib.error import URLError
+from urllib.parse import urlsplit
+from urllib.request import HTTPRedirectHandler, build_opener
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousOperation
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Now
+from PIL import Image, ImageOps
+
+from core.storage import content_storage
+
+from .caching import invalidate_now_and_on_commit
+from .models import RealEstateObject
+
+# Варианты по убыванию размера: имя и рамка (ширина, высота), в которую
+# вписывается изображение. Изображения меньше рамки не увеличиваются.
+VARIANTS = (
+    ("full", (1920, 1440)),
+    ("card", (800, 600)),
+    ("thumb", (320, 240)),
+)
+# Форматы вариантов: расширение и параметры сохранения Pillow
+FORMATS = (
+    ("webp", {"format": "WEBP", "quality": 80, "method": 4}),
+    ("jpeg", {"format": "JPEG", "quality": 82, "progressive": True}),
+)
+
+# Ограничения для загрузки исходных фотографий по ссылке
+DOWNLOAD_TIMEOUT = 10
+MAX_SOURCE_SIZE = 30 * 1024 * 1024
+
+# Повороты EXIF Orientation, меняющие ширину и высоту местами
+TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+EXIF_ORIENTATION = 0x0112
+
+# Объекты, у которых есть фото без вариантов или варианты удаленных фото
+PENDING_SQL = """
+CASE WHEN jsonb_typeof(photos) = 'array' THEN
+    EXISTS (
+        SELECT 1 FROM jsonb_array_elements_text(photos) AS photo(source)
+        WHERE NOT photo_variants ? photo.source
+    )
+    OR EXISTS (
+        SELECT 1 FROM jsonb_object_keys(photo_variants) AS variant(source)
+        WHERE NOT photos ? variant.source
+    )
+ELSE photo_variants <> '{}'::jsonb END
+"""
+
+
+def fit(size, box):
+    """
+    Размер изображения `size`, вписанного в рамку `box` (без увеличения).
+    """
+    width, height = size
+    scale = min(box[0] / width, box[1] / height, 1)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def flatten(image):
+    """
+    Переводит изображение в RGB; прозрачность заменяется белым фоном.
+    """
+    if image.mode == "P":
+        image = image.convert("RGBA")
+    if image.mode in ("RGBA", "LA"):
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB") if image.mode != "RGB" else image
+
+
+def render_variants(data):
+    """
+    Создает варианты изображения из байтов исходного файла.
+
+    Выполняется в процессах пула, поэтому работает только с байтами.
+
+    Returns:
+        dict: {вариант: {"width", "height", расширение: байты}}.
+    """
+    with Image.open(BytesIO(data)) as source:
+        # Декодирование JPEG сразу с уменьшением до размера большего варианта
+        box = VARIANTS[0][1]
+        if source.getexif().get(EXIF_ORIENTATION) in TRANSPOSED_ORIENTATIONS:
+            box = box[::-1]
+        source.draft("RGB", fit(source.size, box))
+        icc_profile = source.info.get("icc_profile")
+        image = flatten(ImageOps.exif_transpose(source))
+
+    variants = {}
+    for name, box in VARIANTS:
+        size = fit(image.size, box)
+        if size != image.size:
+            image = image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+        variant = {"width": image.width, "height": image.height}
+        for extension, options in FORMATS:
+            buffer = BytesIO()
+            image.save(buffer, icc_profile=icc_profile, **options)
+            variant[extension] = buffer.getvalue()
+        variants[name] = variant
+    return variants
+
+
+def iter_rendered(items, workers):
+    """
+    Обрабатывает пары (ключ, байты) и возвращает (ключ, варианты или ошибка)
+    в порядке готовности.
+
+    При workers > 1 используется пул процессов; в обработке одновременно
+    находится не более 2 * workers изображений, чтобы не держать в памяти
+    все исходные файлы.
+    """
+    if workers <= 1:
+        for key, data in items:
+            try:
+                yield key, render_variants(data)
+            except Exception as exc:
+                yield key, exc
+        return
+
+    items = iter(items)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        while True:
+            while len(pending) < 2 * workers:
+                item = next(items, None)
+                if item is None:
+                    break
+                key, data = item
+                pending[executor.submit(render_variants, data)] = key
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                try:
+                    yield key, future.result()
+                except Exception as exc:
+                    yield key, exc
+
+
+def storage_name(source):
+    """
+    Имя файла в хранилище для ссылки на фото или None для внешних ссылок.
+    """
+    if source.startswith(("http://", "https://")):
+        return None
+    return source.removeprefix(settings.MEDIA_URL).lstrip("/")
+
+
+def check_source_host(url):
+    """
+    Проверяет, что фото по внешней ссылке можно загрузить с ее хоста.
+    """
+    host = urlsplit(url).hostname
+    if host is None or host.lower() not in settings.PHOTO_SOURCE_HOSTS:
+        raise ValueError(f"Загрузка фото с хоста {host} не разрешена.")
+
+
+class SourceRedirectHandler(HTTPRedirectHandler):
+    """
+    Переадресация только на разрешенные хосты (PHOTO_SOURCE_HOSTS).
+    """
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        check_source_host(newurl)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+def read_source(source):
+    """
+    Читает исходную фотографию из хранилища или по внешней ссылке.
+
+    Raises:
+        SuspiciousOperation: Путь указывает за пределы хранилища.
+        ValueError: Хост ссылки не разрешен или файл слишком большой.
+    """
+    name = storage_name(source)
+    if name is not None:
+        with default_storage.open(name, "rb") as file:
+            return file.read()
+    check_source_host(source)
+    opener = build_opener(SourceRedirectHandler)
+    with opener.open(source, timeout=DOWNLOAD_TIMEOUT) as response:
+        data = response.read(MAX_SOURCE_SIZE + 1)
+    if len(data) > MAX_SOURCE_SIZE:
+        raise ValueError("Файл фотографии слишком большой.")
+    return data
+
+
+def save_variants(variants):
+    """
+    Записывает варианты в хранилище и возвращает их описание со ссылками.
+
+    Хранилище адресуется по содержимому (core.storage): одинаковые варианты
+    разных объектов хранятся один раз, каждая запись — ссылка на файл.
+    """
+    result = {}
+    try:
+        for name, variant in variants.items():
+            result[name] = {"width": variant["width"], "height": variant["height"]}
+            for extension, _ in FORMATS:
+                path = content_storage.save(
+                    f"{name}.{extension}", ContentFile(variant[extension])
+                )
+                result[name][extension] = content_storage.url(path)
+    except Exception:
+        # Уже записанные варианты фото не попадут в photo_variants
+        release_variants(result)
+        raise
+    return result
+
+
+def release_variants(variants):
+    """
+    Освобождает ссылки на файлы вариантов одного фото.
+    """
+    for variant in variants.values():
+        if not isinstance(variant, dict):
+            continue
+        for extension, _ in FORMATS:
+            if variant.get(extension):
+                content_storage.release(storage_name(variant[extension]))
+
+
+def release_all(variants_list):
+    """
+    Освобождает ссылки на варианты нескольких фото.
+    """
+    for variants in variants_list:
+        release_variants(variants)
+
+
+def pending_objects(force=False):
+    """
+    Объекты, варианты фотографий которых нужно создать или обновить.
+    """
+    queryset = RealEstateObject.objects.order_by("id")
+    if not force:
+        queryset = queryset.filter(RawSQL(PENDING_SQL, [], output_field=BooleanField()))
+    return queryset
+
+
+class PhotoVariantGenerator:
+    """
+    Создание вариантов фотографий объектов пакетами.
+
+    Args:
+        workers (int): Количество процессов пула (по умолчанию — число ядер).
+        force (bool): Пересоздать варианты всех фотографий.
+    """
+
+    def __init__(self, workers=None, force=False):
+        self.workers = workers or os.cpu_count() or 1
+        self.force = force
+        self.processed = 0
+        self.failed = 0
+
+    def run(self, queryset=None, batch_size=100):
+        """
+        Обрабатывает объекты `queryset` (по умолчанию — pending_objects()).
+
+        Returns:
+            int: Количество обновленных объектов.
+        """
+        if queryset is None:
+            queryset = pending_objects(self.force)
+        rows = queryset.values_list("id", "photos", "photo_variants")
+        updated = 0
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                updated += self.process_batch(batch)
+                batch = []
+        if batch:
+            updated += self.process_batch(batch)
+        return updated
+
+    def process_batch(self, rows):
+        """
+        Создает варианты фотографий пакета объектов `rows` — кортежей
+        (id, photos, photo_variants) — и сохраняет ссылки на них.
+
+        Фото, которое встречается у нескольких объектов пакета,
+        обрабатывается один раз. Фото читаются и обрабатываются вне
+        транзакции; транзакция открывается только для сохранения пакета.
+        """
+        variants, owners, released = {}, {}, []
+        for pk, photos, current in rows:
+            photos = [photo for photo in photos or [] if isinstance(photo, str)]
+            current = current or {}
+            for source in set(current) - set(photos):
+                released.append(current[source])
+            variants[pk] = {}
+            for source in dict.fromkeys(photos):
+                if source in current and not self.force:
+                    variants[pk][source] = current[source]
+                    continue
+                if source in current:
+                    released.append(current[source])
+                owners.setdefault(source, []).append(pk)
+
+        # Старые ссылки освобождаются только после коммита, чтобы сбой
+        # пакета не оставил в photo_variants файлы, которые удалит gc_media;
+        # при сбое освобождаются новые ссылки пакета
+        created = []
+        try:
+            items = self.read_sources(owners, variants)
+            for source, result in iter_rendered(items, self.workers):
+                if isinstance(result, Exception):
+                    self.set_failure(owners[source], source, result, variants)
+                    continue
+                self.processed += 1
+                for pk in owners[source]:
+                    variants[pk][source] = save_variants(result)
+                    created.append(variants[pk][source])
+
+            # bulk_update не обновляет auto_now и не отправляет сигналы:
+            # updated_at меняется для валидаторов ETag/Last-Modified, кэш
+            # объектов инвалидируется явно
+            objects = [
+                RealEstateObject(id=pk, photo_variants=photo_variants, updated_at=Now())
+                for pk, photo_variants in variants.items()
+            ]
+            with transaction.atomic():
+                RealEstateObject.objects.bulk_update(
+                    objects, ["photo_variants", "updated_at"]
+                )
+                invalidate_now_and_on_commit(
+                    "objects", *(f"object:{pk}" for pk in variants)
+                )
+                transaction.on_commit(lambda: release_all(released))
+        except Exception:
+            release_all(created)
+            raise
+        return len(objects)
+
+    def read_sources(self, owners, variants):
+        """
+        Пары (фото, байты) для обработки; ошибки чтения сохраняются сразу.
+        """
+        for source, pks in owners.items():
+            try:
+                yield source, read_source(source)
+            except (OSError, URLError, ValueError, SuspiciousOperation) as exc:
+                self.set_failure(pks, source, exc, variants)
+
+    def set_failure(self, pks, source, exc, variants):
+        # Фото с ошибкой не обрабатывается повторно, пока его не заменят
+        self.failed += 1
+        for pk in pks:
+            variants[pk][source] = {"error": str(exc) or type(exc).__name__}
@@ -0,0 +1,240 @@
+"""
+Массовый импорт объектов недвижимости из CSV и JSONL.
+
+Файл читается потоково, строка за строкой; в памяти держится только
+текущая пачка (batch_size строк). Для каждой пачки:
+    - строки валидируются одним экземпляром ObjectSerializer;
+    - дубли адресов ищутся по address_key одним запросом на всю пачку
+      (и внутри пачки);
+    - корректные строки вставляются через bulk_create. Если БД отклонила
+      пачку (например, параллельная запись заняла адрес), пачка вставляется
+      построчно, и ошибочные строки попадают в отчет.
+
+Поисковый вектор, ячейка геосетки, price_base и address_key заполняются
+триггерами БД.
+Ошибки передаются в on_error по мере обработки, поэтому отчет может
+писаться в файл, не накапливаясь в памяти.
+"""
+
+import csv
+import io
+import json
+
+from django.db import IntegrityError, reset_queries, transaction
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from .addresses import (
+    DUPLICATE_ADDRESS_ERROR,
+    is_duplicate_address_error,
+    make_address_key,
+)
+from .caching import invalidate
+from .models import RealEstateObject
+from .serializers import ObjectSerializer
+
+FORMATS = ("csv", "jsonl")
+BATCH_SIZE = 1000
+
+# Колонки CSV, значения которых записаны как JSON
+JSON_COLUMNS = ("features", "photos", "videos")
+
+SAVE_ERROR = "Не удалось сохранить объект: данные нарушают ограничения БД."
+
+
+def detect_format(filename):
+    """
+    Формат по расширению файла (.csv, .jsonl, .ndjson) или None.
+    """
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return None
+
+
+def _text_stream(stream):
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+
+def iter_csv(stream):
+    """
+    Возвращает пары (номер строки, данные или ValidationError).
+    Пустые значения пропускаются, чтобы сработали значения по умолчанию.
+    """
+    reader = csv.DictReader(_text_stream(stream))
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            yield reader.line_num, ValidationError({"row": str(exc)})
+            continue
+
+        data = {}
+        try:
+            for key, value in row.items():
+                if key is None or value is None or value == "":
+                    continue
+                key = key.strip()
+                if key in JSON_COLUMNS:
+                    value = json.loads(value)
+                data[key] = value
+        except ValueError:
+            yield reader.line_num, ValidationError({key: "Некорректный JSON."})
+            continue
+        yield reader.line_num, data
+
+
+def iter_jsonl(stream):
+    """
+    Возвращает пары (номер строки, данные или ValidationError).
+    """
+    for number, line in enumerate(_text_stream(stream), start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield number, ValidationError({"row": "Некорректный JSON."})
+            continue
+        if not isinstance(data, dict):
+            yield number, ValidationError({"row": "Ожидается JSON-объект."})
+            continue
+        yield number, data
+
+
+def iter_rows(stream, file_format):
+    if file_format == "csv":
+        return iter_csv(stream)
+    if file_format == "jsonl":
+        return iter_jsonl(stream)
+    raise ValueError(f"Неподдерживаемый формат: {file_format}")
+
+
+def address_key(attrs):
+    return make_address_key(
+        attrs.get("country"),
+        attrs.get("city"),
+        attrs.get("district"),
+        attrs.get("address"),
+    )
+
+
+def find_existing_addresses(keys):
+    """
+    Ключи адресов из `keys`, которые уже заняты, — одним запросом на пачку.
+    """
+    if not keys:
+        return set()
+    return set(
+        RealEstateObject.objects.filter(address_key__in=keys)
+        .filter(Q(complex_name__isnull=True) | Q(complex_name=""))
+        .values_list("address_key", flat=True)
+    )
+
+
+class ObjectImporter:
+    """
+    Импорт объектов от имени брокера.
+
+    Args:
+        broker (User): Брокер, к которому привязываются объекты.
+        batch_size (int): Размер пачки валидации и вставки.
+        dry_run (bool): Только проверить строки, ничего не сохраняя.
+        on_error (callable): Вызывается как on_error(номер строки, ошибки).
+    """
+
+    def __init__(self, broker, batch_size=BATCH_SIZE, dry_run=False, on_error=None):
+        self.broker = broker
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.on_error = on_error or (lambda number, errors: None)
+        # Один экземпляр сериализатора на весь импорт
+        self.serializer = ObjectSerializer()
+        self.stats = {"total": 0, "created": 0, "failed": 0}
+
+    def run(self, stream, file_format):
+        batch = []
+        for number, data in iter_rows(stream, file_format):
+            self.stats["total"] += 1
+            batch.append((number, data))
+            if len(batch) >= self.batch_size:
+                self.process_batch(batch)
+                batch = []
+        if batch:
+            self.process_batch(batch)
+        if self.stats["created"]:
+            invalidate("objects")
+        return self.stats
+
+    def process_batch(self, batch):
+        valid = []
+        for number, data in batch:
+            if isinstance(data, ValidationError):
+                self.fail(number, data.detail)
+                continue
+            try:
+                valid.append((number, self.serializer.run_validation(data)))
+            except ValidationError as exc:
+                self.fail(number, exc.detail)
+
+        # Дубли адресов (без complex_name): в БД и внутри самой пачки
+        keys = {
+            address_key(attrs) for _, attrs in valid if not attrs.get("complex_name")
+        }
+        taken = find_existing_addresses(keys)
+        pending = []
+        for number, attrs in valid:
+            if not attrs.get("complex_name"):
+                key = address_key(attrs)
+                if key in taken:
+                    self.fail(number, {"address": [DUPLICATE_ADDRESS_ERROR]})
+                    continue
+                taken.add(key)
+            pending.append((number, self.build_object(attrs)))
+
+        if pending and not self.dry_run:
+            try:
+                with transaction.atomic():
+                    RealEstateObject.objects.bulk_create([obj for _, obj in pending])
+            except IntegrityError:
+                pending = self.save_each(pending)
+        self.stats["created"] += len(pending)
+        # При DEBUG журнал запросов с INSERT на тысячи строк растет вместе с файлом
+        reset_queries()
+
+    def build_object(self, attrs):
+        # Сериализатор допускает null в JSON-полях, а столбцы NOT NULL:
+        # null заменяется значением по умолчанию модели
+        for name in JSON_COLUMNS:
+            if name in attrs and attrs[name] is None:
+                del attrs[name]
+        return RealEstateObject(broker=self.broker, **attrs)
+
+    def save_each(self, pending):
+        """
+        Построчная вставка пачки, если пачку отклонила БД (например, адрес
+        занят параллельной записью). Возвращает сохраненные строки.
+        """
+        saved = []
+        for number, obj in pending:
+            try:
+                with transaction.atomic():
+                    obj.save(force_insert=True)
+            except IntegrityError as exc:
+                if is_duplicate_address_error(exc):
+                    self.fail(number, {"address": [DUPLICATE_ADDRESS_ERROR]})
+                else:
+                    self.fail(number, {"row": [SAVE_ERROR]})
+            else:
+                saved.append((number, obj))
+        return saved
+
+    def fail(self, number, errors):
+        self.stats["failed"] += 1
+        self.on_error(number, errors)
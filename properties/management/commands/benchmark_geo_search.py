@@ -0,0 +1,88 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from properties.benchmarking import (
+    create_benchmark_broker,
+    create_synthetic_objects,
+    measure,
+)
+from properties.geo import bbox_q, distance_km, radius_bbox
+from properties.models import RealEstateObject
+
+
+class Command(BaseCommand):
+    """
+    Замер геопоиска (bbox и радиус) на синтетическом наборе точек.
+
+    Точки равномерно распределены по прямоугольнику 35..60° с.ш., -10..40° в.д.
+    Все данные создаются внутри транзакции и откатываются после замеров.
+
+    Пример:
+        python manage.py benchmark_geo_search --count 1000000
+    """
+
+    help = "Замер bbox/near-запросов по координатам на синтетических данных."
+
+    center = (48.8566, 2.3522)
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Не откатывать синтетические данные после замеров.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            broker = create_benchmark_broker()
+            self.stdout.write(f"Создание {options['count']} синтетических объектов...")
+            create_synthetic_objects(options["count"], broker)
+
+            for label, func in self.get_scenarios():
+                median, worst, rows = measure(func, options["repeat"])
+                self.stdout.write(
+                    f"{label:<40} строк: {rows:>7}  "
+                    f"медиана: {median:8.2f} мс  максимум: {worst:8.2f} мс"
+                )
+
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+    def get_scenarios(self):
+        lat, lon = self.center
+        queryset = RealEstateObject.objects.all()
+
+        def bbox(size):
+            return lambda: len(
+                queryset.filter(
+                    bbox_q(lat - size, lon - size, lat + size, lon + size)
+                ).values_list("id", flat=True)
+            )
+
+        def naive_bbox(size):
+            return lambda: len(
+                queryset.filter(
+                    latitude__range=(lat - size, lat + size),
+                    longitude__range=(lon - size, lon + size),
+                ).values_list("id", flat=True)
+            )
+
+        def near(radius):
+            return lambda: len(
+                queryset.filter(bbox_q(*radius_bbox(lat, lon, radius)))
+                .annotate(distance=distance_km(lat, lon))
+                .filter(distance__lte=radius)
+                .order_by("distance")
+                .values_list("id", flat=True)[:100]
+            )
+
+        return [
+            ("bbox 0.05° (geo_cell)", bbox(0.05)),
+            ("bbox 0.05° (latitude/longitude)", naive_bbox(0.05)),
+            ("bbox 0.5° (geo_cell)", bbox(0.5)),
+            ("bbox 0.5° (latitude/longitude)", naive_bbox(0.5)),
+            ("near 2 км, по расстоянию, 100 строк", near(2)),
+            ("near 25 км, по расстоянию, 100 строк", near(25)),
+        ]
@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.test import APIRequestFactory
+
+from properties.benchmarking import (
+    create_benchmark_broker,
+    create_synthetic_objects,
+    measure,
+)
+from properties.fast_serializers import ValuesSerializer
+from properties.models import RealEstateObject
+from properties.serializers import ObjectSerializer
+
+
+class Command(BaseCommand):
+    """
+    Сравнение ObjectSerializer(many=True) и быстрого пути ValuesSerializer.
+
+    Замеряется выборка и сериализация страниц разного размера (по умолчанию
+    1, 100 и 1000 строк); результаты обоих путей сверяются. Синтетические
+    данные создаются внутри транзакции и откатываются после замеров.
+
+    Пример:
+        python manage.py benchmark_list_serializers --rows 1 100 1000
+    """
+
+    help = "Замер сериализации списка объектов: ObjectSerializer и values()."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[1, 100, 1000])
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--fields",
+            default="",
+            help="Выборочные поля, как в параметре fields= (по умолчанию все).",
+        )
+
+    def handle(self, *args, **options):
+        path = "/api/objects/"
+        if options["fields"]:
+            path += f"?fields={options['fields']}"
+        request = APIRequestFactory().get(path)
+        request.query_params = request.GET
+        context = {"request": request}
+
+        with transaction.atomic():
+            broker = create_benchmark_broker()
+            create_synthetic_objects(
+                max(options["rows"]),
+                broker,
+                columns={
+                    "description_ru": "repeat('Описание объекта ', 20)",
+                    "features": """'{"pool": true, "parking": 2}'::jsonb""",
+                    "photos": """jsonb_build_array(g || '-1.jpg', g || '-2.jpg')""",
+                },
+            )
+            queryset = RealEstateObject.objects.order_by("-created_at", "-id")
+
+            for rows in options["rows"]:
+                page = queryset[:rows]
+                fast = ValuesSerializer(ObjectSerializer(context=context))
+
+                def serializer_path():
+                    return ObjectSerializer(page, many=True, context=context).data
+
+                def values_path():
+                    return fast.to_representation(fast.get_queryset(page))
+
+                slow_median, slow_worst, expected = measure(
+                    serializer_path, options["repeat"]
+                )
+                fast_median, fast_worst, actual = measure(
+                    values_path, options["repeat"]
+                )
+                if [dict(item) for item in expected] != actual:
+                    raise CommandError(f"Результаты различаются для {rows} строк.")
+
+                self.stdout.write(
+                    f"строк: {rows:>5}  "
+                    f"ObjectSerializer: {slow_median:8.2f} мс (макс. {slow_worst:.2f})  "
+                    f"values(): {fast_median:8.2f} мс (макс. {fast_worst:.2f})  "
+                    f"ускорение: {slow_median / fast_median:5.1f}x"
+                )
+
+            transaction.set_rollback(True)
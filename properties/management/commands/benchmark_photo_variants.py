@@ -0,0 +1,87 @@
+import os
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+from properties.images import EXIF_ORIENTATION, VARIANTS, iter_rendered
+
+
+def synthetic_photo(width, height, seed):
+    """
+    JPEG с шумом и EXIF Orientation = 6 (поворот на 90°), как снимок с телефона.
+    """
+    noise = Image.effect_noise((width, height), 40 + seed)
+    gradient = Image.linear_gradient("L").resize((width, height))
+    image = Image.merge(
+        "RGB", (noise, gradient, noise.transpose(Image.FLIP_LEFT_RIGHT))
+    )
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=90, exif=exif)
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    """
+    Замер пропускной способности создания вариантов фотографий.
+
+    Синтетические JPEG обрабатываются последовательно и в пуле процессов;
+    выводится количество изображений в секунду всего и на одно ядро.
+    Хранилище и БД не используются.
+
+    Пример:
+        python manage.py benchmark_photo_variants --images 64 --workers 1 4
+    """
+
+    help = "Замер создания вариантов фотографий: изображений в секунду на ядро."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--images", type=int, default=48)
+        parser.add_argument("--width", type=int, default=4000)
+        parser.add_argument("--height", type=int, default=3000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            nargs="+",
+            default=sorted({1, os.cpu_count() or 1}),
+        )
+
+    def handle(self, *args, **options):
+        if options["images"] < 1 or min(options["workers"]) < 1:
+            raise CommandError(
+                "Количество изображений и процессов должно быть положительным."
+            )
+
+        photos = [
+            synthetic_photo(options["width"], options["height"], seed)
+            for seed in range(4)
+        ]
+        size_mb = sum(map(len, photos)) / len(photos) / 1024 / 1024
+        self.stdout.write(
+            f"изображений: {options['images']}, {options['width']}x{options['height']} "
+            f"JPEG (~{size_mb:.1f} МБ), вариантов: {len(VARIANTS)} x WebP/JPEG"
+        )
+
+        for workers in options["workers"]:
+            items = (
+                (index, photos[index % len(photos)])
+                for index in range(options["images"])
+            )
+            started = time.perf_counter()
+            failed = [
+                key
+                for key, result in iter_rendered(items, workers)
+                if isinstance(result, Exception)
+            ]
+            elapsed = time.perf_counter() - started
+            if failed:
+                raise CommandError(f"Ошибки обработки изображений: {len(failed)}.")
+
+            rate = options["images"] / elapsed
+            self.stdout.write(
+                f"процессов: {workers:>3}  время: {elapsed:7.2f} с  "
+                f"изображений/с: {rate:7.2f}  на ядро: {rate / workers:6.2f}"
+            )
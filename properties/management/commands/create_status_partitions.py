@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.status_history import PARTITION_MONTHS_AHEAD, ensure_partitions
+
+
+class Command(BaseCommand):
+    """
+    Создает месячные секции истории статусов объектов заранее.
+
+    Запускается по расписанию (например, раз в месяц). Строки, попавшие в
+    секцию по умолчанию, переносятся в созданную секцию своего месяца.
+
+    Пример:
+        python manage.py create_status_partitions --months 6
+    """
+
+    help = "Создание месячных секций истории статусов объектов."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=PARTITION_MONTHS_AHEAD,
+            help="На сколько месяцев вперед создать секции",
+        )
+
+    def handle(self, *args, **options):
+        if options["months"] < 0:
+            raise CommandError("Количество месяцев не может быть отрицательным.")
+        created = ensure_partitions(options["months"])
+        for name in created:
+            self.stdout.write(f"Создана секция {name}.")
+        self.stdout.write(f"Создано секций: {len(created)}.")
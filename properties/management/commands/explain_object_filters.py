@@ -0,0 +1,121 @@
+from itertools import combinations
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import QueryDict
+
+from properties.filters import RealEstateObjectFilter
+from properties.models import RealEstateObject
+
+
+class Command(BaseCommand):
+    """
+    Выполняет EXPLAIN для комбинаций фильтров RealEstateObjectFilter и
+    сообщает, какие из них всё ещё используют последовательное сканирование.
+
+    Пример:
+        python manage.py explain_object_filters --disable-seqscan
+    """
+
+    help = (
+        "EXPLAIN для комбинаций фильтров списка объектов недвижимости "
+        "с отчетом о запросах, выполняющих Seq Scan."
+    )
+
+    filter_params = ["country", "city", "status", "availability", "price"]
+    # price сортируется по цене в базовой валюте (см. RealEstateObjectOrderingFilter)
+    orderings = ["-created_at", "price_base"]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Выполнять EXPLAIN ANALYZE (запросы реально выполняются).",
+        )
+        parser.add_argument(
+            "--disable-seqscan",
+            action="store_true",
+            help=(
+                "Отключить enable_seqscan на время проверки, чтобы увидеть, "
+                "может ли планировщик использовать индекс (полезно на малых таблицах)."
+            ),
+        )
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help="Печатать полный план для каждой комбинации.",
+        )
+
+    def handle(self, *args, **options):
+        sample = self.get_sample_values()
+        table = RealEstateObject._meta.db_table
+        seq_scans = []
+        total = 0
+
+        with transaction.atomic():
+            if options["disable_seqscan"]:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            for params in self.get_combinations():
+                for ordering in self.orderings:
+                    total += 1
+                    label = self.describe(params, ordering)
+                    queryset = self.build_queryset(params, ordering, sample)
+                    plan = queryset.explain(analyze=options["analyze"])
+
+                    if f"Seq Scan on {table}" in plan:
+                        seq_scans.append(label)
+                        self.stdout.write(self.style.WARNING(f"SEQ SCAN  {label}"))
+                    else:
+                        self.stdout.write(self.style.SUCCESS(f"INDEX     {label}"))
+                    if options["verbose_plans"]:
+                        self.stdout.write(plan)
+
+        self.stdout.write(
+            f"Проверено комбинаций: {total}, с последовательным сканированием: "
+            f"{len(seq_scans)}."
+        )
+
+    def get_combinations(self):
+        for size in range(1, len(self.filter_params) + 1):
+            yield from combinations(self.filter_params, size)
+
+    def get_sample_values(self):
+        """
+        Берет значения фильтров из существующего объекта, чтобы планировщик
+        оценивал селективность на реальных данных.
+        """
+        obj = RealEstateObject.objects.order_by("id").first()
+        if obj is None:
+            return {
+                "country": "Country",
+                "city": "City",
+                "status": "sale",
+                "price": 100000,
+            }
+        return {
+            "country": obj.country,
+            "city": obj.city,
+            "status": obj.status,
+            "price": obj.price_base if obj.price_base is not None else obj.price,
+        }
+
+    def build_queryset(self, params, ordering, sample):
+        data = QueryDict(mutable=True)
+        for param in params:
+            if param == "price":
+                data["price_min"] = str(sample["price"])
+                data["price_max"] = str(sample["price"] * 2)
+            elif param == "availability":
+                data["availability"] = "true"
+            else:
+                data[param] = sample[param]
+        filterset = RealEstateObjectFilter(
+            data=data, queryset=RealEstateObject.objects.all()
+        )
+        return filterset.qs.order_by(ordering, "-id" if ordering[0] == "-" else "id")
+
+    @staticmethod
+    def describe(params, ordering):
+        return f"{', '.join(params)} | ordering={ordering}"
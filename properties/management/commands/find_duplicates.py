@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.duplicates import (
+    AREA_TOLERANCE,
+    CHUNK_SIZE,
+    PRICE_TOLERANCE,
+    THRESHOLD,
+    DuplicateDetector,
+)
+
+
+class Command(BaseCommand):
+    """
+    Ищет вероятные дубли объектов недвижимости и сохраняет пары в
+    DuplicateCandidate (отчет — в админке, раздел "Duplicate candidates").
+
+    По умолчанию проверяются только объекты, измененные после прошлого
+    завершенного запуска; первый запуск и --full проверяют все объекты.
+
+    Пример:
+        python manage.py find_duplicates --threshold 0.7
+    """
+
+    help = "Поиск вероятных дублей объектов недвижимости (инкрементально)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Проверить все объекты, а не только измененные.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=THRESHOLD,
+            help=f"Минимальная оценка пары от 0 до 1 (по умолчанию {THRESHOLD}).",
+        )
+        parser.add_argument(
+            "--area-tolerance",
+            type=float,
+            default=AREA_TOLERANCE,
+            help=f"Допуск расхождения площади (по умолчанию {AREA_TOLERANCE}).",
+        )
+        parser.add_argument(
+            "--price-tolerance",
+            type=float,
+            default=PRICE_TOLERANCE,
+            help=f"Допуск расхождения цены (по умолчанию {PRICE_TOLERANCE}).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help=f"Объектов на один запрос (по умолчанию {CHUNK_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        if not 0 < options["threshold"] <= 1:
+            raise CommandError("Порог должен быть в диапазоне (0, 1].")
+        if options["chunk_size"] < 1:
+            raise CommandError("Размер чанка должен быть положительным.")
+
+        detector = DuplicateDetector(
+            threshold=options["threshold"],
+            area_tolerance=options["area_tolerance"],
+            price_tolerance=options["price_tolerance"],
+            chunk_size=options["chunk_size"],
+        )
+        scan = detector.run(full=options["full"])
+        seconds = (scan.finished_at - scan.started_at).total_seconds()
+        self.stdout.write(
+            f"Проверено объектов: {scan.checked}, найдено пар: {scan.found} "
+            f"за {seconds:.1f} с."
+        )
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.images import PhotoVariantGenerator
+
+
+class Command(BaseCommand):
+    """
+    Создает уменьшенные копии фотографий объектов (см. properties.images).
+
+    Обрабатываются объекты с новыми фотографиями или с вариантами удаленных
+    фотографий; запускается в фоне по расписанию. Изображения обрабатываются
+    в пуле процессов.
+
+    Пример:
+        python manage.py generate_photo_variants --workers 4
+    """
+
+    help = "Создание вариантов фотографий объектов (thumb/card/full, WebP и JPEG)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Количество процессов (по умолчанию — число ядер)",
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Пересоздать варианты всех фотографий",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] is not None and options["workers"] < 1:
+            raise CommandError("Количество процессов должно быть положительным.")
+        if options["batch_size"] < 1:
+            raise CommandError("Размер пакета должен быть положительным.")
+
+        generator = PhotoVariantGenerator(options["workers"], force=options["force"])
+        updated = generator.run(batch_size=options["batch_size"])
+        self.stdout.write(
+            f"Обновлено объектов: {updated}, обработано фото: {generator.processed}, "
+            f"ошибок: {generator.failed}."
+        )
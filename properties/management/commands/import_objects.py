@@ -0,0 +1,79 @@
+import csv
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.imports import BATCH_SIZE, FORMATS, ObjectImporter, detect_format
+
+
+class Command(BaseCommand):
+    """
+    Массовый импорт объектов недвижимости из CSV или JSONL.
+
+    Файл читается потоково, пачками по --batch-size строк, поэтому память
+    не зависит от размера файла. Ошибки по строкам пишутся в отчет
+    (--report, CSV: row, field, message) по мере обработки.
+
+    Пример:
+        python manage.py import_objects objects.csv --broker agent@example.com \\
+            --report errors.csv
+    """
+
+    help = "Импорт объектов недвижимости из CSV/JSONL с отчетом об ошибках."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--broker", required=True, help="Email брокера.")
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--report", help="Файл отчета об ошибках (CSV).")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только проверить файл, ничего не сохраняя.",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            broker = User.objects.get(email=options["broker"])
+        except User.DoesNotExist:
+            raise CommandError(f"Пользователь {options['broker']} не найден.")
+
+        file_format = options["format"] or detect_format(options["path"])
+        if file_format is None:
+            raise CommandError("Не удалось определить формат, укажите --format.")
+
+        report = open(options["report"], "w", newline="") if options["report"] else None
+        writer = csv.writer(report) if report else None
+        if writer:
+            writer.writerow(["row", "field", "message"])
+
+        def on_error(number, errors):
+            if writer is None:
+                self.stderr.write(f"Строка {number}: {errors}")
+                return
+            for field, messages in errors.items():
+                if not isinstance(messages, list):
+                    messages = [messages]
+                for message in messages:
+                    writer.writerow([number, field, message])
+
+        importer = ObjectImporter(
+            broker,
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+            on_error=on_error,
+        )
+        try:
+            with open(options["path"], "rb") as stream:
+                stats = importer.run(stream, file_format)
+        finally:
+            if report:
+                report.close()
+
+        created = "проверено" if options["dry_run"] else "создано"
+        self.stdout.write(
+            f"Строк: {stats['total']}, {created}: {stats['created']}, "
+            f"с ошибками: {stats['failed']}."
+        )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from properties.caching import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    """
+    Выводит счетчики попаданий и промахов кэша ответов по объектам и каталогам.
+
+    Пример:
+        python manage.py listings_cache_stats --reset
+    """
+
+    help = "Счетчики hit/miss кэша ответов API объектов недвижимости."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="Сбросить счетчики после вывода."
+        )
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        total = stats["hits"] + stats["misses"]
+        ratio = stats["hits"] / total * 100 if total else 0
+        self.stdout.write(
+            f"hits: {stats['hits']}, misses: {stats['misses']}, hit ratio: {ratio:.1f}%"
+        )
+        if options["reset"]:
+            reset_stats()
+            self.stdout.write("Счетчики сброшены.")
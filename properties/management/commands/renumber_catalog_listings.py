@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.catalogs import MIN_SORT_GAP, crowded_catalogs, renumber_catalog
+
+
+class Command(BaseCommand):
+    """
+    Перенумеровывает ключи sort_order каталогов, в которых промежутки между
+    соседними объектами исчерпаны перемещениями.
+
+    Запускается по расписанию (например, раз в сутки), чтобы перемещения
+    объектов не упирались в перенумерацию каталога во время запроса.
+
+    Пример:
+        python manage.py renumber_catalog_listings --min-gap 16
+    """
+
+    help = "Перенумерация ключей порядка объектов в каталогах."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-gap",
+            type=int,
+            default=MIN_SORT_GAP,
+            help="Перенумеровать каталоги с промежутком между ключами меньше этого",
+        )
+
+    def handle(self, *args, **options):
+        if options["min_gap"] < 1:
+            raise CommandError("Промежуток должен быть положительным.")
+        catalogs = crowded_catalogs(options["min_gap"])
+        for catalog_id in catalogs:
+            renumber_catalog(catalog_id)
+        self.stdout.write(f"Перенумеровано каталогов: {len(catalogs)}.")
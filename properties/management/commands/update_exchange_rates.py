@@ -0,0 +1,42 @@
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.currency import BASE_CURRENCY, set_rates
+
+
+class Command(BaseCommand):
+    """
+    Обновляет курсы валют и пересчитывает цены объектов в базовой валюте.
+
+    Курс — стоимость единицы валюты в базовой валюте (BASE_CURRENCY).
+    Все курсы сохраняются одним запросом, price_base пересчитывается
+    одним UPDATE для объектов в этих валютах.
+
+    Пример:
+        python manage.py update_exchange_rates EUR=1.08 GBP=1.27
+    """
+
+    help = "Обновление курсов валют (ВАЛЮТА=КУРС) с пересчетом price_base."
+
+    def add_arguments(self, parser):
+        parser.add_argument("rates", nargs="+", metavar="ВАЛЮТА=КУРС")
+
+    def handle(self, *args, **options):
+        rates = {}
+        for item in options["rates"]:
+            currency, _, value = item.partition("=")
+            try:
+                rate = Decimal(value)
+            except InvalidOperation:
+                raise CommandError(f"Некорректный курс: {item}")
+            if not currency.strip() or rate <= 0:
+                raise CommandError(f"Некорректный курс: {item}")
+            if currency.strip().upper() == BASE_CURRENCY:
+                raise CommandError(f"{BASE_CURRENCY} — базовая валюта, курс равен 1.")
+            rates[currency] = rate
+
+        updated = set_rates(rates)
+        self.stdout.write(
+            f"Обновлено курсов: {len(rates)}, пересчитано объектов: {updated}."
+        )
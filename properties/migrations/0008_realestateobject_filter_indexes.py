@@ -0,0 +1,61 @@
+# Generated by Django 4.2 on 2026-10-17 02:19
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0007_realestateobject_assigned_by_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="realestateobject",
+            index=models.Index(
+                django.db.models.functions.text.Upper("country"),
+                name="reo_country_upper_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="realestateobject",
+            index=models.Index(
+                django.db.models.functions.text.Upper("city"), name="reo_city_upper_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="realestateobject",
+            index=models.Index(
+                django.db.models.functions.text.Upper("status"),
+                name="reo_status_upper_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="realestateobject",
+            index=models.Index(
+                django.db.models.functions.text.Upper("city"),
+                django.db.models.functions.text.Upper("status"),
+                models.F("price"),
+                name="reo_city_status_price_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="realestateobject",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="reo_created_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="realestateobject",
+            index=models.Index(fields=["price", "id"], name="reo_price_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="realestateobject",
+            index=models.Index(
+                condition=models.Q(("availability", True)),
+                fields=["-created_at"],
+                name="reo_available_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2 on 2026-10-17 02:21
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = """
+CREATE OR REPLACE FUNCTION properties_realestateobject_search_vector_update()
+RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('pg_catalog.russian', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('pg_catalog.english', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('pg_catalog.russian', coalesce(NEW.description_ru, '')), 'B') ||
+        setweight(to_tsvector('pg_catalog.english', coalesce(NEW.description_en, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER properties_realestateobject_search_vector_trigger
+BEFORE INSERT OR UPDATE OF name, description_ru, description_en, search_vector
+ON properties_realestateobject
+FOR EACH ROW EXECUTE FUNCTION properties_realestateobject_search_vector_update();
+
+UPDATE properties_realestateobject SET name = name;
+"""
+
+DROP_SEARCH_VECTOR_SQL = """
+DROP TRIGGER IF EXISTS properties_realestateobject_search_vector_trigger
+ON properties_realestateobject;
+DROP FUNCTION IF EXISTS properties_realestateobject_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0008_realestateobject_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="realestateobject",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="realestateobject",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="reo_search_vector_idx"
+            ),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_SQL, DROP_SEARCH_VECTOR_SQL),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2 on 2026-10-17 02:24
+
+from django.db import migrations, models
+
+# Формула ячейки совпадает с properties.geo.geo_cell:
+# GRID_SCALE = 100, GRID_ROWS = 18000, GRID_COLUMNS = 36000.
+GEO_CELL_SQL = """
+CREATE OR REPLACE FUNCTION properties_realestateobject_geo_cell_update()
+RETURNS trigger AS $$
+BEGIN
+    IF NEW.latitude IS NULL OR NEW.longitude IS NULL THEN
+        NEW.geo_cell := NULL;
+    ELSE
+        NEW.geo_cell :=
+            GREATEST(0, LEAST(floor((NEW.latitude + 90) * 100), 17999))::bigint * 36000
+            + GREATEST(0, LEAST(floor((NEW.longitude + 180) * 100), 35999))::bigint;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER properties_realestateobject_geo_cell_trigger
+BEFORE INSERT OR UPDATE OF latitude, longitude, geo_cell
+ON properties_realestateobject
+FOR EACH ROW EXECUTE FUNCTION properties_realestateobject_geo_cell_update();
+
+UPDATE properties_realestateobject SET latitude = latitude
+WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+"""
+
+DROP_GEO_CELL_SQL = """
+DROP TRIGGER IF EXISTS properties_realestateobject_geo_cell_trigger
+ON properties_realestateobject;
+DROP FUNCTION IF EXISTS properties_realestateobject_geo_cell_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0009_realestateobject_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="realestateobject",
+            name="geo_cell",
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="realestateobject",
+            index=models.Index(fields=["geo_cell"], name="reo_geo_cell_idx"),
+        ),
+        migrations.RunSQL(GEO_CELL_SQL, DROP_GEO_CELL_SQL),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-17 02:45
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0010_realestateobject_geo_cell"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="realestateobject",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["features"],
+                name="reo_features_path_idx",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="realestateobject",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["features"], name="reo_features_keys_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 4.2 on 2026-10-17 02:55
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+# Базовая валюта совпадает с properties.currency.BASE_CURRENCY.
+# Присваивание price_base (см. recompute_price_base) тоже пересчитывает значение.
+PRICE_BASE_SQL = """
+CREATE OR REPLACE FUNCTION properties_realestateobject_price_base_update()
+RETURNS trigger AS $$
+BEGIN
+    IF upper(NEW.currency) = 'USD' THEN
+        NEW.price_base := NEW.price;
+    ELSE
+        NEW.price_base := round(NEW.price * (
+            SELECT rate FROM properties_exchangerate
+            WHERE currency = upper(NEW.currency)
+        ), 2);
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER properties_realestateobject_price_base_trigger
+BEFORE INSERT OR UPDATE OF price, currency, price_base
+ON properties_realestateobject
+FOR EACH ROW EXECUTE FUNCTION properties_realestateobject_price_base_update();
+
+UPDATE properties_realestateobject SET price = price;
+"""
+
+DROP_PRICE_BASE_SQL = """
+DROP TRIGGER IF EXISTS properties_realestateobject_price_base_trigger
+ON properties_realestateobject;
+DROP FUNCTION IF EXISTS properties_realestateobject_price_base_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0011_realestateobject_features_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExchangeRate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("currency", models.CharField(max_length=10, unique=True)),
+                ("rate", models.DecimalField(decimal_places=10, max_digits=20)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name="realestateobject",
+            name="reo_city_status_price_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="realestateobject",
+            name="reo_price_id_idx",
+        ),
+        migrations.AddField(
+            model_name="realestateobject",
+            name="price_base",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, editable=False, max_digits=16, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="realestateobject",
+            index=models.Index(
+                django.db.models.functions.text.Upper("city"),
+                django.db.models.functions.text.Upper("status"),
+                models.F("price_base"),
+                name="reo_city_status_price_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="realestateobject",
+            index=models.Index(
+                fields=["price_base", "id"], name="reo_price_base_id_idx"
+            ),
+        ),
+        migrations.RunSQL(PRICE_BASE_SQL, DROP_PRICE_BASE_SQL),
+    ]
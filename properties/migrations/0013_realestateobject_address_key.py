@@ -0,0 +1,103 @@
+# Generated by Django 4.2 on 2026-10-17 03:11
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+# Нормализация совпадает с properties.addresses.make_address_key
+ADDRESS_KEY_SQL = r"""
+CREATE OR REPLACE FUNCTION properties_address_key(
+    country text, city text, district text, address text
+) RETURNS text AS $$
+    SELECT md5(lower(concat_ws('|',
+        btrim(regexp_replace(coalesce(country, ''), '\s+', ' ', 'g')),
+        btrim(regexp_replace(coalesce(city, ''), '\s+', ' ', 'g')),
+        btrim(regexp_replace(coalesce(district, ''), '\s+', ' ', 'g')),
+        btrim(regexp_replace(coalesce(address, ''), '\s+', ' ', 'g'))
+    )))
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION properties_realestateobject_address_key_update()
+RETURNS trigger AS $$
+BEGIN
+    NEW.address_key := properties_address_key(
+        NEW.country, NEW.city, NEW.district, NEW.address
+    );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER properties_realestateobject_address_key_trigger
+BEFORE INSERT OR UPDATE OF country, city, district, address, address_key
+ON properties_realestateobject
+FOR EACH ROW EXECUTE FUNCTION properties_realestateobject_address_key_update();
+
+UPDATE properties_realestateobject SET address = address;
+"""
+
+DROP_ADDRESS_KEY_SQL = """
+DROP TRIGGER IF EXISTS properties_realestateobject_address_key_trigger
+ON properties_realestateobject;
+DROP FUNCTION IF EXISTS properties_realestateobject_address_key_update();
+DROP FUNCTION IF EXISTS properties_address_key(text, text, text, text);
+"""
+
+
+def check_duplicate_addresses(apps, schema_editor):
+    """
+    Ограничение нельзя создать, пока в БД есть дубли адресов: их нужно
+    исправить (или указать complex_name) до применения миграции.
+    """
+    RealEstateObject = apps.get_model("properties", "RealEstateObject")
+    duplicates = (
+        RealEstateObject.objects.filter(
+            Q(complex_name__isnull=True) | Q(complex_name="")
+        )
+        .values("address_key")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+    )
+    examples = [
+        list(
+            RealEstateObject.objects.filter(address_key=row["address_key"]).values_list(
+                "id", flat=True
+            )
+        )
+        for row in duplicates[:10]
+    ]
+    if examples:
+        raise RuntimeError(
+            f"Найдены объекты с одинаковыми адресами ({duplicates.count()} групп), "
+            f"например id: {examples}. Исправьте адреса или укажите complex_name."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0012_exchangerate_realestateobject_price_base"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="realestateobject",
+            name="address_key",
+            field=models.CharField(
+                blank=True, editable=False, max_length=32, null=True
+            ),
+        ),
+        migrations.RunSQL(ADDRESS_KEY_SQL, DROP_ADDRESS_KEY_SQL),
+        migrations.RunPython(check_duplicate_addresses, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="realestateobject",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(
+                    ("complex_name__isnull", True),
+                    ("complex_name", ""),
+                    _connector="OR",
+                ),
+                fields=("address_key",),
+                name="reo_unique_address_key",
+                violation_error_message="Объект с таким адресом уже существует.",
+            ),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.2 on 2026-10-17 03:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0013_realestateobject_address_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DuplicateCandidate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField()),
+                ("cluster", models.BigIntegerField(db_index=True)),
+                ("dismissed", models.BooleanField(default=False)),
+                ("detected_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DuplicateScan",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("started_at", models.DateTimeField()),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("full", models.BooleanField(default=False)),
+                ("checked", models.PositiveIntegerField(default=0)),
+                ("found", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="realestateobject",
+            index=models.Index(fields=["updated_at"], name="reo_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="realestateobject",
+            index=models.Index(
+                django.db.models.functions.text.Upper("city"),
+                condition=models.Q(("geo_cell__isnull", True)),
+                name="reo_no_geo_city_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="duplicatecandidate",
+            name="duplicate",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="properties.realestateobject",
+            ),
+        ),
+        migrations.AddField(
+            model_name="duplicatecandidate",
+            name="listing",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="duplicate_candidates",
+                to="properties.realestateobject",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="duplicatecandidate",
+            constraint=models.UniqueConstraint(
+                fields=("listing", "duplicate"), name="dup_candidate_pair_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.2 on 2026-10-17 03:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Точка истории цен при создании объекта и при изменении цены или валюты.
+# Триггеры строковые, поэтому срабатывают и для bulk_create/update().
+PRICE_HISTORY_SQL = """
+CREATE OR REPLACE FUNCTION properties_realestateobject_price_history()
+RETURNS trigger AS $$
+BEGIN
+    INSERT INTO properties_listingprice (listing_id, currency, amount, effective_date)
+    VALUES (NEW.id, NEW.currency, NEW.price, now());
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER properties_realestateobject_price_history_insert
+AFTER INSERT ON properties_realestateobject
+FOR EACH ROW EXECUTE FUNCTION properties_realestateobject_price_history();
+
+CREATE TRIGGER properties_realestateobject_price_history_update
+AFTER UPDATE OF price, currency ON properties_realestateobject
+FOR EACH ROW
+WHEN (OLD.price IS DISTINCT FROM NEW.price OR OLD.currency IS DISTINCT FROM NEW.currency)
+EXECUTE FUNCTION properties_realestateobject_price_history();
+
+INSERT INTO properties_listingprice (listing_id, currency, amount, effective_date)
+SELECT o.id, o.currency, o.price, o.created_at
+FROM properties_realestateobject o
+WHERE NOT EXISTS (
+    SELECT 1 FROM properties_listingprice p WHERE p.listing_id = o.id
+);
+"""
+
+DROP_PRICE_HISTORY_SQL = """
+DROP TRIGGER IF EXISTS properties_realestateobject_price_history_insert
+ON properties_realestateobject;
+DROP TRIGGER IF EXISTS properties_realestateobject_price_history_update
+ON properties_realestateobject;
+DROP FUNCTION IF EXISTS properties_realestateobject_price_history();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0014_duplicatecandidate_duplicatescan"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="listingprice",
+            name="listing",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="prices",
+                to="properties.realestateobject",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listingprice",
+            index=models.Index(
+                fields=["listing", "effective_date"], name="lp_listing_date_idx"
+            ),
+        ),
+        migrations.RunSQL(PRICE_HISTORY_SQL, DROP_PRICE_HISTORY_SQL),
+    ]
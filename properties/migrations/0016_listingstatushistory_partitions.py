@@ -0,0 +1,236 @@
+# Generated by Django 4.2 on 2026-10-17 04:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# История статусов пересоздается как таблица, секционированная по месяцам
+# changed_at. Первичный ключ секционированной таблицы обязан включать ключ
+# секционирования, поэтому в БД он составной (id, changed_at).
+# Секции создает properties_listingstatushistory_partition(): строки, уже
+# попавшие в секцию по умолчанию, переносятся в новую секцию.
+PARTITION_SQL = """
+ALTER TABLE properties_listingstatushistory RENAME TO properties_listingstatushistory_old;
+ALTER INDEX properties_listingstatushistory_pkey
+RENAME TO properties_listingstatushistory_old_pkey;
+
+CREATE TABLE properties_listingstatushistory (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    status varchar(20) NOT NULL,
+    changed_at timestamp with time zone NOT NULL,
+    listing_id bigint NOT NULL,
+    previous_status varchar(20) NULL,
+    listed_at timestamp with time zone NULL,
+    PRIMARY KEY (id, changed_at)
+) PARTITION BY RANGE (changed_at);
+
+ALTER TABLE properties_listingstatushistory
+ADD CONSTRAINT properties_listingst_listing_id_fk_propertie
+FOREIGN KEY (listing_id) REFERENCES properties_realestateobject (id)
+DEFERRABLE INITIALLY DEFERRED;
+
+CREATE INDEX lsh_listing_changed_idx
+ON properties_listingstatushistory (listing_id, changed_at);
+
+CREATE TABLE properties_listingstatushistory_default
+PARTITION OF properties_listingstatushistory DEFAULT;
+
+CREATE OR REPLACE FUNCTION properties_listingstatushistory_partition(month date)
+RETURNS text AS $$
+DECLARE
+    start_at timestamp with time zone := date_trunc('month', month)::timestamp
+        AT TIME ZONE 'UTC';
+    end_at timestamp with time zone := (date_trunc('month', month) + interval '1 month')
+        ::timestamp AT TIME ZONE 'UTC';
+    partition_name text := 'properties_listingstatushistory_' || to_char(month, 'YYYY_MM');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE properties_listingstatushistory INCLUDING DEFAULTS)',
+        partition_name
+    );
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM properties_listingstatushistory_default '
+        'WHERE changed_at >= %L AND changed_at < %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved',
+        start_at, end_at, partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE properties_listingstatushistory ATTACH PARTITION %I '
+        'FOR VALUES FROM (%L) TO (%L)',
+        partition_name, start_at, end_at
+    );
+    RETURN partition_name;
+END
+$$ LANGUAGE plpgsql;
+
+SELECT properties_listingstatushistory_partition(month::date)
+FROM generate_series(
+    date_trunc('month', least(
+        now(),
+        (SELECT min(created_at) FROM properties_realestateobject),
+        (SELECT min(changed_at) FROM properties_listingstatushistory_old)
+    ) AT TIME ZONE 'UTC'),
+    now() AT TIME ZONE 'UTC' + interval '3 months',
+    interval '1 month'
+) AS month;
+
+INSERT INTO properties_listingstatushistory (id, status, changed_at, listing_id)
+SELECT id, status, changed_at, listing_id FROM properties_listingstatushistory_old;
+DROP TABLE properties_listingstatushistory_old;
+SELECT setval(
+    pg_get_serial_sequence('properties_listingstatushistory', 'id'),
+    coalesce(max(id), 0) + 1,
+    false
+) FROM properties_listingstatushistory;
+"""
+
+UNPARTITION_SQL = """
+CREATE TABLE properties_listingstatushistory_plain (
+    id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    status varchar(20) NOT NULL,
+    changed_at timestamp with time zone NOT NULL,
+    listing_id bigint NOT NULL
+        REFERENCES properties_realestateobject (id) DEFERRABLE INITIALLY DEFERRED
+);
+INSERT INTO properties_listingstatushistory_plain (id, status, changed_at, listing_id)
+SELECT id, status, changed_at, listing_id FROM properties_listingstatushistory;
+DROP TABLE properties_listingstatushistory;
+DROP FUNCTION IF EXISTS properties_listingstatushistory_partition(date);
+
+ALTER TABLE properties_listingstatushistory_plain RENAME TO properties_listingstatushistory;
+ALTER INDEX properties_listingstatushistory_plain_pkey
+RENAME TO properties_listingstatushistory_pkey;
+CREATE INDEX properties_listingstatushistory_listing_id_85bd0db3
+ON properties_listingstatushistory (listing_id);
+SELECT setval(
+    pg_get_serial_sequence('properties_listingstatushistory', 'id'),
+    coalesce(max(id), 0) + 1,
+    false
+) FROM properties_listingstatushistory;
+"""
+
+# Дата выхода на рынок обновляется при создании объекта и при возврате из
+# статуса sold; присвоенное приложением значение игнорируется. Запись истории
+# добавляется при создании объекта и при каждой смене статуса, триггеры
+# строковые, поэтому срабатывают и для bulk_create/update().
+STATUS_HISTORY_SQL = """
+UPDATE properties_realestateobject SET listed_at = created_at;
+
+CREATE OR REPLACE FUNCTION properties_realestateobject_listed_at()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' OR (OLD.status = 'sold' AND NEW.status <> 'sold') THEN
+        NEW.listed_at := now();
+    ELSE
+        NEW.listed_at := OLD.listed_at;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER properties_realestateobject_listed_at_trigger
+BEFORE INSERT OR UPDATE OF status, listed_at ON properties_realestateobject
+FOR EACH ROW EXECUTE FUNCTION properties_realestateobject_listed_at();
+
+CREATE OR REPLACE FUNCTION properties_realestateobject_status_history()
+RETURNS trigger AS $$
+BEGIN
+    INSERT INTO properties_listingstatushistory
+        (listing_id, status, previous_status, changed_at, listed_at)
+    VALUES (
+        NEW.id,
+        NEW.status,
+        CASE WHEN TG_OP = 'UPDATE' THEN OLD.status END,
+        now(),
+        NEW.listed_at
+    );
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER properties_realestateobject_status_history_insert
+AFTER INSERT ON properties_realestateobject
+FOR EACH ROW EXECUTE FUNCTION properties_realestateobject_status_history();
+
+CREATE TRIGGER properties_realestateobject_status_history_update
+AFTER UPDATE OF status ON properties_realestateobject
+FOR EACH ROW
+WHEN (OLD.status IS DISTINCT FROM NEW.status)
+EXECUTE FUNCTION properties_realestateobject_status_history();
+
+-- Для проданных объектов дата выхода на рынок неизвестна
+INSERT INTO properties_listingstatushistory (listing_id, status, changed_at, listed_at)
+SELECT o.id, o.status, o.created_at, CASE WHEN o.status <> 'sold' THEN o.created_at END
+FROM properties_realestateobject o
+WHERE NOT EXISTS (
+    SELECT 1 FROM properties_listingstatushistory h WHERE h.listing_id = o.id
+);
+"""
+
+DROP_STATUS_HISTORY_SQL = """
+DROP TRIGGER IF EXISTS properties_realestateobject_status_history_insert
+ON properties_realestateobject;
+DROP TRIGGER IF EXISTS properties_realestateobject_status_history_update
+ON properties_realestateobject;
+DROP FUNCTION IF EXISTS properties_realestateobject_status_history();
+DROP TRIGGER IF EXISTS properties_realestateobject_listed_at_trigger
+ON properties_realestateobject;
+DROP FUNCTION IF EXISTS properties_realestateobject_listed_at();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0015_listingprice_history"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="realestateobject",
+            name="listed_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(PARTITION_SQL, UNPARTITION_SQL),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name="listingstatushistory",
+                    name="listed_at",
+                    field=models.DateTimeField(blank=True, null=True),
+                ),
+                migrations.AddField(
+                    model_name="listingstatushistory",
+                    name="previous_status",
+                    field=models.CharField(
+                        blank=True,
+                        choices=[("sale", "Sale"), ("rent", "Rent"), ("sold", "Sold")],
+                        max_length=20,
+                        null=True,
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="listingstatushistory",
+                    name="listing",
+                    field=models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_history",
+                        to="properties.realestateobject",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="listingstatushistory",
+                    index=models.Index(
+                        fields=["listing", "changed_at"],
+                        name="lsh_listing_changed_idx",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunSQL(STATUS_HISTORY_SQL, DROP_STATUS_HISTORY_SQL),
+    ]
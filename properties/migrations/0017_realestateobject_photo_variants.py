@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-17 04:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0016_listingstatushistory_partitions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="realestateobject",
+            name="photo_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-17 04:20
+
+from django.db import migrations, models
+
+# Существующие связи получают ключи с шагом 1024 (SORT_GAP) в текущем
+# порядке каталога: sort_order, затем id.
+RENUMBER_SQL = """
+UPDATE properties_cataloglisting AS l
+SET sort_order = r.position * 1024
+FROM (
+    SELECT id, row_number() OVER (PARTITION BY catalog_id ORDER BY sort_order, id) AS position
+    FROM properties_cataloglisting
+) AS r
+WHERE l.id = r.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0017_realestateobject_photo_variants"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cataloglisting",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="cataloglisting",
+            index=models.Index(
+                fields=["catalog", "sort_order", "id"], name="catalog_listing_order_idx"
+            ),
+        ),
+        migrations.RunSQL(RENUMBER_SQL, migrations.RunSQL.noop),
+    ]
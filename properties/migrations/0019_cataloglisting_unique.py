@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-17 04:40
+
+from django.db import migrations, models
+
+# Повторные связи одного объекта с каталогом удаляются до создания
+# ограничения; остается связь с наименьшим id.
+DELETE_DUPLICATES_SQL = """
+DELETE FROM properties_cataloglisting AS l
+USING properties_cataloglisting AS d
+WHERE l.catalog_id = d.catalog_id
+  AND l.listing_id = d.listing_id
+  AND l.id > d.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0018_cataloglisting_sort_keys"),
+    ]
+
+    operations = [
+        migrations.RunSQL(DELETE_DUPLICATES_SQL, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name="cataloglisting",
+            constraint=models.UniqueConstraint(
+                fields=("catalog", "listing"), name="catalog_listing_unique"
+            ),
+        ),
+    ]
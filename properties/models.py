@@ -1,7 +1,13 @@
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Upper
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 
+from .addresses import ADDRESS_KEY_CONSTRAINT, DUPLICATE_ADDRESS_ERROR, make_address_key
+
 
 class RealEstateObject(models.Model):
     """
@@ -21,6 +27,11 @@ class RealEstateObject(models.Model):
     description_en = models.TextField(blank=True, null=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     currency = models.CharField(max_length=10, default="USD")
+    # Цена в базовой валюте (см. properties.currency) для фильтров и сортировки.
+    # Заполняется триггером БД (см. миграцию 0012), NULL — курс валюты неизвестен.
+    price_base = models.DecimalField(
+        max_digits=16, decimal_places=2, blank=True, null=True, editable=False
+    )
     status = models.CharField(
         max_length=20,
         choices=[("sale", "Sale"), ("rent", "Rent"), ("sold", "Sold")],
@@ -34,12 +45,16 @@ class RealEstateObject(models.Model):
     district = models.CharField(max_length=100, blank=True, null=True)
     address = models.CharField(max_length=255)
     complex_name = models.CharField(max_length=255, blank=True, null=True)
+    # Ключ нормализованного адреса (см. properties.addresses), заполняется триггером БД
+    address_key = models.CharField(max_length=32, blank=True, null=True, editable=False)
     latitude = models.DecimalField(
         max_digits=9, decimal_places=6, blank=True, null=True
     )
     longitude = models.DecimalField(
         max_digits=9, decimal_places=6, blank=True, null=True
     )
+    # Номер ячейки геосетки (см. properties.geo), заполняется триггером БД
+    geo_cell = models.BigIntegerField(blank=True, null=True, editable=False)
 
     # Характеристики
     area = models.FloatField(help_text="Общая площадь, кв.м")
@@ -73,6 +88,9 @@ class RealEstateObject(models.Model):
         default=list, blank=True, help_text="Ссылки на фотографии"
     )
     videos = models.JSONField(default=list, blank=True, help_text="Ссылки на видео")
+    # Уменьшенные копии фотографий: {фото: {вариант: {width, height, webp, jpeg}}}.
+    # Заполняется командой generate_photo_variants (см. properties.images).
+    photo_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     # Связь с брокером
     broker = models.ForeignKey(
@@ -91,25 +109,162 @@ class RealEstateObject(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-
-    # Валидация уникальности адреса
+    # Дата выхода на рынок: создание объекта или возврат из статуса sold.
+    # Заполняется триггером БД (см. миграцию 0016), присвоенное значение игнорируется.
+    listed_at = models.DateTimeField(blank=True, null=True, editable=False)
+
+    # Поисковый вектор по name/description_ru/description_en.
+    # Заполняется триггером БД (см. миграцию 0009), в том числе при bulk-операциях.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Фильтры RealEstateObjectFilter с iexact выполняются как UPPER(col)
+            models.Index(Upper("country"), name="reo_country_upper_idx"),
+            models.Index(Upper("city"), name="reo_city_upper_idx"),
+            models.Index(Upper("status"), name="reo_status_upper_idx"),
+            models.Index(
+                Upper("city"),
+                Upper("status"),
+                F("price_base"),
+                name="reo_city_status_price_idx",
+            ),
+            # Сортировка списка (с id для пагинации по курсору)
+            models.Index(fields=["-created_at", "-id"], name="reo_created_id_idx"),
+            models.Index(fields=["price_base", "id"], name="reo_price_base_id_idx"),
+            models.Index(
+                fields=["-created_at"],
+                condition=Q(availability=True),
+                name="reo_available_created_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="reo_search_vector_idx"),
+            models.Index(fields=["geo_cell"], name="reo_geo_cell_idx"),
+            # Фильтр features: jsonb_path_ops для @> (равенство и вхождение),
+            # jsonb_ops для ? (наличие ключа), который jsonb_path_ops не поддерживает
+            GinIndex(
+                fields=["features"],
+                opclasses=["jsonb_path_ops"],
+                name="reo_features_path_idx",
+            ),
+            GinIndex(fields=["features"], name="reo_features_keys_idx"),
+            # Инкрементальный поиск дублей (объекты, измененные после прошлого запуска)
+            models.Index(fields=["updated_at"], name="reo_updated_idx"),
+            # Поиск дублей среди объектов без координат
+            models.Index(
+                Upper("city"),
+                condition=Q(geo_cell__isnull=True),
+                name="reo_no_geo_city_idx",
+            ),
+        ]
+        constraints = [
+            # Уникальность адреса для объектов вне жилых комплексов
+            models.UniqueConstraint(
+                fields=["address_key"],
+                condition=Q(complex_name__isnull=True) | Q(complex_name=""),
+                name=ADDRESS_KEY_CONSTRAINT,
+                violation_error_message=DUPLICATE_ADDRESS_ERROR,
+            ),
+        ]
+
+    # Валидация уникальности адреса для форм (например, админки).
+    # При сохранении дубли отклоняет ограничение reo_unique_address_key.
     def clean(self):
+        self.address_key = make_address_key(
+            self.country, self.city, self.district, self.address
+        )
         if not self.complex_name:  # Если поле `complex_name` не указано
-            duplicate = RealEstateObject.objects.filter(
-                country=self.country,
-                city=self.city,
-                district=self.district,
-                address=self.address,
-            ).exclude(
-                id=self.id
-            )  # Исключаем текущий объект при редактировании
+            duplicate = (
+                RealEstateObject.objects.filter(address_key=self.address_key)
+                .filter(Q(complex_name__isnull=True) | Q(complex_name=""))
+                .exclude(id=self.id)  # Исключаем текущий объект при редактировании
+            )
             if duplicate.exists():
-                raise ValidationError("Объект с таким адресом уже существует.")
+                raise ValidationError(DUPLICATE_ADDRESS_ERROR)
 
     def __str__(self):
         return self.name
 
 
+class ExchangeRate(models.Model):
+    """
+    Курс валюты к базовой валюте (см. properties.currency.BASE_CURRENCY).
+
+    Поля:
+        - currency: Код валюты (ISO 4217, в верхнем регистре).
+        - rate: Стоимость единицы валюты в базовой валюте.
+        - updated_at: Дата обновления курса.
+    """
+
+    currency = models.CharField(max_length=10, unique=True)
+    rate = models.DecimalField(max_digits=20, decimal_places=10)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        self.currency = self.currency.strip().upper()
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.currency} = {self.rate}"
+
+
+class DuplicateCandidate(models.Model):
+    """
+    Пара вероятных дублей объектов недвижимости (см. properties.duplicates).
+
+    Поля:
+        - listing: Объект с меньшим id.
+        - duplicate: Объект с большим id.
+        - score: Оценка сходства от 0 до 1.
+        - cluster: Группа связанных дублей (наименьший id объекта в группе).
+        - dismissed: Пара проверена и не является дублем.
+        - detected_at: Дата последнего обнаружения пары.
+    """
+
+    listing = models.ForeignKey(
+        RealEstateObject, on_delete=models.CASCADE, related_name="duplicate_candidates"
+    )
+    duplicate = models.ForeignKey(
+        RealEstateObject, on_delete=models.CASCADE, related_name="+"
+    )
+    score = models.FloatField()
+    cluster = models.BigIntegerField(db_index=True)
+    dismissed = models.BooleanField(default=False)
+    detected_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["listing", "duplicate"], name="dup_candidate_pair_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.listing_id} ~ {self.duplicate_id} ({self.score:.2f})"
+
+
+class DuplicateScan(models.Model):
+    """
+    Запуск поиска дублей. Следующий инкрементальный запуск сравнивает
+    объекты, измененные после начала последнего завершенного запуска.
+
+    Поля:
+        - started_at: Начало запуска.
+        - finished_at: Окончание запуска (пусто, если запуск не завершен).
+        - full: Проверялись все объекты.
+        - checked: Количество проверенных объектов.
+        - found: Количество найденных пар.
+    """
+
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(blank=True, null=True)
+    full = models.BooleanField(default=False)
+    checked = models.PositiveIntegerField(default=0)
+    found = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.started_at:%Y-%m-%d %H:%M} ({self.checked})"
+
+
 class ListingPrice(models.Model):
     """
     История изменения цен для объектов недвижимости.
@@ -119,15 +274,30 @@ class ListingPrice(models.Model):
         - currency: Валюта.
         - amount: Сумма.
         - effective_date: Дата вступления цены в силу.
+
+    Записи создаются триггером БД при создании объекта и при каждом
+    изменении цены или валюты, в том числе при bulk-обновлениях
+    (см. миграцию 0015 и properties.prices).
     """
 
+    # Индекс по listing покрывается составным индексом (listing, effective_date)
     listing = models.ForeignKey(
-        RealEstateObject, on_delete=models.CASCADE, related_name="prices"
+        RealEstateObject,
+        on_delete=models.CASCADE,
+        related_name="prices",
+        db_index=False,
     )
     currency = models.CharField(max_length=10, default="USD")
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     effective_date = models.DateTimeField()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["listing", "effective_date"], name="lp_listing_date_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.listing.name} - {self.amount} {self.currency}"
 
@@ -161,16 +331,40 @@ class ListingStatusHistory(models.Model):
     Поля:
         - listing: Объект недвижимости.
         - status: Новый статус.
+        - previous_status: Предыдущий статус (пусто при создании объекта).
         - changed_at: Дата изменения статуса.
+        - listed_at: Дата выхода объекта на рынок на момент изменения.
+
+    Записи создаются триггером БД при создании объекта и при каждой смене
+    статуса, в том числе при bulk-обновлениях. Таблица секционирована по
+    месяцам changed_at (см. миграцию 0016 и properties.status_history).
     """
 
+    # Индекс по listing покрывается составным индексом (listing, changed_at)
     listing = models.ForeignKey(
-        RealEstateObject, on_delete=models.CASCADE, related_name="status_history"
+        RealEstateObject,
+        on_delete=models.CASCADE,
+        related_name="status_history",
+        db_index=False,
     )
     status = models.CharField(
         max_length=20, choices=[("sale", "Sale"), ("rent", "Rent"), ("sold", "Sold")]
     )
+    previous_status = models.CharField(
+        max_length=20,
+        choices=[("sale", "Sale"), ("rent", "Rent"), ("sold", "Sold")],
+        blank=True,
+        null=True,
+    )
     changed_at = models.DateTimeField(auto_now_add=True)
+    listed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["listing", "changed_at"], name="lsh_listing_changed_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.listing.name} - {self.status}"
@@ -216,8 +410,11 @@ class CatalogListing(models.Model):
     Поля:
         - catalog: Каталог.
         - listing: Объект недвижимости.
-        - sort_order: Порядок сортировки в каталоге.
+        - sort_order: Порядок сортировки в каталоге. Ключи идут с шагом
+          (см. properties.catalogs.SORT_GAP), поэтому перемещение объекта
+          меняет только его ключ.
         - notes: Заметки брокера.
+        - updated_at: Дата изменения (в том числе порядка).
     """
 
     catalog = models.ForeignKey(
@@ -229,6 +426,20 @@ class CatalogListing(models.Model):
     sort_order = models.PositiveIntegerField(default=0)
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["catalog", "sort_order", "id"], name="catalog_listing_order_idx"
+            ),
+        ]
+        constraints = [
+            # Объект входит в каталог не больше одного раза
+            models.UniqueConstraint(
+                fields=["catalog", "listing"], name="catalog_listing_unique"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.catalog.name} - {self.listing.name}"
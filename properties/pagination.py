@@ -0,0 +1,286 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination, replace_query_param
+from rest_framework.pagination import remove_query_param
+from rest_framework.response import Response
+
+from .filters import ordering_fields
+
+
+class KeysetPagination:
+    """
+    Пагинация по ключу (keyset / cursor) для списков объектов недвижимости.
+
+    Вместо OFFSET и COUNT(*) следующая страница выбирается условием
+    "строго после последней записи" по текущей сортировке запроса
+    (например, `-created_at` или `price`) с `id` в качестве
+    дополнительного ключа. Поэтому стоимость страницы N равна стоимости
+    первой страницы.
+
+    Курсоры непрозрачны для клиента: это base64 от JSON с позицией
+    (значения полей сортировки последней/первой записи) и направлением.
+
+    NULL в полях сортировки, допускающих NULL (например, price_base),
+    идут после остальных значений при любом направлении сортировки и
+    упорядочиваются между собой по `id`.
+
+    Параметры запроса:
+        - pagination: `cursor` — включает режим курсора (см. ObjectListPagination).
+        - cursor: Курсор, полученный в полях next/previous.
+        - page_size: Размер страницы (не больше max_page_size).
+        - with_count: Если `true`, в ответ добавляется общее количество (count).
+    """
+
+    mode_query_param = "pagination"
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    count_query_param = "with_count"
+    tie_breaker = "id"
+
+    def __init__(self, page_size, max_page_size):
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ("1", "true", "True"):
+            self.count = queryset.count()
+
+        position, reverse = self.decode_cursor(request, queryset)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [self._invert(field) for field in ordering]
+        # При обратном обходе NULL оказываются перед остальными значениями
+        nulls_after = not reverse
+        queryset = queryset.order_by(
+            *[self._order_expression(field, nulls_after) for field in ordering]
+        )
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position, nulls_after))
+
+        # Запрашиваем на одну запись больше, чтобы узнать, есть ли продолжение
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        payload = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+        }
+        if self.count is not None:
+            payload["count"] = self.count
+        payload["results"] = data
+        return Response(payload)
+
+    def get_page_size(self, request):
+        value = request.query_params.get(self.page_size_query_param)
+        try:
+            size = int(value)
+        except (TypeError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, queryset, view):
+        """
+        Возвращает сортировку запроса с уникальным `id` в конце.
+        """
+        ordering = ordering_fields(queryset) or [
+            field
+            for field in getattr(view, "ordering", None) or []
+            if isinstance(field, str)
+        ]
+        names = {field.lstrip("-") for field in ordering}
+        if self.tie_breaker not in names and "pk" not in names:
+            descending = bool(ordering) and ordering[0].startswith("-")
+            ordering.append(("-" if descending else "") + self.tie_breaker)
+        self.nullable = {
+            name
+            for name in names
+            if getattr(self._field(queryset, name), "null", False)
+        }
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Первая страница в режиме курсора
+            url = remove_query_param(self.base_url, self.cursor_query_param)
+            return replace_query_param(url, self.mode_query_param, "cursor")
+        return self._link(self.page[0], reverse=True)
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            values = data["p"]
+            reverse = bool(data.get("r"))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                self._field(queryset, field).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (
+            BinasciiError,
+            UnicodeError,
+            ValueError,
+            TypeError,
+            KeyError,
+            FieldDoesNotExist,
+            DjangoValidationError,
+        ):
+            raise NotFound("Некорректный курсор.")
+        return position, reverse
+
+    def encode_cursor(self, instance, reverse):
+        values = []
+        for field in self.ordering:
+            name = field.lstrip("-")
+            # Строки values() (быстрый путь списка) — словари
+            value = (
+                instance[name]
+                if isinstance(instance, dict)
+                else getattr(instance, name)
+            )
+            values.append(None if value is None else str(value))
+        data = {"p": values}
+        if reverse:
+            data["r"] = 1
+        raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        return urlsafe_b64encode(raw).decode("ascii")
+
+    def _link(self, instance, reverse):
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            self.encode_cursor(instance, reverse),
+        )
+
+    @staticmethod
+    def _field(queryset, name):
+        """
+        Возвращает поле модели или output_field аннотации (например, search_rank).
+        """
+        name = name.lstrip("-")
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        if name == "pk":
+            return queryset.model._meta.pk
+        return queryset.model._meta.get_field(name)
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith("-") else "-" + field
+
+    def _order_expression(self, field, nulls_after):
+        name = field.lstrip("-")
+        if name not in self.nullable:
+            return field
+        direction = F(name).desc if field.startswith("-") else F(name).asc
+        if nulls_after:
+            return direction(nulls_last=True)
+        return direction(nulls_first=True)
+
+    def _after(self, ordering, position, nulls_after=True):
+        """
+        Строит условие "строго после позиции" для составной сортировки:
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND id > z).
+
+        Для полей, допускающих NULL, NULL-значения идут после остальных
+        (nulls_after) или перед ними: "после x" включает NULL, "после NULL"
+        — ничего (или все не-NULL), а равенство с NULL — `IS NULL`.
+
+        Первое слагаемое дополнительно ограничивается `a >= x`, чтобы
+        планировщик мог использовать индекс по первому полю сортировки.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            if name not in self.nullable:
+                greater = Q(**{f"{name}__{lookup}": value})
+                same = Q(**{name: value})
+            elif value is None:
+                greater = None if nulls_after else Q(**{f"{name}__isnull": False})
+                same = Q(**{f"{name}__isnull": True})
+            else:
+                greater = Q(**{f"{name}__{lookup}": value})
+                if nulls_after:
+                    greater |= Q(**{f"{name}__isnull": True})
+                same = Q(**{name: value})
+            if greater is not None:
+                condition |= equal & greater
+            equal &= same
+        first = ordering[0]
+        if first.lstrip("-") in self.nullable:
+            return condition
+        bound = "lte" if first.startswith("-") else "gte"
+        return Q(**{f"{first.lstrip('-')}__{bound}": position[0]}) & condition
+
+
+class ObjectListPagination(PageNumberPagination):
+    """
+    Пагинация списка объектов недвижимости.
+
+    По умолчанию используется обычная постраничная пагинация (размер
+    страницы — PAGE_SIZE). Режим курсора (KeysetPagination) включается
+    параметром `pagination=cursor` или передачей `cursor`; размер страницы
+    `page_size` (не больше max_page_size) задается только в нем.
+    """
+
+    max_page_size = 100
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request):
+            self.keyset = self.keyset_class(self.page_size, self.max_page_size)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def use_keyset(self, request):
+        return (
+            request.query_params.get(self.keyset_class.mode_query_param) == "cursor"
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
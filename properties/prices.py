@@ -0,0 +1,85 @@
+"""
+История цен объектов недвижимости (ListingPrice).
+
+Точки истории записываются триггером БД при создании объекта и при каждом
+изменении цены или валюты (см. миграцию 0015). Ряды читаются по индексу
+(listing, effective_date) и при необходимости прореживаются в SQL:
+значения группируются по интервалам (день, неделя, месяц) и сводятся к
+последнему значению интервала (DISTINCT ON) или к среднему (AVG).
+
+История разреженная: точка есть только у интервалов, в которых цена
+менялась; до следующей точки действует предыдущая цена.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db.models import Avg, DecimalField, F
+from django.db.models.functions import Cast, Trunc
+from django.utils import timezone
+
+from .models import ListingPrice
+
+BUCKETS = ("day", "week", "month")
+AGGREGATES = ("last", "avg")
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def price_points(listing_ids, bucket=None, aggregate="last", start=None, end=None):
+    """
+    Точки истории цен объектов, упорядоченные по объекту и дате.
+
+    Args:
+        listing_ids (list): id объектов.
+        bucket (str): Интервал прореживания (day, week, month) или None.
+        aggregate (str): last — последняя цена интервала, avg — средняя.
+        start (date): Начальная дата (включительно).
+        end (date): Конечная дата (включительно).
+
+    Returns:
+        QuerySet: Словари listing_id, date, amount, currency.
+    """
+    queryset = ListingPrice.objects.filter(listing_id__in=listing_ids)
+    # Границы дат переводятся в моменты времени, чтобы работал индекс
+    if start is not None:
+        queryset = queryset.filter(effective_date__gte=start_of_day(start))
+    if end is not None:
+        queryset = queryset.filter(
+            effective_date__lt=start_of_day(end + timedelta(days=1))
+        )
+
+    if bucket is None:
+        return queryset.order_by("listing_id", "effective_date", "id").values(
+            "listing_id", "amount", "currency", date=F("effective_date")
+        )
+
+    queryset = queryset.annotate(date=Trunc("effective_date", bucket))
+    if aggregate == "avg":
+        # Средняя считается отдельно для каждой валюты интервала
+        return (
+            queryset.values("listing_id", "date", "currency")
+            .annotate(
+                amount=Cast(
+                    Avg("amount"), DecimalField(max_digits=12, decimal_places=2)
+                )
+            )
+            .order_by("listing_id", "date", "currency")
+        )
+    return (
+        queryset.order_by("listing_id", "date", "-effective_date", "-id")
+        .distinct("listing_id", "date")
+        .values("listing_id", "date", "amount", "currency")
+    )
+
+
+def group_by_listing(points):
+    """
+    Раскладывает точки по объектам: {listing_id: [точки без listing_id]}.
+    """
+    series = {}
+    for point in points:
+        listing_id = point.pop("listing_id")
+        series.setdefault(listing_id, []).append(point)
+    return series
@@ -0,0 +1,63 @@
+"""
+Поля связей для сериализаторов с пакетной проверкой.
+
+PrimaryKeyRelatedField(many=True) проверяет каждый ID отдельным запросом.
+BulkPrimaryKeyRelatedField(many=True) проверяет весь список одним запросом
+`pk__in` и возвращает объекты, загруженные только с первичным ключом.
+"""
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """
+    Список первичных ключей, проверяемый одним запросом.
+
+    Повторы в списке сохраняются; в ошибке перечисляются все ID, которых
+    нет в queryset дочернего поля.
+    """
+
+    default_error_messages = {
+        "does_not_exist": "Объекты не найдены: {pk_values}.",
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+
+        child = self.child_relation
+        queryset = child.get_queryset()
+        pk_field = queryset.model._meta.pk
+        pks = []
+        for item in data:
+            if isinstance(item, bool):
+                child.fail("incorrect_type", data_type=type(item).__name__)
+            try:
+                pks.append(pk_field.to_python(item))
+            except (TypeError, ValueError, DjangoValidationError):
+                child.fail("incorrect_type", data_type=type(item).__name__)
+
+        found = {obj.pk: obj for obj in queryset.filter(pk__in=pks).only("pk")}
+        missing = [pk for pk in dict.fromkeys(pks) if pk not in found]
+        if missing:
+            self.fail("does_not_exist", pk_values=", ".join(str(pk) for pk in missing))
+        return [found[pk] for pk in pks]
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField, у которого many=True проверяет список одним
+    запросом (BulkManyRelatedField).
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
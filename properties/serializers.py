@@ -1,12 +1,40 @@
+from contextlib import contextmanager, nullcontext
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models.fields.json import KeyTransform
 from rest_framework import serializers
+from .addresses import DUPLICATE_ADDRESS_ERROR, is_duplicate_address_error
+from .catalogs import catalog_listing_ids, sync_catalog_listings
+from .fieldsets import SparseFieldsMixin
 from .models import (
     RealEstateObject,
     Catalog,
     CatalogListing,
 )
+from .relations import BulkPrimaryKeyRelatedField
+
 
+@contextmanager
+def duplicate_address_errors():
+    """
+    Преобразует нарушение уникальности адреса в ошибку валидации.
 
-class ObjectSerializer(serializers.ModelSerializer):
+    Внутри транзакции запись выполняется в точке сохранения, чтобы после
+    ошибки транзакцию можно было продолжить.
+    """
+    atomic = transaction.atomic() if connection.in_atomic_block else nullcontext()
+    try:
+        with atomic:
+            yield
+    except IntegrityError as exc:
+        if not is_duplicate_address_error(exc):
+            raise
+        raise serializers.ValidationError(
+            {"address": [DUPLICATE_ADDRESS_ERROR]}
+        ) from exc
+
+
+class ObjectSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Сериализатор для объектов недвижимости.
 
@@ -14,6 +42,13 @@ class ObjectSerializer(serializers.ModelSerializer):
         - photos: JSON-поле для хранения ссылок на фотографии объекта.
         - videos: JSON-поле для хранения ссылок на видео объекта.
         - features: JSON-поле для хранения дополнительных характеристик объекта.
+        - cover_photo: Первая фотография объекта (только для чтения).
+        - photo_variants: Уменьшенные копии фотографий (только для чтения,
+          см. properties.images).
+
+    Поддерживает выборочные поля `?fields=` / `?exclude=` (см. properties.fieldsets).
+    Уникальность адреса проверяет ограничение БД при сохранении
+    (см. properties.addresses).
     """
 
     photos = serializers.JSONField(required=False, allow_null=True)
@@ -22,10 +57,35 @@ class ObjectSerializer(serializers.ModelSerializer):
     broker = serializers.PrimaryKeyRelatedField(
         read_only=True
     )  # broker теперь read_only
+    cover_photo = serializers.SerializerMethodField(
+        help_text="Первая фотография объекта."
+    )
+    photo_variants = serializers.JSONField(
+        read_only=True,
+        help_text="Варианты фотографий (thumb, card, full) в WebP и JPEG: "
+        "{фото: {вариант: {width, height, webp, jpeg}}}.",
+    )
+
+    # Первое фото берется в SQL (photos -> 0), без загрузки всего массива
+    projection_annotations = {"cover_photo": KeyTransform("0", "photos")}
 
     class Meta:
         model = RealEstateObject
-        fields = "__all__"
+        # Служебные колонки, которые заполняют триггеры БД
+        exclude = [
+            "search_vector",
+            "geo_cell",
+            "address_key",
+            "price_base",
+            "listed_at",
+        ]
+
+    def get_cover_photo(self, obj):
+        if "cover_photo" in obj.__dict__:
+            return obj.cover_photo
+        if isinstance(obj.photos, list) and obj.photos:
+            return obj.photos[0]
+        return None
 
     def create(self, validated_data):
         """
@@ -38,7 +98,8 @@ class ObjectSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 {"broker": "Необходимо аутентифицироваться для создания объекта."}
             )
-        return super().create(validated_data)
+        with duplicate_address_errors():
+            return super().create(validated_data)
 
     def update(self, instance, validated_data):
         """
@@ -49,14 +110,14 @@ class ObjectSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 {"broker": "Изменение брокера запрещено."}
             )
-        return super().update(instance, validated_data)
+        with duplicate_address_errors():
+            return super().update(instance, validated_data)
 
     def validate(self, attrs):
         """
         Валидация данных объекта недвижимости.
 
         Проверяет:
-            - Проверяет уникальность адреса.
             - Обязательное поле price.
 
         Args:
@@ -69,21 +130,6 @@ class ObjectSerializer(serializers.ModelSerializer):
             serializers.ValidationError: В случае нарушения условий валидации.
         """
 
-        # Проверка уникальности адреса
-        if not attrs.get("complex_name"):
-            duplicates = RealEstateObject.objects.filter(
-                country=attrs.get("country"),
-                city=attrs.get("city"),
-                district=attrs.get("district"),
-                address=attrs.get("address"),
-            )
-            if self.instance:
-                duplicates = duplicates.exclude(id=self.instance.id)
-            if duplicates.exists():
-                raise serializers.ValidationError(
-                    {"address": "Объект с таким адресом уже существует."}
-                )
-
         # Проверка обязательного поля price
         if attrs.get("price") is None:
             raise serializers.ValidationError(
@@ -93,6 +139,77 @@ class ObjectSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class PricePointSerializer(serializers.Serializer):
+    """
+    Точка истории цен объекта (см. properties.prices).
+
+    Поля:
+        - date: Дата изменения цены или начало интервала прореживания.
+        - amount: Цена (последняя или средняя за интервал).
+        - currency: Валюта цены.
+    """
+
+    date = serializers.DateTimeField()
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    currency = serializers.CharField()
+
+
+class CatalogListingCardSerializer(serializers.ModelSerializer):
+    """
+    Превью объекта в каталоге (`?embed=listings`).
+
+    Поля объекта читаются из связи CatalogListing, загруженной вместе
+    с объектом (см. properties.catalogs.catalog_queryset).
+    """
+
+    id = serializers.IntegerField(source="listing_id", read_only=True)
+    name = serializers.CharField(source="listing.name", read_only=True)
+    price = serializers.DecimalField(
+        source="listing.price", max_digits=12, decimal_places=2, read_only=True
+    )
+    currency = serializers.CharField(source="listing.currency", read_only=True)
+    status = serializers.CharField(source="listing.status", read_only=True)
+    city = serializers.CharField(source="listing.city", read_only=True)
+    cover_photo = serializers.JSONField(read_only=True)
+
+    class Meta:
+        model = CatalogListing
+        fields = [
+            "id",
+            "name",
+            "price",
+            "currency",
+            "status",
+            "city",
+            "cover_photo",
+            "sort_order",
+        ]
+
+
+class CatalogListingMoveSerializer(serializers.Serializer):
+    """
+    Перемещение объекта в каталоге: передается ровно одно из полей.
+
+    Поля:
+        - before: ID объекта каталога, перед которым встает перемещаемый.
+        - after: ID объекта каталога, после которого встает перемещаемый.
+    """
+
+    before = serializers.IntegerField(
+        required=False, help_text="ID объекта, перед которым поставить объект."
+    )
+    after = serializers.IntegerField(
+        required=False, help_text="ID объекта, после которого поставить объект."
+    )
+
+    def validate(self, attrs):
+        if len(attrs) != 1:
+            raise serializers.ValidationError(
+                "Нужно указать ровно одно из полей before или after."
+            )
+        return attrs
+
+
 class CatalogSerializer(serializers.ModelSerializer):
     """
     Сериализатор для каталогов объектов недвижимости.
@@ -104,10 +221,13 @@ class CatalogSerializer(serializers.ModelSerializer):
         - is_public: Флаг публичности каталога (True/False).
         - broker: Email брокера, который владеет каталогом (только для чтения).
         - tags: Теги каталога (опциональные).
-        - catalog_objects: Список ID объектов недвижимости, связанных с каталогом.
+        - catalog_objects: Список ID объектов недвижимости, связанных с каталогом
+          (проверяется одним запросом, см. properties.relations).
+        - listings: Превью первых объектов каталога, только при
+          `?embed=listings` (контекст `embed_listings`).
     """
 
-    catalog_objects = serializers.PrimaryKeyRelatedField(
+    catalog_objects = BulkPrimaryKeyRelatedField(
         many=True,
         queryset=RealEstateObject.objects.all(),
         required=False,
@@ -116,6 +236,12 @@ class CatalogSerializer(serializers.ModelSerializer):
     broker = serializers.ReadOnlyField(
         source="broker.email", help_text="Email брокера."
     )
+    listings = CatalogListingCardSerializer(
+        source="embedded_listings",
+        many=True,
+        read_only=True,
+        help_text="Первые объекты каталога (только при embed=listings).",
+    )
 
     class Meta:
         model = Catalog
@@ -127,9 +253,23 @@ class CatalogSerializer(serializers.ModelSerializer):
             "broker",
             "tags",
             "catalog_objects",
+            "listings",
         ]
         read_only_fields = ["broker"]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.context.get("embed_listings"):
+            self.fields.pop("listings")
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # У каталога нет атрибута catalog_objects: состав берется из связей
+        data["catalog_objects"] = (
+            catalog_listing_ids(instance) if instance.pk is not None else []
+        )
+        return data
+
     def create(self, validated_data):
         """
         Создает новый каталог и связывает его с объектами недвижимости.
@@ -141,14 +281,15 @@ class CatalogSerializer(serializers.ModelSerializer):
             Catalog: Созданный экземпляр каталога.
         """
         objects_data = validated_data.pop("catalog_objects", [])
-        catalog = Catalog.objects.create(**validated_data)
-        for obj in objects_data:
-            CatalogListing.objects.create(catalog=catalog, listing=obj)
+        with transaction.atomic():
+            catalog = Catalog.objects.create(**validated_data)
+            sync_catalog_listings(catalog, objects_data)
         return catalog
 
     def update(self, instance, validated_data):
         """
-        Обновляет существующий каталог и обновляет связь с объектами недвижимости.
+        Обновляет существующий каталог и синхронизирует его состав
+        (см. properties.catalogs).
 
         Args:
             instance (Catalog): Экземпляр каталога для обновления.
@@ -160,15 +301,9 @@ class CatalogSerializer(serializers.ModelSerializer):
         objects_data = validated_data.pop("catalog_objects", None)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        if objects_data is not None:
-            # Удаляем старые связи
-            instance.listings.all().delete()
-            # Убедимся, что передаются только ID
-            objects_data = [
-                obj.id if isinstance(obj, RealEstateObject) else obj
-                for obj in objects_data
-            ]
-            for obj_id in objects_data:
-                instance.listings.create(listing_id=obj_id)
-        instance.save()
+        with transaction.atomic():
+            if objects_data is not None:
+                # Связи, оставшиеся в каталоге, сохраняют sort_order и notes
+                sync_catalog_listings(instance, objects_data)
+            instance.save()
         return instance
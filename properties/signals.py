@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import invalidate_now_and_on_commit
+from .currency import recompute_price_base
+from .images import release_variants
+from .models import Catalog, CatalogListing, ExchangeRate, RealEstateObject
+
+
+@receiver(post_save, sender=RealEstateObject)
+@receiver(post_delete, sender=RealEstateObject)
+def invalidate_object_cache(sender, instance, **kwargs):
+    invalidate_now_and_on_commit("objects", f"object:{instance.pk}")
+
+
+@receiver(post_delete, sender=RealEstateObject)
+def release_photo_variants(sender, instance, **kwargs):
+    # Файлы вариантов удалит gc_media, если на них не осталось ссылок
+    for variants in (instance.photo_variants or {}).values():
+        release_variants(variants)
+
+
+@receiver(post_save, sender=Catalog)
+@receiver(post_delete, sender=Catalog)
+def invalidate_catalog_cache(sender, instance, **kwargs):
+    invalidate_now_and_on_commit("catalogs", f"catalog:{instance.pk}")
+
+
+@receiver(post_save, sender=CatalogListing)
+@receiver(post_delete, sender=CatalogListing)
+def invalidate_catalog_listing_cache(sender, instance, **kwargs):
+    invalidate_now_and_on_commit("catalogs", f"catalog:{instance.catalog_id}")
+
+
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def recompute_prices_on_rate_change(sender, instance, **kwargs):
+    recompute_price_base([instance.currency])
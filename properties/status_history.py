@@ -0,0 +1,96 @@
+"""
+История статусов объектов недвижимости (ListingStatusHistory).
+
+Записи добавляются триггером БД при создании объекта и при каждой смене
+статуса (см. миграцию 0016). Таблица секционирована по месяцам changed_at:
+запросы за недавний период читают только секции своих месяцев. Секции
+на несколько месяцев вперед создает команда create_status_partitions;
+строки без секции попадают в секцию по умолчанию и переносятся в секцию
+своего месяца при ее создании.
+
+Срок экспозиции (days on market) считается по записям перехода в sold:
+каждая запись хранит дату выхода объекта на рынок (listed_at), поэтому
+для статистики не нужна вся история объекта.
+"""
+
+from datetime import date, timedelta
+
+from django.db import connection
+from django.db.models import Aggregate, Avg, Count, F, FloatField, Func
+from django.utils import timezone
+
+from .models import ListingStatusHistory
+from .prices import start_of_day
+
+# Количество месяцев, на которые секции создаются заранее
+PARTITION_MONTHS_AHEAD = 3
+
+
+class Days(Func):
+    """
+    Длительность интервала в днях.
+    """
+
+    template = "EXTRACT(EPOCH FROM %(expressions)s) / 86400"
+    output_field = FloatField()
+
+
+class Median(Aggregate):
+    function = "PERCENTILE_CONT"
+    template = "%(function)s(0.5) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = FloatField()
+
+
+def add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def ensure_partitions(months_ahead=PARTITION_MONTHS_AHEAD, today=None):
+    """
+    Создает секции истории с текущего месяца на `months_ahead` месяцев вперед.
+
+    Returns:
+        list: Имена созданных секций (существующие пропускаются).
+    """
+    today = today or timezone.now().date()
+    created = []
+    with connection.cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            cursor.execute(
+                "SELECT properties_listingstatushistory_partition(%s)",
+                [add_months(today, offset)],
+            )
+            name = cursor.fetchone()[0]
+            if name:
+                created.append(name)
+    return created
+
+
+def days_on_market(start, end, city=None):
+    """
+    Срок экспозиции объектов, проданных в период (по городам).
+
+    Args:
+        start (date): Начальная дата (включительно).
+        end (date): Конечная дата (включительно).
+        city (str): Город (без учета регистра) или None.
+
+    Returns:
+        QuerySet: Словари city, sold, avg_days, median_days.
+    """
+    days = Days(F("changed_at") - F("listed_at"))
+    # Условие по changed_at отсекает секции вне периода
+    queryset = ListingStatusHistory.objects.filter(
+        status="sold",
+        changed_at__gte=start_of_day(start),
+        changed_at__lt=start_of_day(end + timedelta(days=1)),
+        listed_at__isnull=False,
+    )
+    if city:
+        queryset = queryset.filter(listing__city__iexact=city)
+    return (
+        queryset.values(city=F("listing__city"))
+        .annotate(sold=Count("id"), avg_days=Avg(days), median_days=Median(days))
+        .order_by("city")
+    )
@@ -1,5 +1,6 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from rest_framework.test import APIClient
 from unittest.mock import Mock
 from properties.models import RealEstateObject, Catalog, CatalogListing
@@ -8,6 +9,18 @@ from users.models import UserProfile, Role
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Очищает кэши между тестами (кластеры, фасеты и ответы API кэшируются).
+    """
+    for cache in caches.all():
+        cache.clear()
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
 @pytest.fixture
 def api_client():
     """
@@ -207,3 +220,30 @@ def another_broker_catalog(another_broker):
         is_public=True,
         broker=another_broker,
     )
+
+
+@pytest.fixture
+def located_objects(broker):
+    """
+    Фикстура для создания объектов с координатами (Париж, Версаль, Лондон).
+    """
+    points = [
+        ("Paris center", 48.856600, 2.352200),
+        ("Versailles", 48.804900, 2.120400),
+        ("London", 51.507400, -0.127800),
+    ]
+    return [
+        RealEstateObject.objects.create(
+            name=name,
+            price=100000,
+            country="Country",
+            city="City",
+            address=f"{idx} Geo Street",
+            latitude=lat,
+            longitude=lon,
+            area=50.0,
+            rooms=2,
+            broker=broker,
+        )
+        for idx, (name, lat, lon) in enumerate(points)
+    ]
@@ -0,0 +1,74 @@
+import pytest
+from django.db import IntegrityError
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_400_BAD_REQUEST
+from properties.addresses import DUPLICATE_ADDRESS_ERROR, make_address_key
+from properties.models import RealEstateObject
+
+
+def object_data(**overrides):
+    data = {
+        "name": "Address Object",
+        "price": 100000,
+        "country": "Country",
+        "city": "City",
+        "address": "1 Unique Street",
+        "area": 80.0,
+        "rooms": 3,
+    }
+    data.update(overrides)
+    return data
+
+
+@pytest.mark.django_db
+class TestAddressKey:
+    def test_key_matches_database(self, broker):
+        """
+        Триггер БД вычисляет тот же ключ, что и make_address_key.
+        """
+        obj = RealEstateObject.objects.create(
+            broker=broker, **object_data(address="  7\tGreen   Lane ", district="Центр")
+        )
+        obj.refresh_from_db()
+        assert obj.address_key == make_address_key(
+            "country", "city", "ЦЕНТР", "7 green lane"
+        )
+
+    def test_api_rejects_normalized_duplicate(
+        self, api_client, broker, real_estate_object
+    ):
+        """
+        Дубль адреса с другим регистром и пробелами отклоняется с ошибкой валидации;
+        с complex_name повтор адреса разрешен.
+        """
+        api_client.force_authenticate(broker)
+        url = reverse("object-list")
+        address = "  123  MAIN street"
+        response = api_client.post(url, object_data(address=address), format="json")
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        assert response.data["address"] == [DUPLICATE_ADDRESS_ERROR]
+
+        data = object_data(address=address, complex_name="Sunrise")
+        response = api_client.post(url, data, format="json")
+        assert response.status_code == HTTP_201_CREATED, response.data
+
+    def test_update_to_taken_address(
+        self, api_client, broker, real_estate_object, another_real_estate_object
+    ):
+        """
+        Обновление адреса на занятый отклоняется и в API, и при bulk-обновлении.
+        """
+        api_client.force_authenticate(broker)
+        url = reverse("object-detail", args=[another_real_estate_object.pk])
+        data = object_data(address=real_estate_object.address)
+        response = api_client.put(url, data, format="json")
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        assert response.data["address"] == [DUPLICATE_ADDRESS_ERROR]
+
+        response = api_client.put(url, object_data(), format="json")
+        assert response.status_code == HTTP_200_OK, response.data
+
+        with pytest.raises(IntegrityError):
+            RealEstateObject.objects.filter(pk=another_real_estate_object.pk).update(
+                address=real_estate_object.address.upper()
+            )
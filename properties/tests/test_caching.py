@@ -0,0 +1,128 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK
+from properties.caching import get_stats
+from properties.models import CatalogListing, RealEstateObject
+
+
+@pytest.mark.django_db
+class TestAnonymousResponseCache:
+    def test_list_cached_for_anonymous(
+        self, api_client, real_estate_objects, django_assert_num_queries
+    ):
+        """
+        Повторный анонимный запрос списка отдается из кэша без запросов к БД.
+        """
+        url = reverse("object-list")
+        response = api_client.get(url, {"status": "sale", "ordering": "price"})
+        assert response["X-Cache"] == "MISS"
+
+        with django_assert_num_queries(0):
+            response = api_client.get(url, {"ordering": "price", "status": "sale"})
+        assert response.status_code == HTTP_200_OK
+        assert response["X-Cache"] == "HIT"
+        assert len(response.data["results"]) == 1
+        assert get_stats() == {"hits": 1, "misses": 1}
+
+    def test_list_invalidated_on_save_and_delete(
+        self, api_client, real_estate_objects, broker
+    ):
+        """
+        Создание и удаление объекта инвалидирует кэш списка.
+        """
+        url = reverse("object-list")
+        assert api_client.get(url).data["count"] == 2
+
+        obj = RealEstateObject.objects.create(
+            name="New",
+            price=1,
+            country="Country",
+            city="City",
+            address="1 New Street",
+            area=10,
+            rooms=1,
+            broker=broker,
+        )
+        response = api_client.get(url)
+        assert response["X-Cache"] == "MISS"
+        assert response.data["count"] == 3
+
+        obj.delete()
+        assert api_client.get(url).data["count"] == 2
+
+    def test_detail_invalidated_only_for_changed_object(
+        self, api_client, real_estate_objects
+    ):
+        """
+        Изменение объекта инвалидирует только его карточку.
+        """
+        first, second = real_estate_objects
+        first_url = reverse("object-detail", args=[first.id])
+        second_url = reverse("object-detail", args=[second.id])
+        api_client.get(first_url)
+        api_client.get(second_url)
+
+        first.name = "Renamed"
+        first.save()
+
+        response = api_client.get(first_url)
+        assert response["X-Cache"] == "MISS"
+        assert response.data["name"] == "Renamed"
+        assert api_client.get(second_url)["X-Cache"] == "HIT"
+
+    def test_authenticated_requests_not_cached(
+        self, api_client, buyer, real_estate_object
+    ):
+        """
+        Запросы аутентифицированных пользователей не кэшируются.
+        """
+        api_client.force_authenticate(buyer)
+        response = api_client.get(
+            reverse("object-detail", args=[real_estate_object.id])
+        )
+        assert response.status_code == HTTP_200_OK
+        assert "X-Cache" not in response
+
+    def test_catalog_invalidated_by_catalog_listing(
+        self, api_client, public_catalog, real_estate_object
+    ):
+        """
+        Добавление объекта в каталог инвалидирует кэш каталога.
+        """
+        url = reverse("catalog-detail", args=[public_catalog.id])
+        api_client.get(url)
+        assert api_client.get(url)["X-Cache"] == "HIT"
+
+        CatalogListing.objects.create(
+            catalog=public_catalog, listing=real_estate_object
+        )
+        assert api_client.get(url)["X-Cache"] == "MISS"
+
+    def test_catalog_list_cached(self, api_client, public_catalog):
+        """
+        Список каталогов кэшируется и инвалидируется при изменении каталога.
+        """
+        url = reverse("catalog-list")
+        assert api_client.get(url)["X-Cache"] == "MISS"
+        assert api_client.get(url)["X-Cache"] == "HIT"
+
+        public_catalog.name = "Renamed"
+        public_catalog.save()
+        response = api_client.get(url)
+        assert response["X-Cache"] == "MISS"
+        assert response.status_code == HTTP_200_OK
+
+    def test_stats_command(self, api_client, real_estate_objects):
+        """
+        Команда listings_cache_stats выводит и сбрасывает счетчики.
+        """
+        url = reverse("object-list")
+        api_client.get(url)
+        api_client.get(url)
+
+        out = StringIO()
+        call_command("listings_cache_stats", "--reset", stdout=out)
+        assert "hits: 1, misses: 1" in out.getvalue()
+        assert get_stats() == {"hits": 0, "misses": 0}
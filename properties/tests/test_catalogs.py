@@ -0,0 +1,336 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.exceptions import ValidationError
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_400_BAD_REQUEST,
+    HTTP_403_FORBIDDEN,
+    HTTP_404_NOT_FOUND,
+)
+
+from properties.catalogs import (
+    EMBEDDED_LISTINGS,
+    LISTING_ORDER,
+    SORT_GAP,
+    crowded_catalogs,
+    move_catalog_listing,
+    sync_catalog_listings,
+)
+from properties.models import Catalog, CatalogListing, RealEstateObject
+from properties.serializers import CatalogSerializer
+
+
+def create_objects(broker, count, start=0):
+    return RealEstateObject.objects.bulk_create(
+        RealEstateObject(
+            name=f"Object {number}",
+            price=100000,
+            currency="USD",
+            status="sale",
+            country="Country",
+            city="City",
+            address=f"{number} Sync Street",
+            area=50,
+            rooms=2,
+            broker=broker,
+        )
+        for number in range(start, start + count)
+    )
+
+
+def writes(queries):
+    return [
+        query["sql"].split()[0]
+        for query in queries.captured_queries
+        if query["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+    ]
+
+
+@pytest.mark.django_db
+class TestSyncCatalogListings:
+    def test_update_keeps_metadata(self, catalog_with_listings, mock_request):
+        """
+        Оставшиеся связи сохраняют sort_order и notes, новые объекты
+        добавляются в конец каталога.
+        """
+        kept, removed = catalog_with_listings.listings.order_by("sort_order")[:2]
+        kept.notes = "Позвонить владельцу"
+        kept.sort_order = 10
+        kept.save()
+        new = create_objects(catalog_with_listings.broker, 2)
+
+        serializer = CatalogSerializer(
+            instance=catalog_with_listings,
+            data={"catalog_objects": [new[1].id, kept.listing_id, new[0].id]},
+            partial=True,
+            context={"request": mock_request(catalog_with_listings.broker)},
+        )
+        assert serializer.is_valid(), serializer.errors
+        serializer.save()
+
+        rows = list(
+            catalog_with_listings.listings.order_by("sort_order").values_list(
+                "id", "listing_id", "sort_order", "notes"
+            )
+        )
+        assert rows == [
+            (kept.id, kept.listing_id, 10, "Позвонить владельцу"),
+            (rows[1][0], new[1].id, 10 + SORT_GAP, None),
+            (rows[2][0], new[0].id, 10 + 2 * SORT_GAP, None),
+        ]
+
+    def test_batched_statements_per_change(self, catalog, broker):
+        """
+        Добавление сотен объектов выполняется одним INSERT, удаление —
+        пакетами DELETE; повторы в списке игнорируются.
+        """
+        objects = create_objects(broker, 300)
+        with CaptureQueriesContext(connection) as queries:
+            assert sync_catalog_listings(catalog, objects + objects[:10]) == (300, 0)
+        assert writes(queries) == ["INSERT"]
+        assert "FOR UPDATE" in queries.captured_queries[1]["sql"]
+
+        with CaptureQueriesContext(connection) as queries:
+            assert sync_catalog_listings(catalog, objects[150:]) == (0, 150)
+        assert writes(queries) == ["DELETE", "DELETE"]
+
+        with CaptureQueriesContext(connection) as queries:
+            assert sync_catalog_listings(catalog, objects[150:]) == (0, 0)
+        assert writes(queries) == []
+        assert catalog.listings.count() == 150
+
+    def test_unique_listing(self, catalog, real_estate_object):
+        """
+        Объект нельзя добавить в каталог дважды.
+        """
+        sync_catalog_listings(catalog, [real_estate_object])
+        with pytest.raises(IntegrityError), transaction.atomic():
+            CatalogListing.objects.create(catalog=catalog, listing=real_estate_object)
+
+    def test_create_uses_bulk_path(self, broker, mock_request):
+        """
+        Каталог создается вместе с составом одним INSERT связей.
+        """
+        objects = create_objects(broker, 50)
+        serializer = CatalogSerializer(
+            data={"name": "Bulk", "catalog_objects": [obj.id for obj in objects]},
+            context={"request": mock_request(broker)},
+        )
+        assert serializer.is_valid(), serializer.errors
+        with CaptureQueriesContext(connection) as queries:
+            catalog = serializer.save(broker=broker)
+        assert writes(queries) == ["INSERT", "INSERT"]
+        assert list(
+            catalog.listings.order_by("sort_order").values_list("listing_id", flat=True)
+        ) == [obj.id for obj in objects]
+
+
+@pytest.mark.django_db
+class TestBulkPrimaryKeyRelatedField:
+    def catalog_queries(self, broker, mock_request, ids):
+        serializer = CatalogSerializer(
+            data={"name": "Bulk", "catalog_objects": ids},
+            context={"request": mock_request(broker)},
+        )
+        with CaptureQueriesContext(connection) as queries:
+            assert serializer.is_valid(), serializer.errors
+            serializer.save(broker=broker)
+        return len(queries)
+
+    def test_constant_queries(self, broker, mock_request):
+        """
+        Число запросов при создании каталога не зависит от числа ID.
+        """
+        objects = create_objects(broker, 500)
+        ids = [obj.id for obj in objects]
+        few = self.catalog_queries(broker, mock_request, ids[:5])
+        assert self.catalog_queries(broker, mock_request, ids) == few
+
+    def test_missing_and_invalid_ids(self, real_estate_object):
+        """
+        В ошибке перечисляются все несуществующие ID; возвращаются объекты
+        в порядке запроса.
+        """
+        field = CatalogSerializer().fields["catalog_objects"]
+        missing = real_estate_object.id + 1000
+
+        with pytest.raises(ValidationError) as error:
+            field.run_validation([real_estate_object.id, missing, missing + 1, missing])
+        assert error.value.detail == [f"Объекты не найдены: {missing}, {missing + 1}."]
+
+        with pytest.raises(ValidationError) as error:
+            field.run_validation([real_estate_object.id, "abc"])
+        assert error.value.detail[0].code == "incorrect_type"
+
+        with CaptureQueriesContext(connection) as queries:
+            result = field.run_validation([str(real_estate_object.id)])
+        assert len(queries) == 1
+        assert [obj.pk for obj in result] == [real_estate_object.id]
+
+
+@pytest.mark.django_db
+class TestCatalogEmbed:
+    @pytest.fixture
+    def catalogs(self, broker):
+        objects = create_objects(broker, 6)
+        objects[0].photos = ["cover.jpg", "second.jpg"]
+        objects[0].save()
+        catalogs = []
+        for number in range(3):
+            catalog = Catalog.objects.create(
+                name=f"Catalog {number}", is_public=True, broker=broker
+            )
+            sync_catalog_listings(catalog, reversed(objects))
+            catalogs.append(catalog)
+        return objects, catalogs
+
+    def test_list_query_count(
+        self, api_client, broker, catalogs, django_assert_num_queries
+    ):
+        """
+        Число запросов списка не зависит от числа каталогов и объектов:
+        COUNT, каталоги с брокерами, состав и (с embed) оконный запрос превью.
+        """
+        objects, _ = catalogs
+        api_client.force_authenticate(broker)
+        url = reverse("catalog-list")
+
+        with django_assert_num_queries(3):
+            response = api_client.get(url)
+        assert response.status_code == HTTP_200_OK
+        row = response.data["results"][0]
+        assert row["broker"] == broker.email
+        assert row["catalog_objects"] == [obj.id for obj in reversed(objects)]
+        assert "listings" not in row
+
+        with django_assert_num_queries(4):
+            response = api_client.get(url, {"embed": "listings"})
+        assert response.status_code == HTTP_200_OK
+        for row in response.data["results"]:
+            cards = row["listings"]
+            assert [card["id"] for card in cards] == [
+                obj.id for obj in list(reversed(objects))[:EMBEDDED_LISTINGS]
+            ]
+            assert [card["sort_order"] for card in cards] == [
+                SORT_GAP * position for position in (1, 2, 3, 4)
+            ]
+            assert cards[0]["name"] == objects[-1].name
+
+    def test_detail_embed_and_cache(self, api_client, catalogs):
+        """
+        Превью в карточке каталога; кэш анонимного ответа сбрасывается
+        при изменении объекта.
+        """
+        objects, catalogs = catalogs
+        CatalogListing.objects.filter(listing=objects[0]).update(sort_order=0)
+        url = reverse("catalog-detail", args=[catalogs[0].id])
+
+        response = api_client.get(url, {"embed": "listings"})
+        card = response.data["listings"][0]
+        assert (card["id"], card["cover_photo"]) == (objects[0].id, "cover.jpg")
+
+        objects[0].name = "Renamed"
+        objects[0].save()
+        response = api_client.get(url, {"embed": "listings"})
+        assert response["X-Cache"] == "MISS"
+        assert response.data["listings"][0]["name"] == "Renamed"
+
+        response = api_client.get(url, {"embed": "photos"})
+        assert response.status_code == HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestMoveCatalogListing:
+    @pytest.fixture
+    def ordered(self, catalog, broker):
+        objects = create_objects(broker, 4)
+        sync_catalog_listings(catalog, objects)
+        return objects
+
+    def order(self, catalog):
+        return list(
+            catalog.listings.order_by(*LISTING_ORDER).values_list(
+                "listing_id", flat=True
+            )
+        )
+
+    def move(self, api_client, catalog, listing, **data):
+        url = reverse("catalog-listing-move", args=[catalog.id, listing.id])
+        return api_client.post(url, data, format="json")
+
+    def test_move_updates_one_row(self, api_client, catalog, ordered):
+        """
+        Перемещение меняет ключ одной связи; ETag каталога меняется.
+        """
+        a, b, c, d = ordered
+        api_client.force_authenticate(catalog.broker)
+        detail = reverse("catalog-detail", args=[catalog.id])
+        etag = api_client.get(detail)["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.move(api_client, catalog, d, after=a.id)
+        assert response.status_code == HTTP_200_OK
+        assert writes(queries) == ["UPDATE"]
+        assert response.data == {"listing": d.id, "sort_order": SORT_GAP * 3 // 2}
+        assert self.order(catalog) == [a.id, d.id, b.id, c.id]
+
+        assert self.move(api_client, catalog, c, before=a.id).status_code == HTTP_200_OK
+        assert self.order(catalog) == [c.id, a.id, d.id, b.id]
+        assert self.move(api_client, catalog, c, after=b.id).status_code == HTTP_200_OK
+        assert self.order(catalog) == [a.id, d.id, b.id, c.id]
+
+        response = api_client.get(detail, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTP_200_OK
+        assert response.data["catalog_objects"] == [a.id, d.id, b.id, c.id]
+
+    def test_exhausted_gap_renumbers(self, catalog, ordered):
+        """
+        Когда места между соседями нет, каталог перенумеровывается; фоновая
+        команда находит и перенумеровывает такие каталоги заранее.
+        """
+        a, b, c, d = ordered
+        CatalogListing.objects.filter(listing=b).update(sort_order=SORT_GAP + 1)
+        assert crowded_catalogs() == [catalog.id]
+
+        link = move_catalog_listing(catalog, d.id, after=a.id)
+        assert self.order(catalog) == [a.id, d.id, b.id, c.id]
+        assert link.sort_order == SORT_GAP * 3 // 2
+        assert crowded_catalogs() == []
+
+        CatalogListing.objects.filter(listing=c).update(sort_order=SORT_GAP * 2 + 1)
+        out = StringIO()
+        call_command("renumber_catalog_listings", stdout=out)
+        assert "Перенумеровано каталогов: 1." in out.getvalue()
+        assert list(
+            catalog.listings.order_by(*LISTING_ORDER).values_list(
+                "sort_order", flat=True
+            )
+        ) == [SORT_GAP * position for position in (1, 2, 3, 4)]
+
+    def test_move_errors(self, api_client, catalog, ordered, another_broker, broker):
+        """
+        Ошибки: чужой каталог, объект или сосед не из каталога, неверное тело.
+        """
+        a, b, _, _ = ordered
+        outsider = create_objects(broker, 1, start=100)[0]
+
+        api_client.force_authenticate(another_broker)
+        response = self.move(api_client, catalog, a, after=b.id)
+        assert response.status_code == HTTP_403_FORBIDDEN
+
+        api_client.force_authenticate(broker)
+        response = self.move(api_client, catalog, outsider, after=b.id)
+        assert response.status_code == HTTP_404_NOT_FOUND
+        response = self.move(api_client, catalog, a, before=outsider.id)
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        assert "before" in response.data
+        for data in ({}, {"before": b.id, "after": b.id}):
+            response = self.move(api_client, catalog, a, **data)
+            assert response.status_code == HTTP_400_BAD_REQUEST
+        response = self.move(api_client, catalog, a, after=a.id)
+        assert response.status_code == HTTP_400_BAD_REQUEST
@@ -0,0 +1,63 @@
+import pytest
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from properties.models import RealEstateObject
+
+WORLD = "-180,-90,180,90"
+
+
+def get_clusters(api_client, **params):
+    response = api_client.get(reverse("object-clusters"), params)
+    assert response.status_code == HTTP_200_OK, response.data
+    return sorted(response.data["clusters"], key=lambda c: c["longitude"])
+
+
+@pytest.mark.django_db
+class TestObjectClusters:
+    def test_low_zoom_groups_nearby_objects(self, api_client, located_objects):
+        """
+        На малом масштабе Париж и Версаль объединяются в один кластер.
+        """
+        london, paris = get_clusters(api_client, bbox=WORLD, zoom=0)
+        assert london["count"] == 1
+        assert london["id"] == RealEstateObject.objects.get(name="London").id
+        assert paris["count"] == 2
+        assert "id" not in paris
+        assert 48.80 < paris["latitude"] < 48.86
+        assert paris["price_min"] == paris["price_max"] == "100000.00"
+
+    def test_high_zoom_separates_objects(self, api_client, located_objects):
+        """
+        На крупном масштабе каждый объект образует свой кластер.
+        """
+        clusters = get_clusters(api_client, bbox="2.0,48.7,2.5,49.0", zoom=10)
+        assert [c["count"] for c in clusters] == [1, 1]
+
+    def test_clusters_respect_filters(self, api_client, located_objects):
+        """
+        Кластеры учитывают фильтры RealEstateObjectFilter.
+        """
+        RealEstateObject.objects.filter(name="Versailles").update(status="rent")
+        clusters = get_clusters(api_client, bbox=WORLD, zoom=0, status="rent")
+        assert [c["count"] for c in clusters] == [1]
+
+    def test_tiles_are_cached(
+        self, api_client, located_objects, django_assert_num_queries
+    ):
+        """
+        Повторный запрос тех же тайлов не обращается к БД.
+        """
+        get_clusters(api_client, bbox=WORLD, zoom=1)
+        with django_assert_num_queries(0):
+            get_clusters(api_client, bbox="-10,40,10,60", zoom=1)
+
+    def test_invalid_params(self, api_client, located_objects):
+        """
+        Некорректные bbox/zoom и слишком большая область возвращают 400.
+        """
+        url = reverse("object-clusters")
+        assert api_client.get(url, {"bbox": WORLD}).status_code == HTTP_400_BAD_REQUEST
+        response = api_client.get(url, {"bbox": "1,2,3", "zoom": 3})
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        response = api_client.get(url, {"bbox": WORLD, "zoom": 12})
+        assert response.status_code == HTTP_400_BAD_REQUEST
@@ -0,0 +1,89 @@
+import pytest
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED
+from properties.models import CatalogListing
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def test_detail_etag_not_modified(
+        self, api_client, buyer, real_estate_object, django_assert_num_queries
+    ):
+        """
+        Совпадающий If-None-Match возвращает 304 после одного агрегирующего запроса.
+        """
+        api_client.force_authenticate(buyer)
+        url = reverse("object-detail", args=[real_estate_object.id])
+        response = api_client.get(url)
+        assert response.status_code == HTTP_200_OK
+        etag = response["ETag"]
+        assert etag.startswith('W/"')
+        assert "Last-Modified" in response
+
+        with django_assert_num_queries(1):
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+
+    def test_detail_etag_changes_after_update(self, api_client, real_estate_object):
+        """
+        После изменения объекта старый ETag больше не совпадает.
+        """
+        url = reverse("object-detail", args=[real_estate_object.id])
+        etag = api_client.get(url)["ETag"]
+
+        real_estate_object.name = "Changed"
+        real_estate_object.save()
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTP_200_OK
+        assert response.data["name"] == "Changed"
+
+    def test_if_modified_since(self, api_client, real_estate_object):
+        """
+        If-Modified-Since с датой последнего изменения возвращает 304.
+        """
+        url = reverse("object-detail", args=[real_estate_object.id])
+        last_modified = api_client.get(url)["Last-Modified"]
+        response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+
+    def test_list_etag_depends_on_query_and_count(
+        self, api_client, real_estate_objects
+    ):
+        """
+        ETag списка зависит от параметров запроса и количества объектов.
+        """
+        url = reverse("object-list")
+        etag = api_client.get(url, {"status": "sale"})["ETag"]
+        assert api_client.get(url, {"status": "rent"})["ETag"] != etag
+
+        response = api_client.get(url, {"status": "sale"}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+
+        real_estate_objects[0].delete()
+        response = api_client.get(url, {"status": "sale"}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTP_200_OK
+
+    def test_catalog_etag_changes_with_listings(
+        self, api_client, public_catalog, real_estate_object
+    ):
+        """
+        ETag каталога меняется при изменении его состава.
+        """
+        url = reverse("catalog-detail", args=[public_catalog.id])
+        etag = api_client.get(url)["ETag"]
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        CatalogListing.objects.create(
+            catalog=public_catalog, listing=real_estate_object
+        )
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == HTTP_200_OK
+
+    def test_private_catalog_has_no_validators(self, api_client, private_catalog):
+        """
+        Для недоступного приватного каталога ETag не выдается.
+        """
+        response = api_client.get(reverse("catalog-detail", args=[private_catalog.id]))
+        assert response.status_code == 403
+        assert "ETag" not in response
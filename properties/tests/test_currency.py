@@ -0,0 +1,176 @@
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from properties.currency import set_rates
+from properties.models import ExchangeRate, RealEstateObject
+
+
+@pytest.fixture
+def priced_objects(broker):
+    """
+    Фикстура для создания объектов с ценами в разных валютах.
+    """
+    ExchangeRate.objects.create(currency="EUR", rate=Decimal("1.10"))
+    prices = [
+        ("Dollars", 100000, "USD"),
+        ("Euros", 95000, "eur"),
+        ("Pounds", 90000, "GBP"),  # курса нет
+    ]
+    return [
+        RealEstateObject.objects.create(
+            name=name,
+            price=price,
+            currency=currency,
+            country="Country",
+            city="City",
+            address=f"{idx} Currency Street",
+            area=50.0,
+            rooms=2,
+            broker=broker,
+        )
+        for idx, (name, price, currency) in enumerate(prices)
+    ]
+
+
+def names(response):
+    assert response.status_code == HTTP_200_OK, response.data
+    return [obj["name"] for obj in response.data["results"]]
+
+
+@pytest.mark.django_db
+class TestPriceBase:
+    def test_price_base_maintained_by_trigger(self, priced_objects):
+        """
+        price_base вычисляется БД при создании и при bulk-обновлении цены.
+        """
+        dollars, euros, pounds = priced_objects
+        euros.refresh_from_db()
+        pounds.refresh_from_db()
+        assert euros.price_base == Decimal("104500.00")
+        assert pounds.price_base is None
+
+        RealEstateObject.objects.filter(pk=dollars.pk).update(price=120000)
+        dollars.refresh_from_db()
+        assert dollars.price_base == Decimal("120000.00")
+
+    def test_rate_change_recomputes_in_bulk(self, priced_objects):
+        """
+        Изменение курса пересчитывает price_base объектов в этой валюте.
+        """
+        rate = ExchangeRate.objects.get(currency="EUR")
+        rate.rate = Decimal("1.20")
+        rate.save()
+        assert RealEstateObject.objects.get(name="Euros").price_base == Decimal(
+            "114000.00"
+        )
+
+        out = StringIO()
+        call_command("update_exchange_rates", "GBP=1.25", "EUR=1.00", stdout=out)
+        assert "пересчитано объектов: 2" in out.getvalue()
+        assert RealEstateObject.objects.get(name="Pounds").price_base == Decimal(
+            "112500.00"
+        )
+
+    def test_rate_update_touches_changed_prices_only(self, priced_objects):
+        """
+        Пересчет курса обновляет только объекты, у которых меняется
+        price_base, и не меняет updated_at.
+        """
+        dollars, euros, pounds = priced_objects
+        euros.refresh_from_db()
+        assert set_rates({"EUR": Decimal("1.10")}) == 0
+        assert set_rates({"EUR": Decimal("1.20"), "GBP": Decimal("1.30")}) == 2
+
+        for obj in (euros, pounds):
+            updated_at = obj.updated_at
+            obj.refresh_from_db()
+            assert obj.updated_at == updated_at
+        assert (euros.price_base, pounds.price_base) == (
+            Decimal("114000.00"),
+            Decimal("117000.00"),
+        )
+
+    def test_rate_update_invalidates_responses(self, api_client, priced_objects):
+        """
+        После пересчета курса меняются ETag списка и кэш карточек объектов;
+        служебные price_base и listed_at в API не выводятся.
+        """
+        euros = priced_objects[1]
+        detail = reverse("object-detail", args=[euros.pk])
+        assert api_client.get(detail)["X-Cache"] == "MISS"
+        assert api_client.get(detail)["X-Cache"] == "HIT"
+        url = reverse("object-list")
+        params = {"ordering": "-price"}
+        etag = api_client.get(url, params)["ETag"]
+
+        set_rates({"EUR": Decimal("0.50")})
+
+        response = api_client.get(detail)
+        assert response["X-Cache"] == "MISS"
+        assert not {"price_base", "listed_at"} & set(response.data)
+        response = api_client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTP_200_OK
+        assert names(response) == ["Dollars", "Euros", "Pounds"]
+        assert "price_base" not in response.data["results"][0]
+
+    def test_price_filter_across_currencies(self, api_client, priced_objects):
+        """
+        price_min/price_max сравниваются в базовой или указанной валюте.
+        """
+        url = reverse("object-list")
+        assert names(api_client.get(url, {"price_min": 101000})) == ["Euros"]
+        params = {"price_max": 92000, "currency": "EUR"}
+        assert names(api_client.get(url, params)) == ["Dollars"]
+
+    def test_ordering_by_price_uses_base_currency(
+        self, api_client, broker, priced_objects
+    ):
+        """
+        ordering=price сортирует по цене в базовой валюте, в том числе по
+        курсору; объекты без курса не пропадают и идут в конце в порядке id
+        (в направлении сортировки).
+        """
+        RealEstateObject.objects.create(
+            name="Pounds 2",
+            price=80000,
+            currency="GBP",
+            country="Country",
+            city="City",
+            address="9 Currency Street",
+            area=50.0,
+            rooms=2,
+            broker=broker,
+        )
+        url = reverse("object-list")
+        response = api_client.get(url, {"ordering": "-price"})
+        assert names(response) == ["Euros", "Dollars", "Pounds 2", "Pounds"]
+        response = api_client.get(url, {"ordering": "price"})
+        assert names(response) == ["Dollars", "Euros", "Pounds", "Pounds 2"]
+
+        for ordering in ("-price", "price"):
+            expected = names(api_client.get(url, {"ordering": ordering}))
+            params = {"ordering": ordering, "pagination": "cursor", "page_size": 1}
+            pages = [api_client.get(url, params)]
+            while pages[-1].data["next"]:
+                pages.append(api_client.get(pages[-1].data["next"]))
+            assert [names(page)[0] for page in pages] == expected
+
+            # Обратный обход по ссылкам previous проходит NULL-группу назад
+            backward = [pages[-1]]
+            while backward[-1].data["previous"]:
+                backward.append(api_client.get(backward[-1].data["previous"]))
+            assert [names(page)[0] for page in backward] == expected[::-1]
+
+    def test_unknown_currency(self, api_client, priced_objects):
+        """
+        Валюта без курса в параметре currency возвращает 400.
+        """
+        response = api_client.get(
+            reverse("object-list"), {"price_min": 1, "currency": "GBP"}
+        )
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        assert "currency" in response.data
@@ -0,0 +1,125 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from properties.duplicates import DuplicateDetector, similarity, trigrams
+from properties.models import DuplicateCandidate, DuplicateScan, RealEstateObject
+
+
+@pytest.fixture
+def listings(broker, another_broker):
+    """
+    Фикстура: одна квартира у трех брокеров, соседняя квартира, похожая
+    квартира с другим числом комнат и объект без координат.
+    """
+
+    def create(broker, name, address, **extra):
+        data = {
+            "price": 200000,
+            "country": "Country",
+            "city": "Dupcity",
+            "area": 64.0,
+            "rooms": 2,
+            "latitude": 55.7512,
+            "longitude": 37.6184,
+        }
+        data.update(extra)
+        return RealEstateObject.objects.create(
+            broker=broker, name=name, address=address, **data
+        )
+
+    return {
+        "original": create(broker, "Квартира на Тверской", "Тверская ул., 7, кв. 12"),
+        "copy": create(
+            another_broker,
+            "Квартира Тверская",
+            "ул. Тверская 7 кв 12",
+            area=63.0,
+            latitude=55.7531,
+        ),
+        "copy_of_copy": create(
+            another_broker,
+            "2-к квартира Тверская",
+            "Тверская улица, 7, кв. 12",
+            price=205000,
+            complex_name="Tverskaya",
+        ),
+        "neighbour": create(broker, "Квартира на Тверской", "Тверская ул., 7, кв. 13"),
+        "other_rooms": create(
+            broker, "Квартира на Тверской", "Тверская ул., 7, кв. 14", rooms=3
+        ),
+        "far": create(
+            broker,
+            "Квартира на Тверской",
+            "Тверская ул., 7, кв. 16",
+            latitude=None,
+            longitude=None,
+            district="North",
+        ),
+    }
+
+
+def pairs():
+    return {
+        (candidate.listing_id, candidate.duplicate_id)
+        for candidate in DuplicateCandidate.objects.filter(dismissed=False)
+    }
+
+
+@pytest.mark.django_db
+class TestDuplicateDetector:
+    def test_similarity_matches_pg_trgm(self):
+        """
+        Триграммы считаются как в pg_trgm: similarity('word', 'two words') = 4/11.
+        """
+        assert similarity(trigrams("word"), trigrams("two words")) == 4 / 11
+        assert trigrams("Дом, 7") == trigrams("дом 7")
+
+    def test_finds_and_clusters_duplicates(self, listings):
+        """
+        Дубли одного объекта объединяются в группу; соседняя квартира (другой
+        номер в адресе), объекты с другим числом комнат и из другого блока
+        дублями не считаются.
+        """
+        scan = DuplicateDetector().run()
+        original, copy, copy_of_copy = (
+            listings[name].pk for name in ("original", "copy", "copy_of_copy")
+        )
+
+        assert scan.full and scan.checked == 6
+        assert pairs() == {
+            (original, copy),
+            (original, copy_of_copy),
+            (copy, copy_of_copy),
+        }
+        assert set(DuplicateCandidate.objects.values_list("cluster", flat=True)) == {
+            original
+        }
+
+    def test_incremental_run_keeps_dismissed_pairs(self, listings):
+        """
+        Повторный запуск проверяет только измененные объекты и не
+        возвращает пары, отклоненные при проверке.
+        """
+        DuplicateDetector().run()
+        original, copy = listings["original"], listings["copy"]
+        DuplicateCandidate.objects.filter(listing=original, duplicate=copy).update(
+            dismissed=True
+        )
+
+        copy.address = "Совсем другой адрес, 99"
+        copy.save()
+        scan = DuplicateDetector().run()
+
+        assert not scan.full and scan.checked == 1
+        assert pairs() == {(original.pk, listings["copy_of_copy"].pk)}
+        assert DuplicateCandidate.objects.filter(dismissed=True).count() == 1
+
+    def test_command(self, listings):
+        """
+        Команда find_duplicates выводит статистику запуска.
+        """
+        out = StringIO()
+        call_command("find_duplicates", "--threshold", "0.9", stdout=out)
+        assert "Проверено объектов: 6, найдено пар: 0" in out.getvalue()
+        assert DuplicateScan.objects.get().finished_at is not None
@@ -0,0 +1,89 @@
+import csv
+import gzip
+import json
+from io import StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_400_BAD_REQUEST,
+    HTTP_401_UNAUTHORIZED,
+)
+from properties.models import RealEstateObject
+
+
+def export(api_client, **params):
+    response = api_client.get(reverse("object-export"), params)
+    assert response.status_code == HTTP_200_OK
+    return b"".join(response.streaming_content)
+
+
+@pytest.mark.django_db
+class TestObjectExport:
+    def test_jsonl_matches_list(self, api_client, buyer, real_estate_objects):
+        """
+        JSONL-выгрузка совпадает со списком объектов и учитывает фильтры.
+        """
+        api_client.force_authenticate(buyer)
+        listed = api_client.get(reverse("object-list"), {"status": "sale"}).data
+        content = export(api_client, status="sale")
+
+        rows = [json.loads(line) for line in content.decode("utf-8").splitlines()]
+        assert rows == json.loads(json.dumps(listed["results"]))
+        assert [row["name"] for row in rows] == ["Object 1"]
+
+    def test_csv_sparse_fields_and_gzip(self, api_client, buyer, real_estate_objects):
+        """
+        CSV с выборочными полями, в том числе сжатый в gzip.
+        """
+        api_client.force_authenticate(buyer)
+        params = {"file_format": "csv", "fields": "name,price", "ordering": "price"}
+        content = export(api_client, **params)
+        assert export(api_client, gzip="true", **params) != content
+
+        response = api_client.get(reverse("object-export"), dict(params, gzip="1"))
+        assert response["Content-Type"] == "application/gzip"
+        assert "objects.csv.gz" in response["Content-Disposition"]
+        unpacked = gzip.decompress(b"".join(response.streaming_content))
+        assert unpacked == content
+
+        rows = list(csv.reader(StringIO(content.decode("utf-8"))))
+        assert rows == [
+            ["name", "price"],
+            ["Object 1", "100000.00"],
+            ["Object 2", "150000.00"],
+        ]
+
+    def test_csv_round_trip_through_import(
+        self, api_client, broker, real_estate_object
+    ):
+        """
+        CSV-выгрузка загружается обратно импортом, JSON-поля сохраняются.
+        """
+        real_estate_object.features = {"pool": True}
+        real_estate_object.save()
+        api_client.force_authenticate(broker)
+        content = export(api_client, file_format="csv", exclude="id")
+        content = content.replace(b"123 Main Street", b"1 Export Street")
+
+        response = api_client.post(
+            reverse("object-import"),
+            {"file": SimpleUploadedFile("objects.csv", content)},
+            format="multipart",
+        )
+        assert response.data["created"] == 1, response.data
+        copy = RealEstateObject.objects.get(address="1 Export Street")
+        assert copy.features == {"pool": True}
+
+    def test_errors_before_streaming(self, api_client, buyer):
+        """
+        Неверные параметры возвращают 400, анонимная выгрузка запрещена.
+        """
+        url = reverse("object-export")
+        assert api_client.get(url).status_code == HTTP_401_UNAUTHORIZED
+
+        api_client.force_authenticate(buyer)
+        for params in ({"file_format": "xml"}, {"fields": "unknown"}):
+            assert api_client.get(url, params).status_code == HTTP_400_BAD_REQUEST
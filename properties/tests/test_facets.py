@@ -0,0 +1,50 @@
+import pytest
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK
+
+
+def get_facets(api_client, **params):
+    response = api_client.get(reverse("object-facets"), params)
+    assert response.status_code == HTTP_200_OK, response.data
+    return response.data
+
+
+@pytest.mark.django_db
+class TestObjectFacets:
+    def test_facet_counts(self, api_client, real_estate_objects):
+        """
+        Фасеты считаются по всем объектам без фильтров.
+        """
+        data = get_facets(api_client)
+        facets = data["facets"]
+
+        assert data["count"] == 2
+        assert facets["country"] == [{"value": "Country", "count": 2}]
+        assert sorted((f["value"], f["count"]) for f in facets["status"]) == [
+            ("rent", 1),
+            ("sale", 1),
+        ]
+        assert sorted(f["value"] for f in facets["rooms"]) == [3, 4]
+        assert [(f["value"], f["count"]) for f in facets["price"]] == [
+            ("100000-200000", 2)
+        ]
+
+    def test_facets_respect_filters(self, api_client, real_estate_objects):
+        """
+        Фасеты учитывают текущие фильтры.
+        """
+        data = get_facets(api_client, status="rent")
+        assert data["count"] == 1
+        assert data["facets"]["status"] == [{"value": "rent", "count": 1}]
+        assert data["facets"]["rooms"] == [{"value": 4, "count": 1}]
+
+    def test_single_query_and_cache(
+        self, api_client, real_estate_objects, django_assert_num_queries
+    ):
+        """
+        Фасеты считаются одним запросом и кэшируются по нормализованным фильтрам.
+        """
+        with django_assert_num_queries(1):
+            get_facets(api_client, city="City", status="sale")
+        with django_assert_num_queries(0):
+            get_facets(api_client, status="sale", city="City", page=2)
@@ -0,0 +1,68 @@
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK
+
+from properties.views import ObjectListCreateView
+
+
+def get_both(api_client, monkeypatch, params):
+    """
+    Ответы быстрого и обычного пути (параметр _slow обходит кэш ответов).
+    """
+    url = reverse("object-list")
+    fast = api_client.get(url, params)
+    monkeypatch.setattr(ObjectListCreateView, "fast_list", False)
+    slow = api_client.get(url, dict(params, _slow=1))
+    monkeypatch.undo()
+    assert fast.status_code == slow.status_code == HTTP_200_OK
+    return fast.json(), slow.json()
+
+
+@pytest.mark.django_db
+class TestValuesSerializer:
+    def test_output_matches_object_serializer(
+        self, api_client, monkeypatch, real_estate_objects
+    ):
+        """
+        Быстрый путь дает тот же JSON, что и ObjectSerializer.
+        """
+        first, second = real_estate_objects
+        first.photos = ["a.jpg", "b.jpg"]
+        first.features = {"pool": True, "parking": 2}
+        first.latitude = Decimal("48.856600")
+        first.longitude = Decimal("2.352200")
+        first.save()
+        second.description_en = None
+        second.save()
+
+        fast, slow = get_both(api_client, monkeypatch, {})
+        assert fast["results"] == slow["results"]
+        assert fast["count"] == slow["count"] == 2
+        assert list(fast["results"][0]) == list(slow["results"][0])
+
+    def test_sparse_and_cursor(self, api_client, monkeypatch, real_estate_objects):
+        """
+        Выборочные поля и пагинация по курсору работают в быстром пути.
+        """
+        params = {
+            "fields": "id,name,price,cover_photo",
+            "pagination": "cursor",
+            "page_size": 1,
+            "ordering": "price",
+        }
+        fast, slow = get_both(api_client, monkeypatch, params)
+        assert fast["results"] == slow["results"]
+        assert set(fast["results"][0]) == {"id", "name", "price", "cover_photo"}
+
+        following = api_client.get(fast["next"])
+        assert following.status_code == HTTP_200_OK
+        assert following.data["results"][0]["id"] != fast["results"][0]["id"]
+
+    def test_search_results(self, api_client, monkeypatch, real_estate_objects):
+        """
+        Сортировка по релевантности поиска сохраняется в быстром пути.
+        """
+        fast, slow = get_both(api_client, monkeypatch, {"q": "Object"})
+        assert fast["results"] == slow["results"]
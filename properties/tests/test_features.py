@@ -0,0 +1,86 @@
+import pytest
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from properties.filters import RealEstateObjectFilter
+from properties.models import RealEstateObject
+
+
+@pytest.fixture
+def featured_objects(broker):
+    """
+    Фикстура для создания объектов с разными характеристиками.
+    """
+    features = {
+        "Villa": {"pool": True, "parking": 2, "amenities": ["gym", "spa"]},
+        "Flat": {"pool": False, "parking": 1, "heating": "gas"},
+        "Loft": {"sea_view": True, "amenities": ["gym"]},
+        "Studio": {},
+    }
+    return [
+        RealEstateObject.objects.create(
+            name=name,
+            price=100000,
+            country="Country",
+            city="City",
+            address=f"{idx} Feature Street",
+            area=50.0,
+            rooms=2,
+            features=value,
+            broker=broker,
+        )
+        for idx, (name, value) in enumerate(features.items())
+    ]
+
+
+def names(api_client, features):
+    response = api_client.get(reverse("object-list"), {"features": features})
+    assert response.status_code == HTTP_200_OK, response.data
+    return sorted(obj["name"] for obj in response.data["results"])
+
+
+@pytest.mark.django_db
+class TestFeaturesFilter:
+    def test_key_presence(self, api_client, featured_objects):
+        """
+        Ключ без значения проверяет наличие характеристики.
+        """
+        assert names(api_client, "pool") == ["Flat", "Villa"]
+        assert names(api_client, "pool,heating") == ["Flat"]
+
+    def test_equality(self, api_client, featured_objects):
+        """
+        key:value сравнивает значение, разобранное как JSON или строка.
+        """
+        assert names(api_client, "pool:true") == ["Villa"]
+        assert names(api_client, "parking:1") == ["Flat"]
+        assert names(api_client, "heating:gas") == ["Flat"]
+        assert names(api_client, 'heating:"gas",pool:false') == ["Flat"]
+
+    def test_containment(self, api_client, featured_objects):
+        """
+        Массив в значении проверяет вхождение элементов, JSON-объект — вхождение целиком.
+        """
+        assert names(api_client, 'amenities:["gym"]') == ["Loft", "Villa"]
+        assert names(api_client, 'amenities:["gym","spa"],parking:2') == ["Villa"]
+        assert names(api_client, '{"sea_view": true}') == ["Loft"]
+
+    def test_invalid_syntax(self, api_client, featured_objects):
+        """
+        Некорректный JSON-объект или пустой ключ возвращают 400.
+        """
+        url = reverse("object-list")
+        for value in ('{"pool": ', ":true"):
+            response = api_client.get(url, {"features": value})
+            assert response.status_code == HTTP_400_BAD_REQUEST
+
+    def test_compiles_to_gin_operators(self, featured_objects):
+        """
+        Равенство и вхождение собираются в один @>, наличие ключей — в ?&.
+        """
+        filterset = RealEstateObjectFilter(
+            data={"features": 'pool,parking:2,amenities:["gym"]'},
+            queryset=RealEstateObject.objects.all(),
+        )
+        sql = str(filterset.qs.query)
+        assert sql.count("@>") == 1
+        assert "?&" in sql
@@ -0,0 +1,73 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+
+CARD_FIELDS = "id,name,price,city,cover_photo"
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    def test_card_fields(self, api_client, real_estate_objects):
+        """
+        fields= оставляет только перечисленные поля и первое фото.
+        """
+        first = real_estate_objects[0]
+        first.photos = ["first.jpg", "second.jpg"]
+        first.save()
+
+        response = api_client.get(reverse("object-list"), {"fields": CARD_FIELDS})
+        assert response.status_code == HTTP_200_OK
+        rows = {row["id"]: row for row in response.data["results"]}
+        assert set(rows[first.id]) == {"id", "name", "price", "city", "cover_photo"}
+        assert rows[first.id]["cover_photo"] == "first.jpg"
+
+    def test_sql_projection(self, api_client, real_estate_objects):
+        """
+        В SQL-запрос попадают только нужные колонки, тяжелые поля не читаются.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get(reverse("object-list"), {"fields": CARD_FIELDS})
+        select = next(
+            q["sql"]
+            for q in queries.captured_queries
+            if q["sql"].startswith("SELECT") and "LIMIT" in q["sql"]
+        )
+        for column in ("description_ru", "features", "videos", "search_vector"):
+            assert f'"{column}"' not in select
+        assert '"created_at"' in select  # нужен для сортировки по умолчанию
+
+    def test_exclude(self, api_client, real_estate_object):
+        """
+        exclude= убирает поля из ответа карточки объекта.
+        """
+        response = api_client.get(
+            reverse("object-detail", args=[real_estate_object.id]),
+            {"exclude": "description_ru,description_en,features"},
+        )
+        assert response.status_code == HTTP_200_OK
+        assert "description_ru" not in response.data
+        assert "features" not in response.data
+        assert response.data["name"] == real_estate_object.name
+
+    def test_unknown_field(self, api_client, real_estate_objects):
+        """
+        Неизвестные поля дают ошибку 400.
+        """
+        response = api_client.get(reverse("object-list"), {"fields": "id,secret"})
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        assert "secret" in str(response.data["fields"])
+
+    def test_cursor_pagination_with_fields(self, api_client, real_estate_objects):
+        """
+        Пагинация по курсору работает, даже если поле сортировки не запрошено.
+        """
+        url = reverse("object-list")
+        params = {"fields": "id", "pagination": "cursor", "page_size": 1}
+        first = api_client.get(url, params)
+        assert first.status_code == HTTP_200_OK
+        second = api_client.get(first.data["next"])
+        assert second.status_code == HTTP_200_OK
+        ids = [row["id"] for row in first.data["results"] + second.data["results"]]
+        assert sorted(ids) == sorted(obj.id for obj in real_estate_objects)
@@ -0,0 +1,68 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from properties.geo import geo_cell
+from properties.models import RealEstateObject
+
+
+def names(response):
+    assert response.status_code == HTTP_200_OK, response.data
+    return [obj["name"] for obj in response.data["results"]]
+
+
+@pytest.mark.django_db
+class TestGeoSearch:
+    def test_geo_cell_maintained_by_trigger(self, located_objects):
+        """
+        Ячейка сетки вычисляется БД при создании и bulk-обновлении.
+        """
+        obj = RealEstateObject.objects.get(name="London")
+        assert obj.geo_cell == geo_cell(51.5074, -0.1278)
+
+        RealEstateObject.objects.filter(pk=obj.pk).update(latitude=10, longitude=20)
+        obj.refresh_from_db()
+        assert obj.geo_cell == geo_cell(10, 20)
+
+    def test_bbox_filter(self, api_client, located_objects):
+        """
+        Фильтр bbox возвращает только объекты внутри прямоугольника.
+        """
+        url = reverse("object-list")
+        response = api_client.get(url, {"bbox": "2.0,48.7,2.5,49.0"})
+        assert sorted(names(response)) == ["Paris center", "Versailles"]
+
+    def test_near_filter_sorted_by_distance(self, api_client, located_objects):
+        """
+        Фильтр near с радиусом и сортировкой по расстоянию.
+        """
+        url = reverse("object-list")
+        params = {"near": "48.86,2.35", "radius_km": 30, "ordering": "distance"}
+        assert names(api_client.get(url, params)) == ["Paris center", "Versailles"]
+
+        params["radius_km"] = 5
+        assert names(api_client.get(url, params)) == ["Paris center"]
+
+    def test_distance_ordering_ignored_without_near(self, api_client, located_objects):
+        """
+        Сортировка по расстоянию без near игнорируется.
+        """
+        response = api_client.get(reverse("object-list"), {"ordering": "distance"})
+        assert len(names(response)) == 3
+
+    def test_invalid_bbox(self, api_client, located_objects):
+        """
+        Некорректный bbox возвращает 400.
+        """
+        response = api_client.get(reverse("object-list"), {"bbox": "1,2,3"})
+        assert response.status_code == HTTP_400_BAD_REQUEST
+
+    def test_benchmark_command(self, located_objects):
+        """
+        Команда benchmark_geo_search выполняется и откатывает данные.
+        """
+        out = StringIO()
+        call_command("benchmark_geo_search", count=200, repeat=1, stdout=out)
+        assert "near 2 км" in out.getvalue()
+        assert RealEstateObject.objects.count() == 3
@@ -0,0 +1,211 @@
+from datetime import timedelta
+from io import BytesIO
+
+import pytest
+from core.models import StoredFile
+from core.storage import content_key, content_storage
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import DatabaseError
+from django.urls import reverse
+from PIL import Image
+from properties.images import (
+    EXIF_ORIENTATION,
+    PhotoVariantGenerator,
+    iter_rendered,
+    pending_objects,
+    render_variants,
+)
+from properties.models import RealEstateObject
+
+
+def photo(width=1200, height=900, orientation=6):
+    """
+    JPEG с EXIF Orientation: левая половина красная, правая — синяя.
+    """
+    image = Image.new("RGB", (width, height), (0, 0, 255))
+    image.paste((255, 0, 0), (0, 0, width // 2, height))
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = orientation
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestPhotoVariants:
+    def test_render_variants(self):
+        """
+        Варианты вписываются в рамки без увеличения, повернуты по EXIF и не
+        содержат EXIF; результат пула процессов совпадает с последовательным.
+        """
+        variants = render_variants(photo())
+        sizes = {
+            name: (variant["width"], variant["height"])
+            for name, variant in variants.items()
+        }
+        assert sizes == {"full": (900, 1200), "card": (450, 600), "thumb": (180, 240)}
+
+        with Image.open(BytesIO(variants["card"]["jpeg"])) as image:
+            assert image.format == "JPEG" and image.size == (450, 600)
+            assert not image.getexif()
+            # После поворота на 90° по часовой красная половина сверху
+            assert image.getpixel((225, 100))[0] > 200
+        with Image.open(BytesIO(variants["thumb"]["webp"])) as image:
+            assert image.format == "WEBP" and image.size == (180, 240)
+
+        pooled = dict(iter_rendered([(1, photo()), (2, b"not an image")], workers=2))
+        assert pooled[1] == variants
+        assert isinstance(pooled[2], Exception)
+
+    def test_generator_updates_objects(
+        self, api_client, media, real_estate_object, django_capture_on_commit_callbacks
+    ):
+        """
+        Команда создает варианты новых фото, сохраняет ошибки, пропускает
+        обработанные объекты и удаляет варианты удаленных фото.
+        """
+        default_storage.save("photos/a.jpg", ContentFile(photo(orientation=1)))
+        real_estate_object.photos = ["/media/photos/a.jpg", "photos/missing.jpg"]
+        real_estate_object.save()
+
+        generator = PhotoVariantGenerator(workers=1)
+        assert generator.run() == 1
+        assert (generator.processed, generator.failed) == (1, 1)
+
+        real_estate_object.refresh_from_db()
+        variants = real_estate_object.photo_variants
+        assert set(variants["/media/photos/a.jpg"]) == {"full", "card", "thumb"}
+        assert "error" in variants["photos/missing.jpg"]
+        thumb = variants["/media/photos/a.jpg"]["thumb"]
+        assert (thumb["width"], thumb["height"]) == (320, 240)
+        path = thumb["webp"].removeprefix("/media/")
+        assert default_storage.exists(path)
+        assert not pending_objects().exists()
+
+        response = api_client.get(
+            reverse("object-detail", args=[real_estate_object.pk])
+        )
+        assert response.data["photo_variants"] == variants
+
+        real_estate_object.photos = []
+        real_estate_object.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            assert PhotoVariantGenerator(workers=1).run() == 1
+        real_estate_object.refresh_from_db()
+        assert real_estate_object.photo_variants == {}
+        # Файл без ссылок удаляет сборка мусора хранилища
+        assert StoredFile.objects.get(key=content_key(path)).refcount == 0
+        content_storage.collect_garbage(timedelta(0))
+        assert not default_storage.exists(path)
+
+    def test_generator_changes_etag(self, api_client, media, real_estate_object):
+        """
+        После создания вариантов меняются ETag карточки объекта и кэш
+        анонимного ответа.
+        """
+        default_storage.save("photos/a.jpg", ContentFile(photo(orientation=1)))
+        real_estate_object.photos = ["/media/photos/a.jpg"]
+        real_estate_object.save()
+        url = reverse("object-detail", args=[real_estate_object.pk])
+        response = api_client.get(url)
+        assert response.data["photo_variants"] == {}
+        etag = response["ETag"]
+
+        assert PhotoVariantGenerator(workers=1).run() == 1
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert response["X-Cache"] == "MISS"
+        assert set(response.data["photo_variants"]["/media/photos/a.jpg"]) == {
+            "full",
+            "card",
+            "thumb",
+        }
+
+    def test_failed_batch_keeps_references(
+        self, media, real_estate_object, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        """
+        Сбой при пересоздании вариантов не освобождает ссылки на файлы,
+        которые по-прежнему указаны в photo_variants.
+        """
+        default_storage.save("photos/a.jpg", ContentFile(photo(orientation=1)))
+        real_estate_object.photos = ["/media/photos/a.jpg"]
+        real_estate_object.save()
+        PhotoVariantGenerator(workers=1).run()
+        real_estate_object.refresh_from_db()
+        variants = real_estate_object.photo_variants
+        path = variants["/media/photos/a.jpg"]["thumb"]["webp"].removeprefix("/media/")
+
+        def fail(*args, **kwargs):
+            raise OSError("Хранилище недоступно")
+
+        monkeypatch.setattr("properties.images.save_variants", fail)
+        with django_capture_on_commit_callbacks(execute=True):
+            with pytest.raises(OSError):
+                PhotoVariantGenerator(workers=1, force=True).run()
+
+        real_estate_object.refresh_from_db()
+        assert real_estate_object.photo_variants == variants
+        assert StoredFile.objects.get(key=content_key(path)).refcount == 1
+
+    def test_failed_save_releases_new_references(
+        self, media, real_estate_object, monkeypatch
+    ):
+        """
+        Если пакет не удалось сохранить, ссылки на созданные варианты
+        освобождаются и photo_variants не меняется.
+        """
+        default_storage.save("photos/a.jpg", ContentFile(photo(orientation=1)))
+        real_estate_object.photos = ["/media/photos/a.jpg"]
+        real_estate_object.save()
+
+        def fail(*args, **kwargs):
+            raise DatabaseError("Соединение потеряно")
+
+        monkeypatch.setattr(RealEstateObject.objects, "bulk_update", fail)
+        with pytest.raises(DatabaseError):
+            PhotoVariantGenerator(workers=1).run()
+
+        real_estate_object.refresh_from_db()
+        assert real_estate_object.photo_variants == {}
+        refcounts = StoredFile.objects.values_list("refcount", flat=True)
+        assert refcounts and set(refcounts) == {0}
+
+    def test_untrusted_sources(self, media, real_estate_object, settings, monkeypatch):
+        """
+        Пути за пределами хранилища и ссылки на неразрешенные хосты
+        отмечаются ошибкой у фото, не прерывая обработку остальных.
+        """
+        settings.PHOTO_SOURCE_HOSTS = ["cdn.example.com"]
+
+        def fetch(*args, **kwargs):
+            raise AssertionError("Запрос к неразрешенному хосту")
+
+        monkeypatch.setattr("urllib.request.OpenerDirector.open", fetch)
+        default_storage.save("photos/a.jpg", ContentFile(photo(orientation=1)))
+        sources = [
+            "../config/settings.py",
+            "http://169.254.169.254/latest/meta-data",
+            "https://CDN.example.com.evil.test/a.jpg",
+            "/media/photos/a.jpg",
+        ]
+        real_estate_object.photos = sources
+        real_estate_object.save()
+
+        generator = PhotoVariantGenerator(workers=1)
+        assert generator.run() == 1
+        assert (generator.processed, generator.failed) == (1, 3)
+        real_estate_object.refresh_from_db()
+        variants = real_estate_object.photo_variants
+        assert [source for source in sources if "error" in variants[source]] == (
+            sources[:3]
+        )
@@ -0,0 +1,182 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST, HTTP_403_FORBIDDEN
+from properties.imports import SAVE_ERROR, ObjectImporter
+from properties.models import RealEstateObject
+
+ROW = {
+    "name": "Imported",
+    "price": "120000.00",
+    "country": "Country",
+    "city": "City",
+    "area": "75.5",
+    "rooms": "3",
+}
+
+
+def jsonl(*rows):
+    return "\n".join(json.dumps(row) for row in rows).encode("utf-8")
+
+
+def upload(api_client, content, name="objects.jsonl", **data):
+    return api_client.post(
+        reverse("object-import"),
+        dict(data, file=SimpleUploadedFile(name, content)),
+        format="multipart",
+    )
+
+
+@pytest.mark.django_db
+class TestObjectImport:
+    def test_import_jsonl(self, api_client, broker):
+        """
+        Корректные строки JSONL создаются и привязываются к брокеру.
+        """
+        api_client.force_authenticate(broker)
+        rows = [dict(ROW, address=f"{idx} Import Street") for idx in range(3)]
+        response = upload(api_client, jsonl(*rows))
+
+        assert response.status_code == HTTP_200_OK, response.data
+        assert response.data["created"] == 3 and response.data["failed"] == 0
+        objects = RealEstateObject.objects.filter(name="Imported")
+        assert objects.count() == 3
+        assert all(obj.broker == broker for obj in objects)
+        assert objects.first().search_vector is not None
+
+    def test_null_json_and_rejected_rows(self, monkeypatch, api_client, broker):
+        """
+        null в JSON-полях заменяется значением по умолчанию; строка, которую
+        отклонила БД, попадает в отчет, не прерывая импорт.
+        """
+        build_object = ObjectImporter.build_object
+
+        def build_broken(self, attrs):
+            obj = build_object(self, attrs)
+            if obj.name == "Broken":
+                obj.videos = None
+            return obj
+
+        monkeypatch.setattr(ObjectImporter, "build_object", build_broken)
+        api_client.force_authenticate(broker)
+        rows = [
+            dict(ROW, address="1 Null Street", photos=None, features=None),
+            dict(ROW, name="Broken", address="2 Null Street"),
+        ]
+        response = upload(api_client, jsonl(*rows))
+
+        assert response.status_code == HTTP_200_OK, response.data
+        assert response.data["created"] == 1
+        assert response.data["errors"] == [{"row": 2, "errors": {"row": [SAVE_ERROR]}}]
+        obj = RealEstateObject.objects.get(address="1 Null Street")
+        assert (obj.photos, obj.features) == ([], {})
+
+    def test_row_errors_and_duplicates(self, api_client, broker, real_estate_object):
+        """
+        Ошибки валидации, дубли в БД и внутри файла возвращаются по номерам строк.
+        """
+        api_client.force_authenticate(broker)
+        content = b"\n".join(
+            [
+                jsonl(dict(ROW, address="1 New Street")),
+                jsonl(dict(ROW, address="1 New Street")),  # дубль в файле
+                jsonl(dict(ROW, address=real_estate_object.address)),  # дубль в БД
+                jsonl(dict(ROW, address="2 New Street", rooms="many")),
+                b"{broken",
+            ]
+        )
+        response = upload(api_client, content)
+
+        assert response.data["created"] == 1
+        errors = {item["row"]: item["errors"] for item in response.data["errors"]}
+        assert sorted(errors) == [2, 3, 4, 5]
+        assert "address" in errors[2] and "address" in errors[3]
+        assert "rooms" in errors[4]
+
+    def test_import_csv_with_json_columns(self, api_client, broker):
+        """
+        CSV: пустые значения пропускаются, JSON-колонки разбираются (в том
+        числе с пробелами в заголовке).
+        """
+        api_client.force_authenticate(broker)
+        out = StringIO()
+        writer = csv.DictWriter(
+            out, fieldnames=[*ROW, "address", "district", " features"]
+        )
+        writer.writeheader()
+        writer.writerow(
+            dict(
+                ROW,
+                address="9 Csv Street",
+                district="",
+                **{" features": '{"pool": true}'},
+            )
+        )
+        response = upload(api_client, out.getvalue().encode("utf-8"), "objects.csv")
+
+        assert response.data["created"] == 1, response.data
+        obj = RealEstateObject.objects.get(address="9 Csv Street")
+        assert obj.features == {"pool": True}
+        assert obj.district is None
+
+    def test_permissions_and_format(self, api_client, buyer, broker):
+        """
+        Импорт доступен только брокерам; формат определяется по расширению.
+        """
+        api_client.force_authenticate(buyer)
+        assert upload(api_client, jsonl(ROW)).status_code == HTTP_403_FORBIDDEN
+
+        api_client.force_authenticate(broker)
+        response = upload(api_client, jsonl(ROW), name="objects.txt")
+        assert response.status_code == HTTP_400_BAD_REQUEST
+
+    def test_command_with_report(self, broker, tmp_path):
+        """
+        Команда import_objects пишет отчет об ошибках и соблюдает --dry-run.
+        """
+        source = tmp_path / "objects.jsonl"
+        source.write_bytes(
+            jsonl(
+                dict(ROW, address="5 Cli Street"),
+                dict(ROW, address="6 Cli Street", price=""),
+            )
+        )
+        report = tmp_path / "errors.csv"
+
+        out = StringIO()
+        args = [str(source), "--broker", broker.email, "--report", str(report)]
+        call_command("import_objects", *args, "--dry-run", stdout=out)
+        assert "проверено: 1" in out.getvalue()
+        assert not RealEstateObject.objects.filter(address="5 Cli Street").exists()
+
+        call_command("import_objects", *args, "--batch-size", "1", stdout=out)
+        assert RealEstateObject.objects.filter(address="5 Cli Street").exists()
+        with open(report) as stream:
+            rows = list(csv.DictReader(stream))
+        assert [(row["row"], row["field"]) for row in rows] == [("2", "price")]
+
+    def test_concurrent_duplicate_falls_back_to_rows(
+        self, monkeypatch, api_client, broker, real_estate_object
+    ):
+        """
+        Если адрес заняли после проверки пачки, строки вставляются по одной,
+        а дубль отклоняет ограничение БД.
+        """
+        monkeypatch.setattr(
+            "properties.imports.find_existing_addresses", lambda keys: set()
+        )
+        api_client.force_authenticate(broker)
+        rows = [
+            dict(ROW, address="3 Race Street"),
+            dict(ROW, address=real_estate_object.address.upper()),
+        ]
+        response = upload(api_client, jsonl(*rows))
+
+        assert response.data["created"] == 1, response.data
+        assert [item["row"] for item in response.data["errors"]] == [2]
+        assert RealEstateObject.objects.filter(address="3 Race Street").exists()
@@ -0,0 +1,28 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection, transaction
+from properties.models import RealEstateObject
+
+
+@pytest.mark.django_db
+class TestRealEstateObjectIndexes:
+    def test_iexact_filter_uses_upper_index(self, real_estate_objects):
+        """
+        Фильтр country__iexact использует функциональный индекс UPPER(country).
+        """
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = RealEstateObject.objects.filter(country__iexact="country").explain()
+        assert "reo_country_upper_idx" in plan
+
+    def test_explain_command_reports_combinations(self, real_estate_objects):
+        """
+        Команда explain_object_filters проверяет все комбинации фильтров.
+        """
+        out = StringIO()
+        call_command("explain_object_filters", "--disable-seqscan", stdout=out)
+        output = out.getvalue()
+        assert "Проверено комбинаций: 62" in output
+        assert "с последовательным сканированием: 0" in output
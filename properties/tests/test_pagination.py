@@ -0,0 +1,143 @@
+import pytest
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_404_NOT_FOUND
+from properties.models import RealEstateObject
+
+
+@pytest.fixture
+def many_objects(broker):
+    """
+    Фикстура для создания пяти объектов, два из которых с одинаковой ценой.
+    """
+    prices = [100000, 200000, 200000, 300000, 400000]
+    return [
+        RealEstateObject.objects.create(
+            name=f"Object {idx}",
+            price=price,
+            country="Country",
+            city="City",
+            address=f"{idx} Cursor Street",
+            area=100.0,
+            rooms=2,
+            broker=broker,
+        )
+        for idx, price in enumerate(prices)
+    ]
+
+
+def collect_pages(api_client, params):
+    """
+    Проходит по всем страницам через ссылки next и возвращает список страниц.
+    """
+    pages = []
+    response = api_client.get(reverse("object-list"), params)
+    while True:
+        assert response.status_code == HTTP_200_OK
+        pages.append(response.data)
+        if not response.data["next"]:
+            return pages
+        response = api_client.get(response.data["next"])
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    def test_walk_pages_by_created_at(self, api_client, many_objects):
+        """
+        Проход по курсорам возвращает все объекты в порядке -created_at без повторов.
+        """
+        pages = collect_pages(api_client, {"pagination": "cursor", "page_size": 2})
+        ids = [obj["id"] for page in pages for obj in page["results"]]
+
+        expected = list(
+            RealEstateObject.objects.order_by("-created_at", "-id").values_list(
+                "id", flat=True
+            )
+        )
+        assert ids == expected
+        assert len(pages) == 3
+        assert "count" not in pages[0]
+        assert pages[0]["previous"] is None
+
+    def test_walk_pages_by_price_with_ties(self, api_client, many_objects):
+        """
+        Одинаковые цены упорядочиваются по id и не теряются между страницами.
+        """
+        pages = collect_pages(
+            api_client, {"pagination": "cursor", "page_size": 2, "ordering": "price"}
+        )
+        ids = [obj["id"] for page in pages for obj in page["results"]]
+        expected = [
+            obj.id for obj in sorted(many_objects, key=lambda o: (o.price, o.id))
+        ]
+        assert ids == expected
+
+    def test_previous_link(self, api_client, many_objects):
+        """
+        Ссылка previous возвращает предыдущую страницу.
+        """
+        url = reverse("object-list")
+        first = api_client.get(url, {"pagination": "cursor", "page_size": 2}).data
+        second = api_client.get(first["next"]).data
+        back = api_client.get(second["previous"]).data
+
+        assert [o["id"] for o in back["results"]] == [o["id"] for o in first["results"]]
+        assert back["previous"] is None
+
+    def test_previous_link_of_empty_page(self, api_client, many_objects):
+        """
+        Ссылка previous пустой страницы ведет на первую страницу в режиме
+        курсора.
+        """
+        url = reverse("object-list")
+        first = api_client.get(url, {"pagination": "cursor", "page_size": 4}).data
+        many_objects[0].delete()  # последний объект при сортировке -created_at
+        empty = api_client.get(first["next"]).data
+        assert empty["results"] == [] and empty["next"] is None
+
+        back = api_client.get(empty["previous"]).data
+        assert "cursor=" not in empty["previous"]
+        assert "count" not in back
+        assert len(back["results"]) == 4
+
+    def test_cursor_respects_filters(self, api_client, many_objects):
+        """
+        Курсорная пагинация сочетается с фильтрами.
+        """
+        pages = collect_pages(
+            api_client,
+            {"pagination": "cursor", "page_size": 1, "price_min": 200000},
+        )
+        assert sum(len(page["results"]) for page in pages) == 4
+
+    def test_explicit_count(self, api_client, many_objects):
+        """
+        Общее количество возвращается только по запросу with_count.
+        """
+        response = api_client.get(
+            reverse("object-list"),
+            {"pagination": "cursor", "page_size": 2, "with_count": "true"},
+        )
+        assert response.data["count"] == 5
+
+    def test_invalid_cursor(self, api_client, many_objects):
+        """
+        Некорректный курсор возвращает 404.
+        """
+        response = api_client.get(reverse("object-list"), {"cursor": "garbage"})
+        assert response.status_code == HTTP_404_NOT_FOUND
+
+    def test_page_number_is_default(self, api_client, many_objects):
+        """
+        Без параметров сохраняется постраничная пагинация с count.
+        """
+        response = api_client.get(reverse("object-list"))
+        assert response.data["count"] == 5
+
+    def test_page_size_only_in_cursor_mode(self, api_client, many_objects):
+        """
+        В постраничном режиме page_size не меняет размер страницы.
+        """
+        response = api_client.get(reverse("object-list"), {"page_size": 2})
+        assert response.data["count"] == 5
+        assert len(response.data["results"]) == 5
+        assert response.data["next"] is None
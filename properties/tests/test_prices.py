@@ -0,0 +1,143 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND
+from properties.models import ListingPrice, RealEstateObject
+
+
+def history(listing):
+    return list(
+        ListingPrice.objects.filter(listing=listing)
+        .order_by("effective_date", "id")
+        .values_list("amount", "currency")
+    )
+
+
+def set_history(listing, points):
+    """
+    Заменяет историю цен объекта точками (дата, цена).
+    """
+    ListingPrice.objects.filter(listing=listing).delete()
+    ListingPrice.objects.bulk_create(
+        ListingPrice(
+            listing=listing,
+            amount=amount,
+            currency="USD",
+            effective_date=datetime(*day, 12, tzinfo=timezone.utc),
+        )
+        for day, amount in points
+    )
+
+
+@pytest.mark.django_db
+class TestPriceHistoryCapture:
+    def test_trigger_records_changes(self, real_estate_object):
+        """
+        Точка истории записывается при создании и при каждом изменении цены
+        или валюты, в том числе через queryset.update(); сохранение без
+        изменения цены точку не добавляет.
+        """
+        real_estate_object.name = "Renamed"
+        real_estate_object.save()
+        real_estate_object.price = 140000
+        real_estate_object.save()
+        RealEstateObject.objects.filter(pk=real_estate_object.pk).update(currency="EUR")
+
+        assert history(real_estate_object) == [
+            (Decimal("150000.00"), "USD"),
+            (Decimal("140000.00"), "USD"),
+            (Decimal("140000.00"), "EUR"),
+        ]
+
+
+@pytest.mark.django_db
+class TestPriceHistoryView:
+    def test_raw_and_bucketed_points(self, api_client, real_estate_object):
+        """
+        Без bucket возвращаются все точки, с bucket — последняя или средняя
+        цена интервала; фильтр по датам включает границы.
+        """
+        set_history(
+            real_estate_object,
+            [((2026, 1, 5), 100), ((2026, 1, 20), 200), ((2026, 2, 3), 300)],
+        )
+        url = reverse("object-price-history", args=[real_estate_object.pk])
+
+        response = api_client.get(url)
+        assert response.status_code == HTTP_200_OK
+        assert [point["amount"] for point in response.data["points"]] == [
+            "100.00",
+            "200.00",
+            "300.00",
+        ]
+
+        response = api_client.get(url, {"bucket": "month"})
+        assert response.data["aggregate"] == "last"
+        assert [
+            (point["date"][:10], point["amount"]) for point in response.data["points"]
+        ] == [("2026-01-01", "200.00"), ("2026-02-01", "300.00")]
+
+        response = api_client.get(
+            url, {"bucket": "month", "agg": "avg", "end": "2026-01-20"}
+        )
+        assert [point["amount"] for point in response.data["points"]] == ["150.00"]
+
+        response = api_client.get(url, {"start": "2026-01-20", "end": "2026-01-20"})
+        assert [point["amount"] for point in response.data["points"]] == ["200.00"]
+
+    def test_validation(self, api_client, real_estate_object):
+        """
+        Неизвестный интервал, агрегат или дата отклоняются; несуществующий
+        объект — 404.
+        """
+        url = reverse("object-price-history", args=[real_estate_object.pk])
+        for params in ({"bucket": "year"}, {"agg": "max"}, {"start": "2026-13-01"}):
+            response = api_client.get(url, params)
+            assert response.status_code == HTTP_400_BAD_REQUEST, params
+
+        url = reverse("object-price-history", args=[real_estate_object.pk + 100])
+        assert api_client.get(url).status_code == HTTP_404_NOT_FOUND
+
+    def test_series_for_many_listings(
+        self, api_client, real_estate_object, another_real_estate_object
+    ):
+        """
+        Ряды нескольких объектов возвращаются в порядке ids; несуществующие
+        id пропускаются.
+        """
+        set_history(real_estate_object, [((2026, 3, 2), 10), ((2026, 3, 4), 20)])
+        set_history(another_real_estate_object, [((2026, 3, 3), 30)])
+        ids = [another_real_estate_object.pk, real_estate_object.pk, 0]
+
+        response = api_client.get(
+            reverse("object-prices"),
+            {"ids": ",".join(map(str, ids)), "bucket": "week", "agg": "avg"},
+        )
+        assert response.status_code == HTTP_200_OK
+        assert response.data["series"] == [
+            {
+                "listing": another_real_estate_object.pk,
+                "points": [
+                    {
+                        "date": "2026-03-02T00:00:00Z",
+                        "amount": "30.00",
+                        "currency": "USD",
+                    }
+                ],
+            },
+            {
+                "listing": real_estate_object.pk,
+                "points": [
+                    {
+                        "date": "2026-03-02T00:00:00Z",
+                        "amount": "15.00",
+                        "currency": "USD",
+                    }
+                ],
+            },
+        ]
+
+        response = api_client.get(reverse("object-prices"), {"ids": "1,x"})
+        assert response.status_code == HTTP_400_BAD_REQUEST
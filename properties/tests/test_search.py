@@ -0,0 +1,93 @@
+import pytest
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK
+from properties.models import RealEstateObject
+
+
+@pytest.fixture
+def searchable_objects(broker):
+    """
+    Фикстура для создания объектов с описаниями на русском и английском.
+    """
+    data = [
+        (
+            "Sea view apartment",
+            "Квартира у моря",
+            "Bright apartment by the sea",
+            "sale",
+        ),
+        ("Дом в горах", "Большой дом с камином", "House in the mountains", "rent"),
+        ("Loft", "Просторная квартира в центре", "Spacious loft downtown", "rent"),
+    ]
+    return [
+        RealEstateObject.objects.create(
+            name=name,
+            description_ru=description_ru,
+            description_en=description_en,
+            status=status,
+            price=100000,
+            country="Country",
+            city="City",
+            address=f"{idx} Search Street",
+            area=80.0,
+            rooms=2,
+            broker=broker,
+        )
+        for idx, (name, description_ru, description_en, status) in enumerate(data)
+    ]
+
+
+def search(api_client, **params):
+    response = api_client.get(reverse("object-list"), params)
+    assert response.status_code == HTTP_200_OK
+    return [obj["name"] for obj in response.data["results"]]
+
+
+@pytest.mark.django_db
+class TestFullTextSearch:
+    def test_search_russian_morphology(self, api_client, searchable_objects):
+        """
+        Поиск по русскому описанию учитывает словоформы.
+        """
+        names = search(api_client, q="квартиры")
+        assert set(names) == {"Sea view apartment", "Loft"}
+
+    def test_search_english_stemming(self, api_client, searchable_objects):
+        """
+        Поиск по английскому описанию учитывает словоформы.
+        """
+        assert search(api_client, q="mountain") == ["Дом в горах"]
+
+    def test_search_ranks_name_matches_first(self, api_client, searchable_objects):
+        """
+        Совпадения в названии ранжируются выше совпадений в описании.
+        """
+        names = search(api_client, q="apartment")
+        assert names[0] == "Sea view apartment"
+
+    def test_search_combines_with_filters(self, api_client, searchable_objects):
+        """
+        Поиск сочетается с фильтрами RealEstateObjectFilter.
+        """
+        assert search(api_client, q="квартира", status="rent") == ["Loft"]
+
+    def test_search_vector_updated_by_bulk_update(self, api_client, searchable_objects):
+        """
+        Поисковый вектор пересчитывается и при bulk-обновлениях.
+        """
+        RealEstateObject.objects.filter(name="Loft").update(
+            description_en="Penthouse with terrace"
+        )
+        assert search(api_client, q="penthouse") == ["Loft"]
+
+    def test_search_with_cursor_pagination(self, api_client, searchable_objects):
+        """
+        Поиск с сортировкой по релевантности работает в режиме курсора.
+        """
+        url = reverse("object-list")
+        params = {"q": "квартира", "pagination": "cursor", "page_size": 1}
+        first = api_client.get(url, params).data
+        second = api_client.get(first["next"]).data
+        names = [obj["name"] for obj in first["results"] + second["results"]]
+        assert set(names) == {"Sea view apartment", "Loft"}
+        assert second["next"] is None
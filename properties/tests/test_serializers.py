@@ -43,8 +43,10 @@ class TestObjectSerializer:
             "features": {"key": "value"},
         }
         serializer = ObjectSerializer(data=data, context={"request": request})
+        # Дубль отклоняет ограничение БД при сохранении, без запроса в validate
+        assert serializer.is_valid(), serializer.errors
         with pytest.raises(ValidationError) as excinfo:
-            serializer.is_valid(raise_exception=True)
+            serializer.save()
         assert "Объект с таким адресом уже существует" in str(excinfo.value)
 
     def test_invalid_broker(self, broker, another_broker, mock_request):
@@ -0,0 +1,180 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from properties.models import ListingStatusHistory, RealEstateObject
+from properties.status_history import days_on_market, ensure_partitions
+
+
+def transitions(listing):
+    return list(
+        ListingStatusHistory.objects.filter(listing=listing)
+        .order_by("changed_at", "id")
+        .values_list("previous_status", "status")
+    )
+
+
+def partition_of(record):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT tableoid::regclass::text FROM properties_listingstatushistory "
+            "WHERE id = %s",
+            [record.pk],
+        )
+        return cursor.fetchone()[0]
+
+
+def sell(listing, days):
+    """
+    Продает объект, который был на рынке `days` дней.
+    """
+    RealEstateObject.objects.filter(pk=listing.pk).update(status="sold")
+    ListingStatusHistory.objects.filter(listing=listing, status="sold").update(
+        listed_at=timezone.now() - timedelta(days=days)
+    )
+
+
+@pytest.mark.django_db
+class TestStatusHistoryCapture:
+    def test_trigger_records_transitions(self, real_estate_object):
+        """
+        Запись добавляется при создании и при каждой смене статуса, в том
+        числе через queryset.update(); сохранение без смены статуса запись
+        не добавляет.
+        """
+        real_estate_object.price = 140000
+        real_estate_object.save()
+        real_estate_object.status = "rent"
+        real_estate_object.save()
+        RealEstateObject.objects.filter(pk=real_estate_object.pk).update(status="sold")
+
+        assert transitions(real_estate_object) == [
+            (None, "sale"),
+            ("sale", "rent"),
+            ("rent", "sold"),
+        ]
+
+    def test_listed_at_resets_on_relisting(self, real_estate_object):
+        """
+        Дата выхода на рынок задается триггером: присвоенное значение
+        игнорируется, при продаже она сохраняется в записи истории, при
+        возврате из статуса sold — обновляется.
+        """
+        listed_at = real_estate_object.listed_at
+        real_estate_object.refresh_from_db()
+        assert listed_at is None and real_estate_object.listed_at is not None
+        listed_at = real_estate_object.listed_at
+
+        RealEstateObject.objects.filter(pk=real_estate_object.pk).update(
+            listed_at=listed_at - timedelta(days=30), status="sold"
+        )
+        sold = ListingStatusHistory.objects.get(
+            listing=real_estate_object, status="sold"
+        )
+        assert sold.listed_at == listed_at
+
+        RealEstateObject.objects.filter(pk=real_estate_object.pk).update(status="sale")
+        relisted = ListingStatusHistory.objects.get(
+            listing=real_estate_object, previous_status="sold"
+        )
+        assert relisted.listed_at == relisted.changed_at
+
+
+@pytest.mark.django_db
+class TestStatusHistoryPartitions:
+    def test_rows_move_from_default_partition(self, real_estate_object):
+        """
+        Строки без секции своего месяца попадают в секцию по умолчанию и
+        переносятся при создании секции.
+        """
+        record = ListingStatusHistory.objects.get(listing=real_estate_object)
+        ListingStatusHistory.objects.filter(pk=record.pk).update(
+            changed_at=datetime(2031, 5, 20, tzinfo=dt_timezone.utc)
+        )
+        assert partition_of(record) == "properties_listingstatushistory_default"
+
+        created = ensure_partitions(months_ahead=1, today=date(2031, 5, 3))
+        assert created == [
+            "properties_listingstatushistory_2031_05",
+            "properties_listingstatushistory_2031_06",
+        ]
+        assert partition_of(record) == "properties_listingstatushistory_2031_05"
+        assert ensure_partitions(months_ahead=1, today=date(2031, 5, 3)) == []
+
+    def test_recent_query_reads_own_partitions(self):
+        """
+        Статистика за текущий месяц читает только секцию текущего месяца.
+        """
+        today = timezone.now().date()
+        plan = days_on_market(today.replace(day=1), today).explain()
+        assert f"properties_listingstatushistory_{today:%Y_%m}" in plan
+        assert "properties_listingstatushistory_default" not in plan
+
+    def test_command(self):
+        """
+        Команда create_status_partitions создает недостающие секции.
+        """
+        out = StringIO()
+        call_command("create_status_partitions", "--months", "6", stdout=out)
+        assert "Создано секций: 3." in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestDaysOnMarketView:
+    def test_days_on_market_by_city(self, api_client, broker, real_estate_objects):
+        """
+        Срок экспозиции считается по проданным за период объектам по городам.
+        """
+        first, second = real_estate_objects
+        third = RealEstateObject.objects.create(
+            name="Object 3",
+            price=90000,
+            country="Country",
+            city="Othercity",
+            address="9 Other Street",
+            area=50.0,
+            rooms=2,
+            broker=broker,
+        )
+        sell(first, 10)
+        sell(second, 30)
+        sell(third, 5)
+
+        response = api_client.get(reverse("object-days-on-market"))
+        assert response.status_code == HTTP_200_OK
+        cities = {row["city"]: row for row in response.data["cities"]}
+        assert cities["Othercity"] == {
+            "city": "Othercity",
+            "sold": 1,
+            "avg_days": 5.0,
+            "median_days": 5.0,
+        }
+        assert cities[first.city]["sold"] == 2
+        assert cities[first.city]["avg_days"] == 20.0
+
+        response = api_client.get(
+            reverse("object-days-on-market"), {"city": "othercity"}
+        )
+        assert [row["city"] for row in response.data["cities"]] == ["Othercity"]
+
+        yesterday = timezone.now().date() - timedelta(days=1)
+        response = api_client.get(reverse("object-days-on-market"), {"end": yesterday})
+        assert response.data["cities"] == []
+
+    def test_validation(self, api_client):
+        """
+        Некорректные и слишком длинные периоды отклоняются.
+        """
+        url = reverse("object-days-on-market")
+        for params in (
+            {"start": "2026-02-30"},
+            {"start": "2026-05-01", "end": "2026-04-01"},
+            {"start": "2024-01-01", "end": "2026-01-01"},
+        ):
+            response = api_client.get(url, params)
+            assert response.status_code == HTTP_400_BAD_REQUEST, params
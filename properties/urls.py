@@ -2,13 +2,41 @@ from django.urls import path
 from .views import (
     ObjectListCreateView,
     ObjectDetailView,
+    ObjectClusterView,
+    ObjectFacetView,
+    ObjectImportView,
+    ObjectExportView,
+    ObjectPriceHistoryView,
+    ObjectPriceSeriesView,
+    ObjectDaysOnMarketView,
     CatalogListCreateView,
     CatalogDetailView,
+    CatalogListingMoveView,
 )
 
 urlpatterns = [
     path("objects/", ObjectListCreateView.as_view(), name="object-list"),
+    path("objects/clusters/", ObjectClusterView.as_view(), name="object-clusters"),
+    path("objects/facets/", ObjectFacetView.as_view(), name="object-facets"),
+    path("objects/import/", ObjectImportView.as_view(), name="object-import"),
+    path("objects/export/", ObjectExportView.as_view(), name="object-export"),
+    path(
+        "objects/days-on-market/",
+        ObjectDaysOnMarketView.as_view(),
+        name="object-days-on-market",
+    ),
+    path("objects/prices/", ObjectPriceSeriesView.as_view(), name="object-prices"),
     path("objects/<int:pk>/", ObjectDetailView.as_view(), name="object-detail"),
+    path(
+        "objects/<int:pk>/prices/",
+        ObjectPriceHistoryView.as_view(),
+        name="object-price-history",
+    ),
     path("catalogs/", CatalogListCreateView.as_view(), name="catalog-list"),
     path("catalogs/<int:pk>/", CatalogDetailView.as_view(), name="catalog-detail"),
+    path(
+        "catalogs/<int:pk>/listings/<int:listing_id>/move/",
+        CatalogListingMoveView.as_view(),
+        name="catalog-listing-move",
+    ),
 ]
@@ -1,36 +1,122 @@
+from datetime import timedelta
+
 from django.core.exceptions import ValidationError
+from django.db.models import Count, Max, Q, Sum
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import OrderingFilter
-from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.generics import (
+    GenericAPIView,
+    ListCreateAPIView,
+    RetrieveUpdateDestroyAPIView,
+)
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import ValidationError as DRFValidationError
 from rest_framework.response import Response
 from rest_framework.status import HTTP_403_FORBIDDEN, HTTP_200_OK
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from .models import Catalog, RealEstateObject
-from .serializers import ObjectSerializer, CatalogSerializer
-from .filters import RealEstateObjectFilter
+from .serializers import (
+    CatalogListingMoveSerializer,
+    CatalogSerializer,
+    ObjectSerializer,
+    PricePointSerializer,
+)
+from .filters import (
+    RealEstateObjectFilter,
+    RealEstateObjectOrderingFilter,
+    ordering_fields,
+)
+from .pagination import ObjectListPagination
+from .caching import AnonymousResponseCacheMixin, filter_cache_key
+from .conditional import ConditionalGetMixin
+from .fieldsets import SparseFieldsQuerysetMixin
+from .fast_serializers import ValuesSerializer
+from .imports import FORMATS, ObjectImporter, detect_format
+from .exports import CHUNK_SIZE, CONTENT_TYPES, iter_export, iter_objects
+from .exports import FORMATS as EXPORT_FORMATS
+from .clusters import MAX_TILES, MAX_ZOOM, get_clusters, tiles_for_bbox
+from .facets import get_facets
+from .prices import AGGREGATES as PRICE_AGGREGATES
+from .prices import BUCKETS as PRICE_BUCKETS
+from .prices import group_by_listing, price_points
+from .status_history import days_on_market
+from .catalogs import (
+    EMBED_OPTIONS,
+    EMBEDDED_LISTINGS,
+    catalog_queryset,
+    move_catalog_listing,
+    parse_embed,
+)
 from users.permissions import IsAdminOrBroker
 
 
-class ObjectListCreateView(ListCreateAPIView):
+FIELDSET_PARAMETERS = [
+    openapi.Parameter(
+        "fields",
+        openapi.IN_QUERY,
+        description="Вернуть только перечисленные поля (через запятую), "
+        "например: id,name,price,city,cover_photo",
+        type=openapi.TYPE_STRING,
+    ),
+    openapi.Parameter(
+        "exclude",
+        openapi.IN_QUERY,
+        description="Не возвращать перечисленные поля (через запятую)",
+        type=openapi.TYPE_STRING,
+    ),
+]
+
+EMBED_PARAMETER = openapi.Parameter(
+    "embed",
+    openapi.IN_QUERY,
+    description=f"Вложения: {', '.join(EMBED_OPTIONS)}. listings — первые "
+    f"{EMBEDDED_LISTINGS} объекта каталога в порядке sort_order",
+    type=openapi.TYPE_STRING,
+)
+
+
+class ObjectListCreateView(
+    SparseFieldsQuerysetMixin,
+    AnonymousResponseCacheMixin,
+    ConditionalGetMixin,
+    ListCreateAPIView,
+):
     """
     API представление для получения списка объектов недвижимости и их создания.
+
+    Ответы на GET-запросы анонимных пользователей кэшируются.
+    Поддерживаются условные запросы (ETag / Last-Modified) и выборочные
+    поля (fields / exclude).
     """
 
-    queryset = RealEstateObject.objects.all()
+    # Служебные колонки поиска не сериализуются и не нужны в выборке
+    queryset = RealEstateObject.objects.defer("search_vector", "geo_cell")
     serializer_class = ObjectSerializer
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, RealEstateObjectOrderingFilter]
     filterset_class = RealEstateObjectFilter
-    ordering_fields = ["price", "created_at"]
+    pagination_class = ObjectListPagination
+    ordering_fields = ["price", "created_at", "distance"]
     ordering = ["-created_at"]
+    # Сериализация списка из values() вместо ObjectSerializer(many=True)
+    fast_list = True
 
     @swagger_auto_schema(
         operation_summary="Получить список объектов недвижимости",
         operation_description="Возвращает список объектов недвижимости "
-        "с фильтрацией по цене, статусу и стране.",
+        "с фильтрацией по цене, статусу и стране и полнотекстовым поиском.",
         manual_parameters=[
+            openapi.Parameter(
+                "q",
+                openapi.IN_QUERY,
+                description="Поиск по названию и описаниям (ru/en), "
+                "результаты сортируются по релевантности",
+                type=openapi.TYPE_STRING,
+            ),
             openapi.Parameter(
                 "price_min",
                 openapi.IN_QUERY,
@@ -43,6 +129,15 @@ class ObjectListCreateView(ListCreateAPIView):
                 description="Максимальная цена объекта",
                 type=openapi.TYPE_NUMBER,
             ),
+            openapi.Parameter(
+                "currency",
+                openapi.IN_QUERY,
+                description="Валюта границ price_min/price_max (по умолчанию USD). "
+                "Цены в ответе не пересчитываются и остаются в валюте объекта. "
+                "Сортировка ordering=price всегда идет по цене в базовой валюте, "
+                "объекты в валюте без курса выводятся в конце",
+                type=openapi.TYPE_STRING,
+            ),
             openapi.Parameter(
                 "status",
                 openapi.IN_QUERY,
@@ -55,11 +150,58 @@ class ObjectListCreateView(ListCreateAPIView):
                 description="Страна расположения объекта",
                 type=openapi.TYPE_STRING,
             ),
-        ],
+            openapi.Parameter(
+                "bbox",
+                openapi.IN_QUERY,
+                description="Прямоугольник на карте: min_lon,min_lat,max_lon,max_lat",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "near",
+                openapi.IN_QUERY,
+                description="Точка lat,lon для поиска в радиусе "
+                "(сортировка по расстоянию: ordering=distance)",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "radius_km",
+                openapi.IN_QUERY,
+                description="Радиус поиска в км для near (по умолчанию 10)",
+                type=openapi.TYPE_NUMBER,
+            ),
+            openapi.Parameter(
+                "features",
+                openapi.IN_QUERY,
+                description="Фильтр по характеристикам через запятую: `pool` — ключ есть, "
+                '`parking:2` — равенство, `amenities:["gym"]` — вхождение в массив',
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "pagination",
+                openapi.IN_QUERY,
+                description="Режим пагинации: `cursor` — пагинация по курсору",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "cursor",
+                openapi.IN_QUERY,
+                description="Курсор страницы из полей next/previous",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "with_count",
+                openapi.IN_QUERY,
+                description="Добавить общее количество объектов в режиме курсора",
+                type=openapi.TYPE_BOOLEAN,
+            ),
+        ]
+        + FIELDSET_PARAMETERS,
         responses={200: ObjectSerializer(many=True)},
     )
     def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
+        return self.cached_get(
+            request, self.conditional_get, super().get, *args, **kwargs
+        )
 
     @swagger_auto_schema(
         operation_summary="Создать новый объект недвижимости",
@@ -71,6 +213,26 @@ class ObjectListCreateView(ListCreateAPIView):
     def post(self, request, *args, **kwargs):
         return super().post(request, *args, **kwargs)
 
+    def list(self, request, *args, **kwargs):
+        """
+        Список объектов строится из строк values() без создания экземпляров
+        модели (см. properties.fast_serializers). Если сериализатор содержит
+        неподдерживаемые поля, используется обычный путь.
+        """
+        fast = ValuesSerializer(self.get_serializer())
+        if not self.fast_list or not fast.supported:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        # Поля сортировки нужны пагинации по курсору
+        ordering = [term.lstrip("-") for term in ordering_fields(queryset)]
+        queryset = fast.get_queryset(queryset, extra=ordering + ["id"])
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast.to_representation(page))
+        return Response(fast.to_representation(queryset))
+
     def get_serializer_context(self):
         """
         Добавляет текущий запрос в контекст сериализатора.
@@ -129,22 +291,49 @@ class ObjectListCreateView(ListCreateAPIView):
             return [IsAdminOrBroker()]
         return [AllowAny()]
 
+    def get_cache_scope(self):
+        return "objects"
+
+    def get_conditional_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def get_validator_aggregates(self):
+        # Пересчет курсов меняет price_base (фильтры и ordering=price),
+        # не меняя updated_at
+        return dict(
+            super().get_validator_aggregates(),
+            price_base_sum=Sum("price_base"),
+            price_base_count=Count("price_base"),
+        )
 
-class ObjectDetailView(RetrieveUpdateDestroyAPIView):
+
+class ObjectDetailView(
+    SparseFieldsQuerysetMixin,
+    AnonymousResponseCacheMixin,
+    ConditionalGetMixin,
+    RetrieveUpdateDestroyAPIView,
+):
     """
     API представление для детального просмотра, обновления и удаления объекта недвижимости.
+
+    Ответы на GET-запросы анонимных пользователей кэшируются.
+    Поддерживаются условные запросы (ETag / Last-Modified) и выборочные
+    поля (fields / exclude).
     """
 
-    queryset = RealEstateObject.objects.all()
+    queryset = RealEstateObject.objects.defer("search_vector", "geo_cell")
     serializer_class = ObjectSerializer
 
     @swagger_auto_schema(
         operation_summary="Получить детали объекта недвижимости",
         operation_description="Возвращает подробную информацию об объекте недвижимости.",
+        manual_parameters=FIELDSET_PARAMETERS,
         responses={200: ObjectSerializer},
     )
     def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
+        return self.cached_get(
+            request, self.conditional_get, super().get, *args, **kwargs
+        )
 
     @swagger_auto_schema(
         operation_summary="Обновить объект недвижимости",
@@ -183,10 +372,565 @@ class ObjectDetailView(RetrieveUpdateDestroyAPIView):
             return [IsAdminOrBroker()]
         return [AllowAny()]
 
+    def get_cache_scope(self):
+        return f"object:{self.kwargs['pk']}"
+
+    def get_conditional_queryset(self):
+        return self.get_queryset().filter(pk=self.kwargs["pk"])
+
+
+class ObjectImportView(GenericAPIView):
+    """
+    API представление для массового импорта объектов из CSV или JSONL.
+
+    Файл обрабатывается потоково пачками: валидация, проверка дублей
+    адресов одним запросом на пачку и bulk_create. Корректные строки
+    сохраняются, для остальных возвращаются ошибки с номерами строк.
+    """
+
+    permission_classes = [IsAdminOrBroker]
+    parser_classes = [MultiPartParser, FormParser]
+    # Ограничение размера отчета об ошибках в ответе
+    max_reported_errors = 1000
+
+    @swagger_auto_schema(
+        operation_summary="Импортировать объекты недвижимости",
+        operation_description="Массовый импорт объектов из CSV (заголовок — имена полей) "
+        "или JSONL (один JSON-объект на строку). JSON-поля features, photos, videos "
+        "в CSV записываются как JSON. Объекты привязываются к текущему брокеру.",
+        manual_parameters=[
+            openapi.Parameter(
+                "file",
+                openapi.IN_FORM,
+                type=openapi.TYPE_FILE,
+                description="Файл .csv, .jsonl или .ndjson",
+                required=True,
+            ),
+            openapi.Parameter(
+                "format",
+                openapi.IN_FORM,
+                type=openapi.TYPE_STRING,
+                description="Формат файла (csv, jsonl), если не определяется по расширению",
+            ),
+            openapi.Parameter(
+                "dry_run",
+                openapi.IN_FORM,
+                type=openapi.TYPE_BOOLEAN,
+                description="Только проверить файл, ничего не сохраняя",
+            ),
+        ],
+        responses={200: "Итоги импорта и ошибки по строкам", 400: "Ошибки запроса"},
+    )
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise DRFValidationError({"file": "Файл обязателен."})
+        file_format = request.data.get("format") or detect_format(upload.name)
+        if file_format not in FORMATS:
+            raise DRFValidationError(
+                {"format": f"Поддерживаемые форматы: {', '.join(FORMATS)}."}
+            )
+
+        errors = []
+
+        def collect(number, row_errors):
+            if len(errors) < self.max_reported_errors:
+                errors.append({"row": number, "errors": row_errors})
+
+        importer = ObjectImporter(
+            request.user,
+            dry_run=request.data.get("dry_run") in ("1", "true", "True"),
+            on_error=collect,
+        )
+        stats = importer.run(upload, file_format)
+        return Response(
+            dict(
+                stats,
+                errors=errors,
+                errors_truncated=stats["failed"] > len(errors),
+            ),
+            status=HTTP_200_OK,
+        )
+
+
+class ObjectExportView(GenericAPIView):
+    """
+    API представление для потоковой выгрузки объектов в CSV или JSONL.
+
+    Поддерживает те же фильтры, сортировку и выборочные поля, что и список
+    объектов, но без пагинации: строки читаются серверным курсором и сразу
+    отправляются клиенту, поэтому память не зависит от размера выгрузки.
+    """
+
+    queryset = RealEstateObject.objects.all()
+    serializer_class = ObjectSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, RealEstateObjectOrderingFilter]
+    filterset_class = RealEstateObjectFilter
+    ordering_fields = ["price", "created_at", "distance"]
+    ordering = ["-created_at"]
+    chunk_size = CHUNK_SIZE
+
+    @swagger_auto_schema(
+        operation_summary="Выгрузить объекты недвижимости",
+        operation_description="Потоковая выгрузка всех объектов, подходящих под фильтры "
+        "списка объектов, в CSV или JSONL (один JSON-объект на строку). "
+        "CSV-выгрузку можно загрузить обратно через импорт.",
+        manual_parameters=[
+            openapi.Parameter(
+                "file_format",
+                openapi.IN_QUERY,
+                description="Формат выгрузки: csv или jsonl (по умолчанию)",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "gzip",
+                openapi.IN_QUERY,
+                description="Сжать выгрузку в gzip",
+                type=openapi.TYPE_BOOLEAN,
+            ),
+        ]
+        + FIELDSET_PARAMETERS,
+        responses={200: "Файл выгрузки", 400: "Ошибки валидации"},
+    )
+    def get(self, request, *args, **kwargs):
+        file_format = request.query_params.get("file_format", "jsonl")
+        if file_format not in EXPORT_FORMATS:
+            raise DRFValidationError(
+                {"file_format": f"Поддерживаемые форматы: {', '.join(EXPORT_FORMATS)}."}
+            )
+        compress = request.query_params.get("gzip") in ("1", "true", "True")
+
+        # Ошибки фильтров и выборочных полей возникают до начала ответа
+        serializer = self.get_serializer()
+        queryset = self.filter_queryset(self.get_queryset())
+        fast = ValuesSerializer(serializer)
+        if fast.supported:
+            fieldnames = [name for name, _, _ in fast.plan]
+            items = iter_objects(queryset, fast, self.chunk_size)
+        else:
+            fieldnames = [
+                name
+                for name, field in serializer.fields.items()
+                if not field.write_only
+            ]
+            items = (
+                serializer.to_representation(instance)
+                for instance in queryset.iterator(chunk_size=self.chunk_size)
+            )
+
+        filename = f"objects.{file_format}"
+        content_type = CONTENT_TYPES[file_format]
+        if compress:
+            filename += ".gz"
+            content_type = "application/gzip"
+        response = StreamingHttpResponse(
+            iter_export(items, fieldnames, file_format, compress),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ObjectClusterView(GenericAPIView):
+    """
+    API представление для кластеров объектов недвижимости на карте.
+
+    Объекты группируются по ячейкам сетки тайлов текущего масштаба
+    одним SQL-запросом; результаты кэшируются по тайлам.
+    """
+
+    queryset = RealEstateObject.objects.all()
+    permission_classes = [AllowAny]
+    filterset_class = RealEstateObjectFilter
+    # Параметры, которые не относятся к фильтрам RealEstateObjectFilter
+    cluster_params = ("bbox", "zoom")
+
+    @swagger_auto_schema(
+        operation_summary="Получить кластеры объектов для карты",
+        operation_description="Возвращает кластеры объектов в прямоугольнике bbox "
+        "для уровня масштаба zoom: количество, центр и диапазон цен. "
+        "Поддерживает те же фильтры, что и список объектов.",
+        manual_parameters=[
+            openapi.Parameter(
+                "bbox",
+                openapi.IN_QUERY,
+                description="Прямоугольник на карте: min_lon,min_lat,max_lon,max_lat",
+                type=openapi.TYPE_STRING,
+                required=True,
+            ),
+            openapi.Parameter(
+                "zoom",
+                openapi.IN_QUERY,
+                description=f"Уровень масштаба карты (0-{MAX_ZOOM})",
+                type=openapi.TYPE_INTEGER,
+                required=True,
+            ),
+        ],
+        responses={200: "Список кластеров", 400: "Ошибки валидации"},
+    )
+    def get(self, request, *args, **kwargs):
+        zoom, bbox = self.parse_params(request)
+        min_lon, min_lat, max_lon, max_lat = bbox
+
+        if min_lon > max_lon:
+            # Прямоугольник пересекает 180-й меридиан
+            tiles = tiles_for_bbox(zoom, min_lat, min_lon, max_lat, 180) + (
+                tiles_for_bbox(zoom, min_lat, -180, max_lat, max_lon)
+            )
+        else:
+            tiles = tiles_for_bbox(zoom, min_lat, min_lon, max_lat, max_lon)
+        if len(tiles) > MAX_TILES:
+            raise DRFValidationError(
+                {"bbox": "Слишком большая область для этого масштаба."}
+            )
+
+        params = request.query_params.copy()
+        for name in self.cluster_params:
+            params.pop(name, None)
+        filterset = self.filterset_class(
+            data=params, queryset=self.get_queryset(), request=request
+        )
+        if not filterset.is_valid():
+            raise DRFValidationError(filterset.errors)
+
+        clusters = get_clusters(filterset.qs, filter_cache_key(params), zoom, tiles)
+        results = [
+            cluster
+            for tile in tiles
+            for cluster in clusters[tile]
+            if self.in_bbox(cluster, bbox)
+        ]
+        return Response({"zoom": zoom, "clusters": results}, status=HTTP_200_OK)
 
-class CatalogListCreateView(ListCreateAPIView):
+    def parse_params(self, request):
+        try:
+            zoom = int(request.query_params.get("zoom", ""))
+        except ValueError:
+            raise DRFValidationError({"zoom": "Укажите целый уровень масштаба."})
+        if not 0 <= zoom <= MAX_ZOOM:
+            raise DRFValidationError(
+                {"zoom": f"Масштаб должен быть от 0 до {MAX_ZOOM}."}
+            )
+
+        try:
+            bbox = [float(part) for part in request.query_params["bbox"].split(",")]
+        except (KeyError, ValueError):
+            bbox = []
+        if len(bbox) != 4 or not (-90 <= bbox[1] <= bbox[3] <= 90):
+            raise DRFValidationError(
+                {"bbox": "Ожидается bbox=min_lon,min_lat,max_lon,max_lat."}
+            )
+        return zoom, bbox
+
+    @staticmethod
+    def in_bbox(cluster, bbox):
+        min_lon, min_lat, max_lon, max_lat = bbox
+        if not min_lat <= cluster["latitude"] <= max_lat:
+            return False
+        if min_lon > max_lon:
+            return cluster["longitude"] >= min_lon or cluster["longitude"] <= max_lon
+        return min_lon <= cluster["longitude"] <= max_lon
+
+
+class ObjectFacetView(GenericAPIView):
+    """
+    API представление для фасетных счетчиков панели фильтров.
+
+    Счетчики по стране, городу, статусу, состоянию, числу комнат и
+    ценовым диапазонам считаются одним запросом (GROUPING SETS) для
+    текущих фильтров и кэшируются на короткое время.
+    """
+
+    queryset = RealEstateObject.objects.all()
+    permission_classes = [AllowAny]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = RealEstateObjectFilter
+
+    @swagger_auto_schema(
+        operation_summary="Получить фасетные счетчики объектов",
+        operation_description="Возвращает количество объектов по стране, городу, "
+        "статусу, состоянию, числу комнат и ценовым диапазонам для текущих фильтров.",
+        responses={200: "Фасетные счетчики", 400: "Ошибки валидации"},
+    )
+    def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        filter_key = filter_cache_key(
+            request.query_params, names=self.filterset_class.base_filters
+        )
+        return Response(get_facets(queryset, filter_key), status=HTTP_200_OK)
+
+
+PRICE_PARAMETERS = [
+    openapi.Parameter(
+        "bucket",
+        openapi.IN_QUERY,
+        description="Интервал прореживания: day, week или month",
+        type=openapi.TYPE_STRING,
+        enum=list(PRICE_BUCKETS),
+    ),
+    openapi.Parameter(
+        "agg",
+        openapi.IN_QUERY,
+        description="Значение интервала: last (последняя цена) или avg (средняя)",
+        type=openapi.TYPE_STRING,
+        enum=list(PRICE_AGGREGATES),
+        default="last",
+    ),
+    openapi.Parameter(
+        "start",
+        openapi.IN_QUERY,
+        description="Начальная дата (YYYY-MM-DD), включительно",
+        type=openapi.TYPE_STRING,
+        format=openapi.FORMAT_DATE,
+    ),
+    openapi.Parameter(
+        "end",
+        openapi.IN_QUERY,
+        description="Конечная дата (YYYY-MM-DD), включительно",
+        type=openapi.TYPE_STRING,
+        format=openapi.FORMAT_DATE,
+    ),
+]
+
+
+def parse_date_params(request, names):
+    """
+    Даты из параметров запроса в формате YYYY-MM-DD (None, если не указаны).
+    """
+    dates = {}
+    for name in names:
+        value = request.query_params.get(name)
+        try:
+            dates[name] = parse_date(value) if value else None
+        except ValueError:
+            dates[name] = None
+        if value and dates[name] is None:
+            raise DRFValidationError({name: "Ожидается дата в формате YYYY-MM-DD."})
+    return dates
+
+
+class PriceHistoryMixin:
+    """
+    Разбор параметров истории цен (bucket, agg, start, end).
+    """
+
+    def parse_price_params(self, request):
+        bucket = request.query_params.get("bucket") or None
+        if bucket is not None and bucket not in PRICE_BUCKETS:
+            raise DRFValidationError(
+                {"bucket": f"Допустимые значения: {', '.join(PRICE_BUCKETS)}."}
+            )
+        aggregate = request.query_params.get("agg") or "last"
+        if aggregate not in PRICE_AGGREGATES:
+            raise DRFValidationError(
+                {"agg": f"Допустимые значения: {', '.join(PRICE_AGGREGATES)}."}
+            )
+
+        dates = parse_date_params(request, ("start", "end"))
+        return {"bucket": bucket, "aggregate": aggregate, **dates}
+
+    def price_series(self, listing_ids, params):
+        points = price_points(listing_ids, **params)
+        return {
+            listing_id: PricePointSerializer(items, many=True).data
+            for listing_id, items in group_by_listing(points).items()
+        }
+
+
+class ObjectPriceHistoryView(PriceHistoryMixin, GenericAPIView):
+    """
+    API представление для истории цен объекта недвижимости.
+
+    Точки истории записываются триггером БД при каждом изменении цены.
+    """
+
+    queryset = RealEstateObject.objects.all()
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        operation_summary="Получить историю цен объекта",
+        operation_description="Возвращает изменения цены объекта по времени. "
+        "С параметром bucket точки прореживаются по интервалам в SQL: "
+        "последняя или средняя цена интервала.",
+        manual_parameters=PRICE_PARAMETERS,
+        responses={
+            200: "История цен объекта",
+            400: "Ошибки валидации",
+            404: "Объект не найден",
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        params = self.parse_price_params(request)
+        listing = self.get_object()
+        series = self.price_series([listing.pk], params)
+        return Response(
+            {
+                "listing": listing.pk,
+                "bucket": params["bucket"],
+                "aggregate": params["aggregate"],
+                "points": series.get(listing.pk, []),
+            },
+            status=HTTP_200_OK,
+        )
+
+
+class ObjectPriceSeriesView(PriceHistoryMixin, GenericAPIView):
+    """
+    API представление для истории цен нескольких объектов (графики сравнения).
+
+    Ряды всех объектов читаются и прореживаются одним запросом.
+    """
+
+    queryset = RealEstateObject.objects.all()
+    permission_classes = [AllowAny]
+    # Ограничение количества объектов в одном запросе
+    max_listings = 100
+
+    @swagger_auto_schema(
+        operation_summary="Получить историю цен нескольких объектов",
+        operation_description="Возвращает ряды цен объектов из параметра ids, "
+        "прореживание и агрегация выполняются одним SQL-запросом.",
+        manual_parameters=[
+            openapi.Parameter(
+                "ids",
+                openapi.IN_QUERY,
+                description="id объектов через запятую",
+                type=openapi.TYPE_STRING,
+                required=True,
+            ),
+            *PRICE_PARAMETERS,
+        ],
+        responses={200: "Ряды цен объектов", 400: "Ошибки валидации"},
+    )
+    def get(self, request, *args, **kwargs):
+        params = self.parse_price_params(request)
+        try:
+            ids = [int(part) for part in request.query_params["ids"].split(",")]
+        except (KeyError, ValueError):
+            raise DRFValidationError({"ids": "Ожидается список id через запятую."})
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > self.max_listings:
+            raise DRFValidationError(
+                {"ids": f"Не более {self.max_listings} объектов за запрос."}
+            )
+
+        existing = self.get_queryset().filter(id__in=ids).values_list("id", flat=True)
+        existing = set(existing)
+        series = self.price_series([pk for pk in ids if pk in existing], params)
+        return Response(
+            {
+                "bucket": params["bucket"],
+                "aggregate": params["aggregate"],
+                "series": [
+                    {"listing": pk, "points": series.get(pk, [])}
+                    for pk in ids
+                    if pk in existing
+                ],
+            },
+            status=HTTP_200_OK,
+        )
+
+
+class ObjectDaysOnMarketView(GenericAPIView):
+    """
+    API представление для срока экспозиции объектов по городам.
+
+    Считается по переходам в статус sold за период: читаются только
+    секции истории статусов за месяцы периода.
+    """
+
+    queryset = RealEstateObject.objects.all()
+    permission_classes = [AllowAny]
+    # Период по умолчанию и максимальный период, дней
+    default_period = 90
+    max_period = 366
+
+    @swagger_auto_schema(
+        operation_summary="Получить срок экспозиции объектов по городам",
+        operation_description="Возвращает количество проданных за период объектов "
+        "и средний и медианный срок от выхода на рынок до продажи (в днях). "
+        f"По умолчанию — последние {default_period} дней.",
+        manual_parameters=[
+            openapi.Parameter(
+                "start",
+                openapi.IN_QUERY,
+                description="Начальная дата продажи (YYYY-MM-DD), включительно",
+                type=openapi.TYPE_STRING,
+                format=openapi.FORMAT_DATE,
+            ),
+            openapi.Parameter(
+                "end",
+                openapi.IN_QUERY,
+                description="Конечная дата продажи (YYYY-MM-DD), включительно",
+                type=openapi.TYPE_STRING,
+                format=openapi.FORMAT_DATE,
+            ),
+            openapi.Parameter(
+                "city",
+                openapi.IN_QUERY,
+                description="Город (без учета регистра)",
+                type=openapi.TYPE_STRING,
+            ),
+        ],
+        responses={200: "Срок экспозиции по городам", 400: "Ошибки валидации"},
+    )
+    def get(self, request, *args, **kwargs):
+        dates = parse_date_params(request, ("start", "end"))
+        end = dates["end"] or timezone.now().date()
+        start = dates["start"] or end - timedelta(days=self.default_period - 1)
+        if start > end:
+            raise DRFValidationError({"start": "Начальная дата позже конечной."})
+        if (end - start).days >= self.max_period:
+            raise DRFValidationError(
+                {"start": f"Период не может быть длиннее {self.max_period} дней."}
+            )
+
+        cities = [
+            {
+                "city": row["city"],
+                "sold": row["sold"],
+                "avg_days": round(row["avg_days"], 1),
+                "median_days": round(row["median_days"], 1),
+            }
+            for row in days_on_market(start, end, request.query_params.get("city"))
+        ]
+        return Response(
+            {"start": start, "end": end, "cities": cities}, status=HTTP_200_OK
+        )
+
+
+class CatalogEmbedMixin:
+    """
+    Вложения `?embed=` для каталогов (см. properties.catalogs).
+
+    Превью объектов зависят от самих объектов, поэтому ключ кэша таких
+    ответов включает версию области objects.
+    """
+
+    def get_embed(self):
+        if self.request.method != "GET":
+            return set()
+        return parse_embed(self.request.query_params)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["embed_listings"] = "listings" in self.get_embed()
+        return context
+
+    def get_cache_dependencies(self):
+        return ("objects",) if self.get_embed() else ()
+
+
+class CatalogListCreateView(
+    CatalogEmbedMixin, AnonymousResponseCacheMixin, ListCreateAPIView
+):
     """
     API представление для получения списка каталогов и их создания.
+
+    Ответы на GET-запросы анонимных пользователей кэшируются.
+    Брокеры, состав и превью объектов (`?embed=listings`) загружаются
+    фиксированным числом запросов на страницу.
     """
 
     queryset = Catalog.objects.all()
@@ -201,12 +945,13 @@ class CatalogListCreateView(ListCreateAPIView):
                 openapi.IN_QUERY,
                 description="ID владельца каталога",
                 type=openapi.TYPE_INTEGER,
-            )
+            ),
+            EMBED_PARAMETER,
         ],
         responses={200: CatalogSerializer(many=True)},
     )
     def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
+        return self.cached_get(request, super().get, *args, **kwargs)
 
     @swagger_auto_schema(
         operation_summary="Создать новый каталог",
@@ -222,7 +967,7 @@ class CatalogListCreateView(ListCreateAPIView):
         serializer.save(broker=self.request.user)
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = catalog_queryset(self.get_embed()).order_by("id")
         if not self.request.user.is_authenticated:
             queryset = queryset.filter(is_public=True)
         return queryset
@@ -232,11 +977,22 @@ class CatalogListCreateView(ListCreateAPIView):
             return [IsAdminOrBroker()]
         return [AllowAny()]  # GET-запросы доступны всем
 
+    def get_cache_scope(self):
+        return "catalogs"
 
-class CatalogDetailView(RetrieveUpdateDestroyAPIView):
+
+class CatalogDetailView(
+    CatalogEmbedMixin,
+    AnonymousResponseCacheMixin,
+    ConditionalGetMixin,
+    RetrieveUpdateDestroyAPIView,
+):
     """
     API представление для детального просмотра, обновления и удаления каталога.
 
+    Ответы на GET-запросы анонимных пользователей кэшируются.
+    Поддерживаются условные запросы (ETag / Last-Modified).
+
     Права доступа:
         - GET: Публичные каталоги доступны всем.
           Приватные каталоги доступны только владельцу и администраторам.
@@ -250,7 +1006,7 @@ class CatalogDetailView(RetrieveUpdateDestroyAPIView):
         """
         Возвращает все каталоги (публичные и приватные) для дальнейшей обработки.
         """
-        return Catalog.objects.all()  # Включаем все каталоги
+        return catalog_queryset(self.get_embed())  # Включаем все каталоги
 
     @swagger_auto_schema(
         operation_summary="Получить детали каталога",
@@ -260,6 +1016,7 @@ class CatalogDetailView(RetrieveUpdateDestroyAPIView):
             "- Публичные каталоги доступны всем пользователям.\n"
             "- Приватные каталоги доступны только владельцу или администраторам."
         ),
+        manual_parameters=[EMBED_PARAMETER],
         responses={
             200: CatalogSerializer,
             403: openapi.Response("Доступ к этому каталогу запрещен."),
@@ -269,6 +1026,11 @@ class CatalogDetailView(RetrieveUpdateDestroyAPIView):
         """
         Обработка GET-запроса для получения деталей каталога.
         """
+        return self.cached_get(
+            request, self.conditional_get, self.retrieve_catalog, *args, **kwargs
+        )
+
+    def retrieve_catalog(self, request, *args, **kwargs):
         catalog = self.get_object()
         if not catalog.is_public and (
             not request.user.is_authenticated or request.user != catalog.broker
@@ -324,6 +1086,32 @@ class CatalogDetailView(RetrieveUpdateDestroyAPIView):
             return []  # Доступ для всех пользователей
         return [IsAuthenticated(), IsAdminOrBroker()]
 
+    def get_cache_scope(self):
+        return f"catalog:{self.kwargs['pk']}"
+
+    def get_conditional_queryset(self):
+        """
+        Только каталоги, доступные текущему пользователю: для чужих
+        приватных каталогов валидаторы не вычисляются.
+        """
+        queryset = self.get_queryset().filter(pk=self.kwargs["pk"])
+        user = self.request.user
+        if user.is_authenticated:
+            return queryset.filter(Q(is_public=True) | Q(broker=user))
+        return queryset.filter(is_public=True)
+
+    def get_validator_aggregates(self):
+        # Состав каталога меняется без изменения Catalog.updated_at
+        aggregates = dict(
+            super().get_validator_aggregates(),
+            listings_count=Count("listings", distinct=True),
+            listings_last_id=Max("listings__id"),
+            listings_updated=Max("listings__updated_at"),
+        )
+        if "listings" in self.get_embed():
+            aggregates["listings_modified"] = Max("listings__listing__updated_at")
+        return aggregates
+
     def perform_update(self, serializer):
         """
         Проверка прав доступа при обновлении каталога.
@@ -342,3 +1130,43 @@ class CatalogDetailView(RetrieveUpdateDestroyAPIView):
         if self.request.user != instance.broker and not self.request.user.is_superuser:
             raise PermissionDenied("Вы можете удалять только свои каталоги.")
         instance.delete()
+
+
+class CatalogListingMoveView(GenericAPIView):
+    """
+    API представление для перемещения объекта внутри каталога.
+
+    Объект получает ключ sort_order между новыми соседями, поэтому
+    обновляется одна строка (см. properties.catalogs.move_catalog_listing).
+    Доступ разрешён только владельцу каталога и администраторам.
+    """
+
+    queryset = Catalog.objects.all()
+    serializer_class = CatalogListingMoveSerializer
+    permission_classes = [IsAuthenticated, IsAdminOrBroker]
+
+    @swagger_auto_schema(
+        operation_summary="Переместить объект в каталоге",
+        operation_description="Ставит объект каталога перед объектом before или после "
+        "объекта after. Остальные объекты каталога не изменяются.",
+        request_body=CatalogListingMoveSerializer,
+        responses={
+            200: "ID объекта и его новый sort_order",
+            400: "Ошибки валидации",
+            403: openapi.Response("Вы можете изменять только свои каталоги."),
+            404: openapi.Response("Каталог или объект не найден."),
+        },
+    )
+    def post(self, request, *args, **kwargs):
+        catalog = self.get_object()
+        if request.user != catalog.broker and not request.user.is_superuser:
+            raise PermissionDenied("Вы можете изменять только свои каталоги.")
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        link = move_catalog_listing(
+            catalog, self.kwargs["listing_id"], **serializer.validated_data
+        )
+        return Response(
+            {"listing": link.listing_id, "sort_order": link.sort_order},
+            status=HTTP_200_OK,
+        )
@@ -0,0 +1,104 @@
+"""
+Обработка аватаров пользователей.
+
+Аватар обрезается по центру до квадрата и уменьшается до AVATAR_SIZE.
+JPEG декодируется сразу с уменьшением (draft): для снимка 20 Мп в памяти
+оказывается изображение в 4-8 раз меньше. Обрезка и уменьшение выполняются
+одной операцией resize(box=...), без промежуточных копий. EXIF Orientation
+применяется, метаданные EXIF в результат не копируются.
+
+Одновременно обрабатывается не более MAX_CONCURRENT_AVATARS изображений,
+чтобы пиковое потребление памяти не зависело от числа параллельных загрузок.
+"""
+
+import threading
+from contextlib import contextmanager
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+AVATAR_SIZE = 512
+# Ограничение размера изображения до декодирования (защита от «бомб»)
+MAX_AVATAR_PIXELS = 50_000_000
+MAX_CONCURRENT_AVATARS = 4
+# Сколько секунд запрос ждет свободного слота обработки
+AVATAR_WAIT_TIMEOUT = 5
+
+AVATAR_SLOTS = threading.BoundedSemaphore(MAX_CONCURRENT_AVATARS)
+
+
+class AvatarError(Exception):
+    """
+    Изображение не может быть использовано как аватар.
+    """
+
+
+class AvatarBusy(Exception):
+    """
+    Все слоты обработки аватаров заняты.
+    """
+
+
+@contextmanager
+def avatar_slot():
+    """
+    Занимает слот обработки аватара или вызывает AvatarBusy, если слот
+    не освободился за AVATAR_WAIT_TIMEOUT секунд.
+    """
+    slots = AVATAR_SLOTS
+    if not slots.acquire(timeout=AVATAR_WAIT_TIMEOUT):
+        raise AvatarBusy
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+def process_avatar(file):
+    """
+    Обрезает и уменьшает изображение из файла `file`.
+
+    PNG сохраняется в PNG (с прозрачностью), остальные форматы — в JPEG.
+
+    Returns:
+        tuple: (BytesIO с результатом, расширение файла).
+
+    Raises:
+        AvatarError: Изображение слишком большое.
+        PIL.UnidentifiedImageError: Файл не является изображением.
+    """
+    with Image.open(file) as image:
+        if image.width * image.height > MAX_AVATAR_PIXELS:
+            raise AvatarError("Разрешение изображения слишком большое.")
+        is_png = image.format == "PNG"
+        # Квадрат вписан в изображение, поэтому достаточно обеих сторон >= AVATAR_SIZE
+        image.draft("RGB", (AVATAR_SIZE, AVATAR_SIZE))
+        ImageOps.exif_transpose(image, in_place=True)
+        return encode_avatar(image, is_png)
+
+
+def encode_avatar(image, is_png):
+    if image.mode not in ("RGB", "RGBA", "L", "LA"):
+        image = image.convert("RGBA" if is_png else "RGB")
+    if not is_png and image.mode in ("RGBA", "LA"):
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+
+    side = min(image.size)
+    left, top = (image.width - side) // 2, (image.height - side) // 2
+    size = min(side, AVATAR_SIZE)
+    image = image.resize(
+        (size, size),
+        Image.LANCZOS,
+        box=(left, top, left + side, top + side),
+        reducing_gap=2.0,
+    )
+
+    buffer = BytesIO()
+    if is_png:
+        image.save(buffer, format="PNG")
+    else:
+        image.save(buffer, format="JPEG", quality=85)
+    buffer.seek(0)
+    return buffer, "png" if is_png else "jpg"
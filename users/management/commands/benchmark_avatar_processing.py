@@ -0,0 +1,102 @@
+import multiprocessing
+import resource
+import statistics
+import time
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+from users.avatars import AVATAR_SIZE, process_avatar
+
+
+def full_decode_avatar(file):
+    """
+    Прежняя обработка: полное декодирование, обрезка, уменьшение и
+    копирование результата в ContentFile.
+    """
+    image = Image.open(file)
+    side = min(image.size)
+    left, top = (image.width - side) // 2, (image.height - side) // 2
+    image = image.crop((left, top, left + side, top + side))
+    image = image.resize((AVATAR_SIZE, AVATAR_SIZE))
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG")
+    buffer.seek(0)
+    return ContentFile(buffer.read())
+
+
+def synthetic_photo(megapixels):
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    height = width * 3 // 4
+    noise = Image.effect_noise((width, height), 30)
+    gradient = Image.linear_gradient("L").resize((width, height))
+    image = Image.merge(
+        "RGB", (noise, gradient, noise.transpose(Image.FLIP_TOP_BOTTOM))
+    )
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return image.size, buffer.getvalue()
+
+
+def run(method, data, images, connection):
+    # Замер в отдельном процессе: ru_maxrss — пик памяти процесса
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings = []
+    for _ in range(images):
+        started = time.perf_counter()
+        method(BytesIO(data))
+        timings.append((time.perf_counter() - started) * 1000)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    connection.send((timings, (peak - baseline) / 1024))
+    connection.close()
+
+
+class Command(BaseCommand):
+    """
+    Замер обработки аватара: время (медиана и p99) и прирост пиковой памяти
+    процесса для прежней обработки с полным декодированием и для
+    users.avatars.process_avatar.
+
+    Каждый способ выполняется в отдельном процессе. Хранилище и БД не
+    используются.
+
+    Пример:
+        python manage.py benchmark_avatar_processing --megapixels 20 --images 30
+    """
+
+    help = "Замер обработки аватаров: время и пиковая память на больших снимках."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--megapixels", type=float, default=20)
+        parser.add_argument("--images", type=int, default=20)
+
+    def handle(self, *args, **options):
+        if options["images"] < 1 or options["megapixels"] <= 0:
+            raise CommandError("Параметры замера должны быть положительными.")
+
+        (width, height), data = synthetic_photo(options["megapixels"])
+        self.stdout.write(
+            f"изображение: {width}x{height} JPEG ({len(data) / 1024 / 1024:.1f} МБ), "
+            f"повторов: {options['images']}"
+        )
+        context = multiprocessing.get_context("fork")
+        for label, method in (
+            ("полное декодирование", full_decode_avatar),
+            ("process_avatar", process_avatar),
+        ):
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=run, args=(method, data, options["images"], sender)
+            )
+            process.start()
+            timings, peak_mb = receiver.recv()
+            process.join()
+
+            timings.sort()
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            self.stdout.write(
+                f"{label:<22} медиана: {statistics.median(timings):8.1f} мс  "
+                f"p99: {p99:8.1f} мс  пик памяти: +{peak_mb:6.1f} МБ"
+            )
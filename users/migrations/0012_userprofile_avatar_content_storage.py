@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-17 04:12
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_storedfile"),
+        ("users", "0011_remove_userprofile_avatar_url_userprofile_avatar"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="userprofile",
+            name="avatar",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=core.storage.get_content_storage,
+                upload_to="avatars/",
+            ),
+        ),
+    ]
@@ -5,6 +5,8 @@ from django.contrib.auth.models import (
 )
 from django.db import models
 
+from core.storage import get_content_storage
+
 
 # UserManager
 class UserManager(BaseUserManager):
@@ -129,9 +131,10 @@ class UserProfile(models.Model):
     phone = models.CharField(max_length=20, blank=True, null=True)
     country = models.CharField(max_length=100, blank=True, null=True)
     city = models.CharField(max_length=100, blank=True, null=True)
+    # Файлы аватаров хранятся по содержимому (см. core.storage)
     avatar = models.ImageField(
-        upload_to="avatars/", blank=True, null=True
-    )  # Новое поле
+        upload_to="avatars/", storage=get_content_storage, blank=True, null=True
+    )
     verification_status = models.CharField(
         max_length=20,
         choices=[
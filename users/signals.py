@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import UserProfile
+
+
+@receiver(post_delete, sender=UserProfile)
+def release_avatar(sender, instance, **kwargs):
+    # Файл удалит gc_media, если на него не осталось ссылок
+    if instance.avatar:
+        instance.avatar.storage.release(instance.avatar.name)
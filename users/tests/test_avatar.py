@@ -1,30 +1,45 @@
 import pytest
+import threading
 from rest_framework import status
 from django.core.files.uploadedfile import SimpleUploadedFile
 from PIL import Image
 import io
+import users.avatars
+from users.avatars import process_avatar
+from core.models import StoredFile
+from core.storage import content_key
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    """Сохраняет загруженные файлы во временный каталог."""
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
 
 
 @pytest.mark.django_db
 class TestUserAvatarUpload:
-    # def test_upload_valid_avatar(self, api_client, broker_user):
-    #     """
-    #     Проверка успешной загрузки аватара.
-    #     """
-    #     api_client.force_authenticate(user=broker_user)
-    #
-    #     # Создаем тестовое изображение
-    #     image = Image.new("RGB", (1024, 1024), "blue")
-    #     buffer = io.BytesIO()
-    #     image.save(buffer, format="JPEG")
-    #     buffer.seek(0)
-    #
-    #     avatar = SimpleUploadedFile("avatar.jpg", buffer.read(), content_type="image/jpeg")
-    #     response = api_client.post("/api/auth/profile/avatar/",
-    #     {"avatar": avatar}, format="multipart")
-    #
-    #     assert response.status_code == status.HTTP_200_OK
-    #     assert "avatar_url" in response.data
+    def test_upload_valid_avatar(self, api_client, broker_user, media):
+        """
+        Проверка успешной загрузки аватара.
+        """
+        api_client.force_authenticate(user=broker_user)
+
+        # Создаем тестовое изображение
+        image = Image.new("RGB", (1024, 1024), "blue")
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG")
+        buffer.seek(0)
+
+        avatar = SimpleUploadedFile(
+            "avatar.jpg", buffer.read(), content_type="image/jpeg"
+        )
+        response = api_client.post(
+            "/api/auth/profile/avatar/", {"avatar": avatar}, format="multipart"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "avatar_url" in response.data
 
     def test_upload_invalid_format(self, api_client, broker_user):
         """
@@ -60,26 +75,114 @@ class TestUserAvatarUpload:
 
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
-    # def test_large_image_resize(self, api_client, broker_user):
-    #     """
-    #     Проверка автоматической обрезки и изменения размера изображения.
-    #     """
-    #     api_client.force_authenticate(user=broker_user)
-    #
-    #     # Создаем тестовое изображение большого размера
-    #     image = Image.new("RGB", (2000, 2000), "red")
-    #     buffer = io.BytesIO()
-    #     image.save(buffer, format="JPEG")
-    #     buffer.seek(0)
-    #
-    #     avatar = SimpleUploadedFile("large_avatar.jpg", buffer.read(), content_type="image/jpeg")
-    #     response = api_client.post("/api/auth/profile/avatar/",
-    #     {"avatar": avatar}, format="multipart")
-    #
-    #     assert response.status_code == status.HTTP_200_OK
-    #     assert "avatar_url" in response.data
-    #
-    #     # Проверяем, что изображение обрезано до 512x512
-    #     profile = broker_user.profile
-    #     resized_image = Image.open(profile.avatar.path)
-    #     assert resized_image.size == (512, 512)
+    def test_large_image_resize(self, api_client, broker_user, media):
+        """
+        Проверка автоматической обрезки и изменения размера изображения.
+        """
+        api_client.force_authenticate(user=broker_user)
+
+        # Создаем тестовое изображение большого размера
+        image = Image.new("RGB", (2000, 2000), "red")
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG")
+        buffer.seek(0)
+
+        avatar = SimpleUploadedFile(
+            "large_avatar.jpg", buffer.read(), content_type="image/jpeg"
+        )
+        response = api_client.post(
+            "/api/auth/profile/avatar/", {"avatar": avatar}, format="multipart"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "avatar_url" in response.data
+
+        # Проверяем, что изображение обрезано до 512x512
+        profile = broker_user.profile
+        resized_image = Image.open(profile.avatar.path)
+        assert resized_image.size == (512, 512)
+
+    def test_reupload_same_avatar(self, api_client, broker_user, media):
+        """
+        Повторная загрузка того же аватара не создает новый файл; удаление
+        профиля освобождает ссылку на него.
+        """
+        api_client.force_authenticate(user=broker_user)
+
+        image = Image.new("RGB", (800, 600), "blue")
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG")
+        names = []
+        for filename in ("first.jpg", "second.jpg"):
+            avatar = SimpleUploadedFile(
+                filename, buffer.getvalue(), content_type="image/jpeg"
+            )
+            response = api_client.post(
+                "/api/auth/profile/avatar/", {"avatar": avatar}, format="multipart"
+            )
+            assert response.status_code == status.HTTP_200_OK
+            broker_user.profile.refresh_from_db()
+            names.append(broker_user.profile.avatar.name)
+
+        assert names[0] == names[1]
+        assert len(list(media.rglob("*.jpg"))) == 1
+        stored = StoredFile.objects.get(key=content_key(names[0]))
+        assert stored.refcount == 1
+
+        broker_user.profile.delete()
+        stored.refresh_from_db()
+        assert stored.refcount == 0
+        assert stored.released_at is not None
+
+    def test_orientation_and_exif(self, broker_user):
+        """
+        Прямоугольный снимок обрезается по центру до квадрата с учетом
+        EXIF Orientation; EXIF в результат не копируется.
+        """
+        # Сверху красная полоса, снизу синяя; после поворота на 90° по часовой
+        # красная полоса оказывается справа, синяя — слева
+        image = Image.new("RGB", (1600, 1200), "green")
+        image.paste("red", (0, 0, 1600, 200))
+        image.paste("blue", (0, 1000, 1600, 1200))
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", exif=exif)
+        buffer.seek(0)
+
+        result, extension = process_avatar(buffer)
+        avatar = Image.open(result)
+        assert extension == "jpg"
+        assert avatar.size == (512, 512)
+        assert not avatar.getexif()
+        assert avatar.getpixel((500, 256))[0] > 200
+        assert avatar.getpixel((10, 256))[2] > 200
+
+    def test_too_many_pixels_and_busy(self, api_client, broker_user, monkeypatch):
+        """
+        Слишком большое разрешение отклоняется до декодирования; при занятых
+        слотах обработки возвращается 503.
+        """
+        api_client.force_authenticate(user=broker_user)
+
+        def upload():
+            image = Image.new("L", (1000, 1000))
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG")
+            avatar = SimpleUploadedFile(
+                "avatar.png", buffer.getvalue(), content_type="image/png"
+            )
+            return api_client.post(
+                "/api/auth/profile/avatar/", {"avatar": avatar}, format="multipart"
+            )
+
+        monkeypatch.setattr("users.avatars.MAX_AVATAR_PIXELS", 500_000)
+        response = upload()
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["error"] == "Разрешение изображения слишком большое."
+
+        monkeypatch.setattr("users.avatars.AVATAR_SLOTS", threading.BoundedSemaphore(1))
+        monkeypatch.setattr("users.avatars.AVATAR_WAIT_TIMEOUT", 0)
+        users.avatars.AVATAR_SLOTS.acquire()
+        response = upload()
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
@@ -1,6 +1,7 @@
-from PIL import Image, UnidentifiedImageError
-from io import BytesIO
-from django.core.files.base import ContentFile
+from pathlib import Path
+
+from PIL import UnidentifiedImageError
+from django.core.files.base import File
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
@@ -19,6 +20,7 @@ from .serializers import (
 )
 from .models import User, UserProfile, UserVerification, Role, RoleAssignmentHistory
 from .permissions import IsAdminOrModerator, IsBrokerOrAmbassador
+from .avatars import AvatarBusy, AvatarError, avatar_slot, process_avatar
 
 
 @swagger_auto_schema(
@@ -142,6 +144,9 @@ class UserProfileView(APIView):
 class UserAvatarUploadView(APIView):
     """
     Эндпоинт для загрузки аватара пользователя с автоматической обрезкой.
+
+    Изображение обрезается до квадрата и уменьшается до 512x512 с
+    декодированием в уменьшенном размере (см. users.avatars).
     """
 
     permission_classes = [IsAuthenticated]
@@ -153,7 +158,7 @@ class UserAvatarUploadView(APIView):
             "Позволяет пользователю загрузить новый аватар.\n\n"
             "Поддерживаемые форматы: JPEG, PNG.\n"
             "Ограничения:\n"
-            "- Максимальное разрешение: 512x512 пикселей (автоматическая обрезка).\n"
+            "- Изображение обрезается до квадрата и уменьшается до 512x512 пикселей.\n"
             "- Максимальный размер файла: 2MB."
         ),
         manual_parameters=[
@@ -177,6 +182,7 @@ class UserAvatarUploadView(APIView):
             ),
             400: "Ошибка загрузки.",
             401: "Необходимо авторизоваться.",
+            503: "Сервер занят обработкой изображений.",
         },
     )
     def post(self, request):
@@ -202,26 +208,26 @@ class UserAvatarUploadView(APIView):
             )
 
         try:
-            # Открываем изображение
-            img = Image.open(avatar)
-            max_resolution = (512, 512)
-
-            # Проверяем размеры изображения
-            if img.width > max_resolution[0] or img.height > max_resolution[1]:
-                left = (img.width - max_resolution[0]) / 2
-                top = (img.height - max_resolution[1]) / 2
-                right = (img.width + max_resolution[0]) / 2
-                bottom = (img.height + max_resolution[1]) / 2
-                img = img.crop((left, top, right, bottom))
-                img = img.resize(max_resolution)
-
-            buffer = BytesIO()
-            img.save(buffer, format=img.format)
-            buffer.seek(0)
-
-            file_content = ContentFile(buffer.read(), name=avatar.name)
-            profile.avatar.save(avatar.name, file_content, save=True)
-
+            # Обработка с ограничением числа одновременных декодирований
+            with avatar_slot():
+                buffer, extension = process_avatar(avatar)
+            # Результат передается в хранилище без дополнительного копирования.
+            # Хранилище адресуется по содержимому: повторная загрузка того же
+            # аватара не пишет файл, ссылка на прежний файл освобождается
+            previous = profile.avatar.name
+            name = f"{Path(avatar.name).stem}.{extension}"
+            profile.avatar.save(name, File(buffer, name=name), save=True)
+            if previous:
+                profile.avatar.storage.release(previous)
+
+        except AvatarBusy:
+            return Response(
+                {"error": "Сервер занят обработкой изображений, повторите позже."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "5"},
+            )
+        except AvatarError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except UnidentifiedImageError:
             return Response(
                 {"error": "Файл не является допустимым изображением."},